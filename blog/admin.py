@@ -1,5 +1,54 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from . import busqueda
+from .forms import PostAdminForm
 from .models import Post, Categoria
+from .paginacion import PaginadorEstimado
+from .slugs import guardar_con_slug_unico
+
+
+class FiltroAutor(admin.SimpleListFilter):
+    """
+    Filtro por autor con un buscador (autocompletado del admin) en lugar de
+    un enlace por cada usuario.
+    """
+    title = 'autor'
+    parameter_name = 'autor'
+    template = 'admin/blog/filtro_autocompletar.html'
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.url_autocompletar = reverse(f'{model_admin.admin_site.name}:autocomplete')
+
+    def lookups(self, request, model_admin):
+        # Solo el autor seleccionado, para mostrar su nombre
+        if not (self.value() or '').isdigit():
+            return []
+        return [(str(usuario.pk), str(usuario)) for usuario in User.objects.filter(pk=self.value())]
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if (self.value() or '').isdigit():
+            return queryset.filter(autor_id=self.value())
+        return queryset
+
+
+class PostChangeList(ChangeList):
+    """Changelist que solo carga las columnas que se muestran"""
+    campos = (
+        'titulo', 'slug', 'fecha_creacion', 'publicado', 'visitas', 'categoria_id',
+        'autor__username', 'categoria__nombre',
+    )
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).only(*self.campos)
 
 
 @admin.register(Categoria)
@@ -7,20 +56,28 @@ class CategoriaAdmin(admin.ModelAdmin):
     list_display = ('nombre', 'descripcion', 'fecha_creacion', 'total_posts')
     search_fields = ('nombre', 'descripcion')
     list_filter = ('fecha_creacion',)
-    readonly_fields = ('fecha_creacion',)
+    readonly_fields = ('fecha_creacion', 'total_publicados')
 
     def total_posts(self, obj):
-        return obj.posts.count()
-    total_posts.short_description = 'Total Posts'
+        return obj.total_publicados
+    total_posts.short_description = 'Posts publicados'
+    total_posts.admin_order_field = 'total_publicados'
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
+    form = PostAdminForm
     list_display = ('titulo', 'autor', 'categoria', 'fecha_creacion', 'publicado', 'visitas')
-    list_filter = ('publicado', 'fecha_creacion', 'categoria', 'autor')
+    list_filter = ('publicado', 'fecha_creacion', 'categoria', FiltroAutor)
+    list_select_related = ('autor', 'categoria')
     search_fields = ('titulo', 'contenido', 'autor__username')
+    autocomplete_fields = ('autor', 'categoria')
+    # Sin COUNT(*) de la tabla completa en cada carga del listado
+    paginator = PaginadorEstimado
+    show_full_result_count = False
     prepopulated_fields = {'slug': ('titulo',)}
     readonly_fields = ('fecha_creacion', 'fecha_actualizacion', 'visitas')
+    actions = ('publicar_seleccionados', 'despublicar_seleccionados')
     fieldsets = (
         ('Información Básica', {
             'fields': ('titulo', 'slug', 'autor', 'categoria')
@@ -37,8 +94,42 @@ class PostAdmin(admin.ModelAdmin):
         }),
     )
 
+    @property
+    def media(self):
+        # Select2 y autocomplete.js para el filtro de autor del listado
+        autor = Post._meta.get_field('autor')
+        return (
+            super().media
+            + AutocompleteSelect(autor, self.admin_site).media
+            + forms.Media(js=['blog/admin/filtro_autor.js'])
+        )
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        # Con índice de texto completo, la búsqueda no recorre `contenido`
+        encontrados = busqueda.filtrar_posts(queryset, search_term, relevancia=False)
+        if encontrados is not None:
+            return encontrados, False
+        return super().get_search_results(request, queryset, search_term)
+
     def save_model(self, request, obj, form, change):
+        if obj.publicado and not obj.fecha_publicacion:
+            obj.fecha_publicacion = timezone.now()
         if not change:  # Si es un nuevo post
             obj.autor = request.user
+            guardar_con_slug_unico(obj)
+            return
         super().save_model(request, obj, form, change)
 
+
+    def publicar_seleccionados(self, request, queryset):
+        cambiados = queryset.publicar()
+        self.message_user(request, f'{cambiados} posts publicados.')
+    publicar_seleccionados.short_description = 'Publicar los posts seleccionados'
+
+    def despublicar_seleccionados(self, request, queryset):
+        cambiados = queryset.despublicar()
+        self.message_user(request, f'{cambiados} posts pasados a borrador.')
+    despublicar_seleccionados.short_description = 'Pasar a borrador los posts seleccionados'
@@ -5,3 +5,7 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
 
+
+    def ready(self):
+        from . import signals, sqlite  # noqa: F401
+        sqlite.instalar()
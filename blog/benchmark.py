@@ -0,0 +1,153 @@
+"""
+Medición y estadísticas comunes de los comandos de benchmark del blog
+(`bench`, `bench_sqlite`, `comparar_asgi`).
+
+Las latencias se miden en segundos y se informan en milisegundos.
+"""
+import math
+import statistics
+import threading
+import time
+from collections import namedtuple
+
+from django.db import connection, connections
+
+# Una petición medida (`indice` es el que recibió `pedir`)
+Medida = namedtuple('Medida', 'latencia consultas bytes estado indice')
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) por el método del rango más cercano"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def resumen(latencias, duracion):
+    """Peticiones por segundo y latencias (media, p50, p95, p99, máxima) en ms"""
+    return {
+        'peticiones': len(latencias),
+        'por_segundo': len(latencias) / duracion if duracion else 0.0,
+        'media_ms': statistics.fmean(latencias) * 1000 if latencias else 0.0,
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p95_ms': percentil(latencias, 95) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+        'max_ms': max(latencias, default=0.0) * 1000,
+    }
+
+
+def resumen_medidas(medidas, duracion):
+    """resumen() más consultas y bytes por respuesta y códigos de estado"""
+    datos = resumen([medida.latencia for medida in medidas], duracion)
+    datos['consultas_media'] = statistics.fmean(m.consultas for m in medidas) if medidas else 0.0
+    datos['consultas_max'] = max((m.consultas for m in medidas), default=0)
+    datos['bytes_media'] = statistics.fmean(m.bytes for m in medidas) if medidas else 0.0
+    estados = {}
+    for medida in medidas:
+        estados[str(medida.estado)] = estados.get(str(medida.estado), 0) + 1
+    datos['estados'] = estados
+    return datos
+
+
+def ejecutar_carga(preparar, pedir, total, concurrencia):
+    """
+    Hace `total` peticiones repartidas entre `concurrencia` hilos.
+
+    Cada hilo llama una vez a `preparar()` (sin medir; por ejemplo, para
+    crear y autenticar su cliente) y después a `pedir(estado, indice)`, que
+    debe devolver la respuesta. Devuelve (medidas, duración en segundos).
+    """
+    indices = iter(range(total))
+    cerrojo = threading.Lock()
+    medidas, errores = [], []
+    listos = threading.Barrier(concurrencia + 1)
+
+    def trabajador():
+        try:
+            estado = preparar()
+        except Exception as error:
+            errores.append(error)
+        listos.wait()
+        try:
+            while not errores:
+                with cerrojo:
+                    indice = next(indices, None)
+                if indice is None:
+                    break
+                medidas.append(_medir(pedir, estado, indice))
+        except Exception as error:
+            errores.append(error)
+        finally:
+            # Cada hilo tiene sus propias conexiones a la base de datos
+            connections.close_all()
+
+    hilos = [threading.Thread(target=trabajador) for _ in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    listos.wait()
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+    if errores:
+        raise errores[0]
+    return medidas, duracion
+
+
+def _medir(pedir, estado, indice):
+    consultas = 0
+
+    def contar(execute, sql, params, many, context):
+        nonlocal consultas
+        consultas += 1
+        return execute(sql, params, many, context)
+
+    inicio = time.perf_counter()
+    with connection.execute_wrapper(contar):
+        respuesta = pedir(estado, indice)
+        if respuesta.streaming:
+            tamano = sum(len(parte) for parte in respuesta.streaming_content)
+        else:
+            tamano = len(respuesta.content)
+    return Medida(time.perf_counter() - inicio, consultas, tamano, respuesta.status_code, indice)
+
+
+def regresiones(actual, base, tolerancia=0.25, margen_ms=5.0):
+    """
+    Compara dos resultados de `bench` (dicts ruta -> resumen) y devuelve la
+    lista de regresiones: p95 más de `tolerancia` (y de `margen_ms`) por
+    encima de la base, más consultas por petición o más errores.
+    """
+    problemas = []
+    for ruta, datos in actual.items():
+        anterior = base.get(ruta)
+        if anterior is None:
+            continue
+        limite = max(anterior['p95_ms'] * (1 + tolerancia), anterior['p95_ms'] + margen_ms)
+        if datos['p95_ms'] > limite:
+            problemas.append(f'{ruta}: p95 {datos["p95_ms"]:.1f} ms (base {anterior["p95_ms"]:.1f} ms)')
+        if datos['consultas_media'] > anterior['consultas_media'] + 0.5:
+            problemas.append(
+                f'{ruta}: {datos["consultas_media"]:.1f} consultas por petición '
+                f'(base {anterior["consultas_media"]:.1f})'
+            )
+        if datos.get('errores', 0) > anterior.get('errores', 0):
+            problemas.append(f'{ruta}: {datos["errores"]} errores (base {anterior.get("errores", 0)})')
+    return problemas
+
+
+def tabla(filas, columnas):
+    """Texto de una tabla alineada: `filas` es una lista de dicts con las `columnas`"""
+    anchos = {
+        columna: max(len(columna), *(len(_formato(fila[columna])) for fila in filas))
+        for columna in columnas
+    }
+    lineas = ['  '.join(columna.rjust(anchos[columna]) for columna in columnas)]
+    for fila in filas:
+        lineas.append('  '.join(_formato(fila[columna]).rjust(anchos[columna]) for columna in columnas))
+    return '\n'.join(lineas)
+
+
+def _formato(valor):
+    return f'{valor:.1f}' if isinstance(valor, float) else str(valor)
@@ -0,0 +1,225 @@
+"""
+Índice de búsqueda de texto completo para los posts.
+
+- SQLite: tabla virtual FTS5 `blog_post_fts` (rowid = id del post).
+- PostgreSQL: tabla `blog_post_busqueda` con una columna tsvector e índice GIN.
+
+El índice se mantiene desde las señales de Post y User (ver blog/signals.py) y se
+puede reconstruir con `python manage.py reconstruir_indice_busqueda`. Si el
+índice no existe (otro motor de base de datos, SQLite sin FTS5, etc.)
+`filtrar_posts` devuelve None y la vista usa la búsqueda con icontains.
+"""
+import re
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, FloatField, Func, Value
+from django.db.models.expressions import RawSQL
+
+TABLA_SQLITE = 'blog_post_fts'
+TABLA_POSTGRES = 'blog_post_busqueda'
+
+# Resultado de comprobar si el índice existe, por alias de base de datos:
+# alias -> (existe, time.monotonic() hasta el que vale)
+_disponible = {}
+# Segundos hasta volver a comprobarlo: los workers que ya estaban en marcha
+# ven el índice que crea `reconstruir_indice_busqueda` (o lo dejan de usar
+# si se elimina) sin reiniciarse
+VALIDEZ_COMPROBACION = 60
+
+
+def _configuracion_postgres():
+    return getattr(settings, 'BLOG_BUSQUEDA_CONFIG_PG', 'spanish')
+
+
+def _tabla(conexion):
+    if conexion.vendor == 'sqlite':
+        return TABLA_SQLITE
+    if conexion.vendor == 'postgresql':
+        return TABLA_POSTGRES
+    return None
+
+
+def indice_disponible(conexion=connection):
+    """Indica si el índice de búsqueda existe en la base de datos"""
+    existe, hasta = _disponible.get(conexion.alias, (None, 0))
+    if time.monotonic() >= hasta:
+        tabla = _tabla(conexion)
+        existe = bool(tabla) and tabla in conexion.introspection.table_names()
+        _recordar(conexion, existe)
+    return existe
+
+
+def _recordar(conexion, existe):
+    _disponible[conexion.alias] = (existe, time.monotonic() + VALIDEZ_COMPROBACION)
+
+
+def crear_indice(conexion=connection):
+    """Crea la tabla del índice si el motor lo soporta. Devuelve True si existe."""
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_SQLITE} "
+                f"USING fts5(titulo, contenido, autor, tokenize='unicode61 remove_diacritics 2')"
+            )
+        elif conexion.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABLA_POSTGRES} ("
+                f"post_id bigint PRIMARY KEY REFERENCES blog_post (id) ON DELETE CASCADE, "
+                f"documento tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TABLA_POSTGRES}_documento "
+                f"ON {TABLA_POSTGRES} USING GIN (documento)"
+            )
+        else:
+            return False
+    _recordar(conexion, True)
+    return True
+
+
+def eliminar_indice(conexion=connection):
+    """Elimina la tabla del índice"""
+    tabla = _tabla(conexion)
+    if tabla:
+        with conexion.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {tabla}')
+    _recordar(conexion, False)
+
+
+def reconstruir_indice(conexion=connection):
+    """Vacía el índice y lo vuelve a llenar con todos los posts en una sola sentencia"""
+    if not crear_indice(conexion):
+        return False
+
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {TABLA_SQLITE}')
+        else:
+            cursor.execute(f'TRUNCATE {TABLA_POSTGRES}')
+        _copiar_posts(cursor, conexion.vendor)
+    return True
+
+
+def _copiar_posts(cursor, vendor, condicion='', parametros=()):
+    """
+    Copia al índice, en una sola sentencia, los posts que cumplen
+    `condicion` (sobre blog_post p), con el nombre de usuario del autor
+    """
+    donde = f' WHERE {condicion}' if condicion else ''
+    if vendor == 'sqlite':
+        if condicion:
+            cursor.execute(
+                f'DELETE FROM {TABLA_SQLITE} WHERE rowid IN (SELECT p.id FROM blog_post p{donde})',
+                parametros,
+            )
+        cursor.execute(
+            f"INSERT INTO {TABLA_SQLITE} (rowid, titulo, contenido, autor) "
+            f"SELECT p.id, p.titulo, p.contenido, u.username "
+            f"FROM blog_post p INNER JOIN auth_user u ON u.id = p.autor_id{donde}",
+            parametros,
+        )
+    else:
+        cursor.execute(
+            f"INSERT INTO {TABLA_POSTGRES} (post_id, documento) "
+            f"SELECT p.id, "
+            f"setweight(to_tsvector(%s, p.titulo), 'A') || "
+            f"setweight(to_tsvector('simple', u.username), 'B') || "
+            f"setweight(to_tsvector(%s, p.contenido), 'C') "
+            f"FROM blog_post p INNER JOIN auth_user u ON u.id = p.autor_id{donde} "
+            f"ON CONFLICT (post_id) DO UPDATE SET documento = EXCLUDED.documento",
+            [_configuracion_postgres(), _configuracion_postgres(), *parametros],
+        )
+
+
+def indexar_post(post):
+    """Inserta o actualiza un post en el índice (el autor se lee en la misma sentencia)"""
+    if not indice_disponible():
+        return
+    with connection.cursor() as cursor:
+        _copiar_posts(cursor, connection.vendor, 'p.id = %s', [post.pk])
+
+
+def indexar_posts_de_autor(usuario_id):
+    """Vuelve a indexar los posts de un autor (al cambiar su nombre de usuario)"""
+    if not indice_disponible():
+        return
+    with connection.cursor() as cursor:
+        _copiar_posts(cursor, connection.vendor, 'p.autor_id = %s', [usuario_id])
+
+
+def desindexar_post(post_id):
+    """Quita un post del índice"""
+    if not indice_disponible():
+        return
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {TABLA_SQLITE} WHERE rowid = %s', [post_id])
+        else:
+            cursor.execute(f'DELETE FROM {TABLA_POSTGRES} WHERE post_id = %s', [post_id])
+
+
+def _terminos(texto):
+    return re.findall(r'\w+', texto.lower())
+
+
+def filtrar_posts(posts, texto, relevancia=True):
+    """
+    Filtra el queryset de posts (o de tarjetas, con el id del post como
+    clave primaria) con el índice y, si se pide `relevancia` (solo
+    tarjetas), anota `relevancia` (mayor es mejor) para ordenar por ella.
+    Devuelve None si el índice no está disponible.
+    """
+    terminos = _terminos(texto)
+    if not terminos or not indice_disponible():
+        return None
+
+    if connection.vendor == 'sqlite':
+        # Cada término como prefijo: "djan" encuentra "django"
+        consulta = ' '.join(f'"{termino}"*' for termino in terminos)
+        if relevancia:
+            # Join con el índice (TarjetaPost.indice): la búsqueda se hace
+            # una vez. Una subconsulta correlacionada para la relevancia la
+            # repetiría por cada fila (segundos con términos frecuentes).
+            # bm25 devuelve valores negativos: cuanto menor, más relevante.
+            # Pesos por columna: titulo, contenido, autor.
+            return posts.filter(indice__documento__coincide=consulta).annotate(
+                relevancia=-Func(
+                    F('indice__documento'), Value(10.0), Value(1.0), Value(5.0),
+                    function='bm25', output_field=FloatField(),
+                ),
+            )
+        coincidencias = RawSQL(
+            f'SELECT rowid FROM {TABLA_SQLITE} WHERE {TABLA_SQLITE} MATCH %s',
+            (consulta,),
+        )
+    else:
+        consulta = ' & '.join(f'{termino}:*' for termino in terminos)
+        config = _configuracion_postgres()
+        coincidencias = RawSQL(
+            f'SELECT post_id FROM {TABLA_POSTGRES} WHERE documento @@ to_tsquery(%s, %s)',
+            (config, consulta),
+        )
+        if relevancia:
+            # Por clave primaria: ts_rank no repite la búsqueda en el índice GIN
+            id_post = f'{posts.model._meta.db_table}.{posts.model._meta.pk.column}'
+            posts = posts.annotate(relevancia=RawSQL(
+                f'SELECT ts_rank(documento, to_tsquery(%s, %s)) FROM {TABLA_POSTGRES} '
+                f'WHERE post_id = {id_post}',
+                (config, consulta),
+            ))
+
+    # Subconsulta independiente: la búsqueda en el índice se hace una vez
+    return posts.filter(pk__in=coincidencias)
+
+
+def reconstruir_indice_seguro(conexion=connection):
+    """Como reconstruir_indice, pero sin fallar si el motor no soporta el índice"""
+    try:
+        with transaction.atomic(using=conexion.alias):
+            return reconstruir_indice(conexion)
+    except DatabaseError:
+        _recordar(conexion, False)
+        return False
@@ -0,0 +1,98 @@
+"""
+GET condicional (ETag y Last-Modified) del detalle y del listado de posts.
+
+Las vistas calculan los validadores con consultas pequeñas antes de
+renderizar. Si la copia del cliente (If-None-Match / If-Modified-Since)
+sigue valiendo, responden 304 sin renderizar la plantilla.
+
+- Last-Modified: la fecha_actualizacion más reciente de lo que muestra la
+  página.
+- ETag: resumen de todo lo demás que cambia la página sin mover
+  fecha_actualizacion: las visitas, las variantes de imagen, las versiones
+  de la caché de fragmentos (categorías renombradas, posts borrados o
+  despublicados), si el usuario es el autor o ha iniciado sesión, y el
+  contenido de las plantillas.
+
+El ETag es débil (W/"...") porque la página es equivalente, no idéntica
+byte a byte, y porque Nginx conserva los ETag débiles al comprimir con gzip
+(los fuertes los debilita o los quita). Si el cliente envía los dos
+validadores, Django da prioridad a If-None-Match.
+"""
+import functools
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib import messages
+from django.template import loader
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import fragmentos
+
+PLANTILLAS = ('base.html', 'blog/lista_posts.html', 'blog/detalle_post.html')
+
+
+@functools.cache
+def version_plantillas():
+    """
+    Resumen de las plantillas de las páginas, para que un despliegue que las
+    cambie no dé por buenas las copias anteriores. BLOG_ETAG_VERSION permite
+    invalidarlas también cuando cambia el código.
+    """
+    resumen = hashlib.md5(str(getattr(settings, 'BLOG_ETAG_VERSION', '')).encode())
+    for nombre in PLANTILLAS:
+        resumen.update(Path(loader.get_template(nombre).origin.name).read_bytes())
+    return resumen.hexdigest()
+
+
+def etiqueta(*partes):
+    """ETag débil a partir de los valores de los que depende la página"""
+    resumen = hashlib.md5(repr((version_plantillas(), *partes)).encode()).hexdigest()
+    return f'W/"{resumen}"'
+
+
+def validadores_detalle(post, relacionados, usuario):
+    """(etag, última modificación) de detalle_post"""
+    ultima = max([post.fecha_actualizacion, *(relacionado.fecha_actualizacion for relacionado in relacionados)])
+    etag = etiqueta(
+        post.pk,
+        post.fecha_actualizacion,
+        post.visitas,
+        post.imagen_anchos,
+        post.autor.get_full_name() or post.autor.username,
+        post.categoria.nombre if post.categoria else None,
+        [(relacionado.pk, relacionado.fecha_actualizacion) for relacionado in relacionados],
+        usuario.pk == post.autor_id,
+    )
+    return etag, ultima
+
+
+def validadores_listado(ultima, ambito, usuario):
+    """
+    (etag, última modificación) de lista_posts. `ultima` es la
+    fecha_actualizacion más reciente de los posts filtrados (ver
+    consultas.ultima_actualizacion) y `ambito`, el de las tarjetas.
+    """
+    # 'visitas' cambia en cada volcado del contador (ver blog/visitas.py)
+    versiones = fragmentos.versiones([ambito, 'categorias', 'visitas'])
+    return etiqueta(ultima, versiones, usuario.is_authenticated), ultima
+
+
+def responder(request, etag, ultima):
+    """Respuesta 304 (o 412) si la copia del cliente sigue valiendo; si no, None"""
+    if len(messages.get_messages(request)):
+        # Los mensajes pendientes solo se ven si se renderiza la página
+        return None
+    respuesta = get_conditional_response(
+        request, etag=etag, last_modified=int(ultima.timestamp()) if ultima else None
+    )
+    return anotar(respuesta, etag, ultima) if respuesta is not None else None
+
+
+def anotar(respuesta, etag, ultima):
+    """Añade las cabeceras ETag y Last-Modified a la respuesta"""
+    respuesta.headers['ETag'] = etag
+    if ultima:
+        respuesta.headers['Last-Modified'] = http_date(ultima.timestamp())
+    return respuesta
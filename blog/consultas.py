@@ -0,0 +1,100 @@
+"""
+Consultas que usan las vistas del blog.
+
+Están separadas de las vistas para que el comando `verificar_planes` pueda
+construir exactamente los mismos querysets y revisar su plan de ejecución.
+"""
+from django.db.models import Q
+
+from . import busqueda
+from .models import Categoria, Post, TarjetaPost
+
+# Columnas grandes que solo necesita el detalle del post
+CAMPOS_CUERPO = ('contenido', 'contenido_html')
+
+
+def posts_del_listado(query=None, categoria_id=None, orden='recientes'):
+    """
+    Tarjetas (TarjetaPost) de los posts publicados del listado, filtradas y
+    ordenadas. Devuelve (posts, con_relevancia).
+    """
+    # Una sola tabla con lo que muestran las tarjetas (ver blog/tarjetas.py)
+    posts = TarjetaPost.objects.filter(publicado=True)
+
+    # Búsqueda: índice de texto completo, o icontains si no está disponible.
+    # La relevancia solo se calcula si se ordena por ella.
+    con_relevancia = False
+    if query:
+        encontrados = busqueda.filtrar_posts(posts, query, relevancia=orden == 'relevancia')
+        if encontrados is not None:
+            posts = encontrados
+            con_relevancia = True
+        else:
+            posts = posts.filter(
+                Q(titulo__icontains=query) |
+                Q(post__contenido__icontains=query) |
+                Q(autor__username__icontains=query)
+            )
+
+    if categoria_id:
+        posts = posts.filter(categoria_id=categoria_id)
+
+    if orden == 'relevancia' and con_relevancia:
+        posts = posts.order_by('-relevancia', '-fecha_creacion')
+    elif orden == 'antiguos':
+        posts = posts.order_by('fecha_creacion')
+    elif orden == 'populares':
+        posts = posts.order_by('-visitas')
+    elif orden == 'tendencias':
+        # Los posts aún sin puntuación (ver blog/tendencias.py) no aparecen
+        posts = posts.filter(puntuacion_tendencia__isnull=False).order_by('-puntuacion_tendencia')
+    else:
+        posts = posts.order_by('-fecha_creacion')
+
+    return posts, con_relevancia
+
+
+def ultima_actualizacion(posts):
+    """
+    fecha_actualizacion más reciente de los posts del listado (para
+    Last-Modified, ver blog/condicional.py), con `.first()`
+    """
+    return posts.order_by('-fecha_actualizacion').values_list('fecha_actualizacion', flat=True)
+
+
+def categorias_sidebar():
+    """Categorías ordenadas por número de posts publicados"""
+    # Contador desnormalizado: sin GROUP BY sobre la tabla de posts
+    return Categoria.objects.order_by('-total_publicados')
+
+
+def buscar_relacionados(post, cantidad=3):
+    """
+    Posts más parecidos al post, precalculados por `calcular_relacionados`.
+    Mientras no estén calculados, otros posts de su categoría (si la tiene).
+    """
+    relacionados = list(vecinos_calculados(post, cantidad))
+    if not relacionados and post.categoria_id:
+        relacionados = list(relacionados_por_categoria(post, cantidad))
+    return relacionados
+
+
+def vecinos_calculados(post, cantidad=3):
+    """Vecinos guardados en PostRelacionado, en una lectura por índice"""
+    return Post.objects.filter(
+        vecino_de__post=post,
+        publicado=True
+    ).defer(*CAMPOS_CUERPO).order_by('vecino_de__orden')[:cantidad]
+
+
+def relacionados_por_categoria(post, cantidad=3):
+    """Otros posts publicados de la misma categoría"""
+    return Post.objects.filter(
+        categoria_id=post.categoria_id,
+        publicado=True
+    ).exclude(id=post.id).defer(*CAMPOS_CUERPO)[:cantidad]
+
+
+def posts_de_autor(usuario):
+    """Tarjetas de todos los posts de un usuario, del más reciente al más antiguo"""
+    return TarjetaPost.objects.filter(autor=usuario).order_by('-fecha_creacion')
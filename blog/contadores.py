@@ -0,0 +1,69 @@
+"""
+Contador desnormalizado de posts publicados por categoría.
+
+Categoria.total_publicados se ajusta con UPDATEs basados en F() desde las
+señales de Post (crear, publicar, despublicar, cambiar de categoría, borrar).
+Las operaciones en bloque que no disparan señales (QuerySet.update,
+bulk_create) deben llamar a `ajustar` o a `reconciliar` por su cuenta.
+"""
+from collections import Counter
+
+from django.db.models import Count, F
+
+from .models import Categoria, Post
+
+
+def estado(post):
+    """(categoria_id, publicado) del post, sin consultar campos diferidos"""
+    datos = post.__dict__
+    if 'categoria_id' not in datos or 'publicado' not in datos:
+        return None
+    return datos['categoria_id'], datos['publicado']
+
+
+def ajustar(deltas):
+    """Aplica un dict {categoria_id: delta} a los contadores"""
+    for categoria_id, delta in deltas.items():
+        if categoria_id is None or not delta:
+            continue
+        Categoria.objects.filter(pk=categoria_id).update(
+            total_publicados=F('total_publicados') + delta
+        )
+
+
+def deltas_por_cambio(anterior, actual):
+    """Deltas de contador al pasar de un estado (categoria_id, publicado) a otro"""
+    deltas = Counter()
+    if anterior and anterior[1]:
+        deltas[anterior[0]] -= 1
+    if actual and actual[1]:
+        deltas[actual[0]] += 1
+    return deltas
+
+
+def recalcular(categoria_id):
+    """Recalcula el contador de una categoría con un COUNT"""
+    if categoria_id is None:
+        return
+    total = Post.objects.filter(categoria_id=categoria_id, publicado=True).count()
+    Categoria.objects.filter(pk=categoria_id).update(total_publicados=total)
+
+
+def reconciliar():
+    """
+    Corrige los contadores que no coinciden con la base de datos.
+    Devuelve una lista de (categoria, guardado, real) con las diferencias.
+    """
+    reales = dict(
+        Post.objects.filter(publicado=True, categoria__isnull=False)
+        .values_list('categoria_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    diferencias = []
+    for categoria in Categoria.objects.only('id', 'nombre', 'total_publicados'):
+        real = reales.get(categoria.id, 0)
+        if categoria.total_publicados != real:
+            diferencias.append((categoria, categoria.total_publicados, real))
+            Categoria.objects.filter(pk=categoria.pk).update(total_publicados=real)
+    return diferencias
@@ -0,0 +1,41 @@
+"""
+Versiones precalculadas del contenido de un post.
+
+El HTML del detalle y el extracto de los listados se calculan al guardar el
+post (ver Post.save) en lugar de en cada petición con los filtros
+`linebreaks` y `truncatewords|striptags`.
+"""
+from django.utils.html import linebreaks, strip_tags
+from django.utils.text import Truncator
+
+PALABRAS_EXTRACTO = 20
+
+
+def renderizar(contenido):
+    """Devuelve (contenido_html, extracto) a partir del texto del post"""
+    contenido = contenido or ''
+    html = linebreaks(contenido, autoescape=True)
+    extracto = Truncator(strip_tags(contenido)).words(PALABRAS_EXTRACTO)
+    return html, extracto
+
+
+def rellenar(modelo, todos=False, lote=500):
+    """
+    Calcula contenido_html y extracto de los posts ya guardados, por lotes
+    de `lote` posts. Sin `todos`, solo los que aún no tienen HTML.
+    Devuelve el número de posts actualizados.
+    """
+    posts = modelo.objects.order_by('pk').only('pk', 'contenido')
+    if not todos:
+        posts = posts.filter(contenido_html='')
+    actualizados = 0
+    ultimo = 0
+    while True:
+        pendientes = list(posts.filter(pk__gt=ultimo)[:lote])
+        if not pendientes:
+            return actualizados
+        for post in pendientes:
+            post.contenido_html, post.extracto = renderizar(post.contenido)
+        modelo.objects.bulk_update(pendientes, ['contenido_html', 'extracto'])
+        actualizados += len(pendientes)
+        ultimo = pendientes[-1].pk
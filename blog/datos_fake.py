@@ -0,0 +1,250 @@
+"""
+Generación masiva y reproducible de datos fake.
+
+Usado por `generar_datos_fake --bulk`:
+- Los textos se generan con Faker en un pool de procesos, por bloques.
+  Cada bloque tiene su propia semilla derivada de la semilla global, así
+  que con la misma semilla y el mismo tamaño de bloque el resultado es el
+  mismo con cualquier número de procesos.
+- La unicidad de usernames, emails y slugs se resuelve en memoria, sin
+  consultas `exists()`.
+- Las filas se insertan con `bulk_create`, ya con su fecha de creación.
+- Todos los usuarios comparten una contraseña, hasheada una sola vez.
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from faker import Faker
+
+from .contenido import renderizar
+from .models import Categoria, Post
+
+CATEGORIAS = [
+    'Tecnología', 'Programación', 'Diseño', 'Marketing',
+    'Negocios', 'Educación', 'Salud', 'Viajes',
+    'Cocina', 'Deportes', 'Arte', 'Música',
+    'Ciencia', 'Filosofía', 'Historia', 'Literatura'
+]
+
+# Tamaños predefinidos: (usuarios, posts)
+ESCALAS = {
+    'small': (100, 1_000),
+    'medium': (1_000, 100_000),
+    'large': (10_000, 1_000_000),
+}
+
+# Fecha de referencia fija cuando hay semilla, para que las fechas generadas
+# no dependan del día en que se ejecuta
+FECHA_REFERENCIA = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+DOS_ANIOS = 2 * 365 * 24 * 3600
+
+
+def _semilla_bloque(semilla, indice, flujo):
+    """Semilla del bloque `indice`; `flujo` separa usuarios (0) de posts (1)"""
+    if semilla is None:
+        return random.randrange(2 ** 32)
+    return semilla * 1_000_003 + indice * 2 + flujo
+
+
+def _generar_usuarios(semilla, cantidad, referencia):
+    """Datos de `cantidad` usuarios (se ejecuta en un proceso del pool)"""
+    fake = Faker('es_ES')
+    fake.seed_instance(semilla)
+    rng = random.Random(semilla)
+    return [
+        (
+            fake.user_name(),
+            fake.email(),
+            fake.first_name(),
+            fake.last_name(),
+            referencia - timedelta(seconds=rng.randrange(DOS_ANIOS)),
+        )
+        for _ in range(cantidad)
+    ]
+
+
+def _generar_posts(semilla, cantidad, num_autores, num_categorias, referencia):
+    """Datos de `cantidad` posts (se ejecuta en un proceso del pool)"""
+    fake = Faker('es_ES')
+    fake.seed_instance(semilla)
+    rng = random.Random(semilla)
+    filas = []
+    for _ in range(cantidad):
+        fecha_creacion = referencia - timedelta(seconds=rng.randrange(DOS_ANIOS))
+        publicado = rng.random() > 0.2  # 80% de los posts publicados
+        titulo = fake.sentence(nb_words=6).rstrip('.')
+        contenido = '\n\n'.join([
+            fake.paragraph(nb_sentences=5),
+            fake.paragraph(nb_sentences=8),
+            fake.paragraph(nb_sentences=6),
+        ])
+        # bulk_create no pasa por Post.save: el HTML y el extracto se calculan aquí
+        contenido_html, extracto = renderizar(contenido)
+        filas.append({
+            'titulo': titulo,
+            'contenido': contenido,
+            'contenido_html': contenido_html,
+            'extracto': extracto,
+            'autor': rng.randrange(num_autores),
+            # 90% con categoría
+            'categoria': rng.randrange(num_categorias) if rng.random() > 0.1 else None,
+            'fecha_creacion': fecha_creacion,
+            'publicado': publicado,
+            'fecha_publicacion': (
+                fecha_creacion + timedelta(days=rng.randint(0, 30)) if publicado else None
+            ),
+            'visitas': rng.randint(0, 5000) if publicado else 0,
+        })
+    return filas
+
+
+def _en_pool(pool, funcion, trabajos, en_vuelo):
+    """
+    Ejecuta los trabajos en el pool y devuelve los resultados en orden,
+    con como mucho `en_vuelo` bloques pendientes para acotar la memoria.
+    """
+    pendientes = []
+    for argumentos in trabajos:
+        pendientes.append(pool.submit(funcion, *argumentos))
+        if len(pendientes) >= en_vuelo:
+            yield pendientes.pop(0).result()
+    for futuro in pendientes:
+        yield futuro.result()
+
+
+def _bloques(total, tamano):
+    for inicio in range(0, total, tamano):
+        yield min(tamano, total - inicio)
+
+
+def _sufijo_slug(valor, numero, max_length):
+    sufijo = f'-{numero}'
+    return valor[:max_length - len(sufijo)] + sufijo
+
+
+def _sufijo_username(valor, numero, max_length):
+    sufijo = str(numero)
+    return valor[:max_length - len(sufijo)] + sufijo
+
+
+def _sufijo_email(valor, numero, max_length):
+    local, _, dominio = valor.partition('@')
+    return f'{local}{numero}@{dominio}'
+
+
+def unico(valor, usados, max_length, sufijo=_sufijo_slug):
+    """Devuelve `valor` o `valor-N`, el primero que no esté en `usados`, y lo reserva"""
+    candidato = valor[:max_length]
+    numero = 1
+    while candidato in usados:
+        candidato = sufijo(valor, numero, max_length)
+        numero += 1
+    usados.add(candidato)
+    return candidato
+
+
+@contextmanager
+def fechas_manuales(modelo):
+    """Desactiva auto_now/auto_now_add para poder insertar fechas propias"""
+    campos = [
+        campo for campo in modelo._meta.concrete_fields
+        if getattr(campo, 'auto_now', False) or getattr(campo, 'auto_now_add', False)
+    ]
+    originales = [(campo, campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in originales:
+            campo.auto_now = auto_now
+            campo.auto_now_add = auto_now_add
+
+
+def crear_categorias(semilla=None):
+    fake = Faker('es_ES')
+    fake.seed_instance(semilla)
+    categorias = []
+    for nombre in CATEGORIAS:
+        categoria, _ = Categoria.objects.get_or_create(
+            nombre=nombre,
+            defaults={'descripcion': fake.text(max_nb_chars=200)}
+        )
+        categorias.append(categoria)
+    return categorias
+
+
+def crear_usuarios(cantidad, password, procesos, semilla=None, lote=2000, referencia=None, progreso=None):
+    """Crea los usuarios en bloque. Devuelve la lista de ids creados."""
+    referencia = referencia or timezone.now()
+    password_hash = make_password(password)
+    usernames = set(User.objects.values_list('username', flat=True).iterator())
+    emails = set(User.objects.values_list('email', flat=True).iterator())
+
+    trabajos = (
+        (_semilla_bloque(semilla, indice, 0), tamano, referencia)
+        for indice, tamano in enumerate(_bloques(cantidad, lote))
+    )
+    ids = []
+    with crear_pool(procesos) as pool:
+        for filas in _en_pool(pool, _generar_usuarios, trabajos, procesos * 2):
+            usuarios = [
+                User(
+                    username=unico(username, usernames, 150, _sufijo_username),
+                    email=unico(email, emails, 254, _sufijo_email),
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=password_hash,
+                    is_active=True,
+                    date_joined=date_joined,
+                )
+                for username, email, first_name, last_name, date_joined in filas
+            ]
+            with transaction.atomic():
+                ids.extend(usuario.pk for usuario in User.objects.bulk_create(usuarios))
+            if progreso:
+                progreso(len(ids), cantidad)
+    return ids
+
+
+def crear_posts(cantidad, autores_ids, categorias, procesos, semilla=None, lote=2000, referencia=None, progreso=None):
+    """Crea los posts en bloque. Devuelve el número de posts creados."""
+    referencia = referencia or timezone.now()
+    slugs = set(Post.objects.values_list('slug', flat=True).iterator())
+    max_slug = Post._meta.get_field('slug').max_length
+
+    trabajos = (
+        (_semilla_bloque(semilla, indice, 1), tamano, len(autores_ids), len(categorias), referencia)
+        for indice, tamano in enumerate(_bloques(cantidad, lote))
+    )
+    creados = 0
+    with fechas_manuales(Post), crear_pool(procesos) as pool:
+        for filas in _en_pool(pool, _generar_posts, trabajos, procesos * 2):
+            posts = []
+            for fila in filas:
+                fila['slug'] = unico(slugify(fila['titulo']) or 'post', slugs, max_slug)
+                fila['autor_id'] = autores_ids[fila.pop('autor')]
+                indice_categoria = fila.pop('categoria')
+                fila['categoria_id'] = None if indice_categoria is None else categorias[indice_categoria].pk
+                fila['fecha_actualizacion'] = fila['fecha_creacion']
+                posts.append(Post(**fila))
+            with transaction.atomic():
+                Post.objects.bulk_create(posts)
+            creados += len(posts)
+            if progreso:
+                progreso(creados, cantidad)
+    return creados
+
+
+def crear_pool(procesos):
+    # Los procesos hijos no usan la base de datos, pero no deben heredar
+    # conexiones abiertas
+    connections.close_all()
+    return ProcessPoolExecutor(max_workers=procesos)
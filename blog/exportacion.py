@@ -0,0 +1,358 @@
+"""
+Exportación e importación de posts en streaming (JSON Lines o CSV), para
+mover el contenido del blog entre entornos sin cargar tablas enteras en
+memoria como hacen `dumpdata` / `loaddata`.
+
+JSON Lines: un registro por línea, con su `tipo`. Primero las categorías
+y los autores de los posts, después los posts:
+- {"tipo": "categoria", "nombre": ..., "descripcion": ...}
+- {"tipo": "autor", "username": ..., "first_name": ..., ...}
+- {"tipo": "post", "slug": ..., "autor": <username>, "categoria": <nombre>, ...}
+
+CSV: solo los posts, una fila por post con COLUMNAS_POST. Al importarlo,
+los autores y las categorías que no existan se crean solo con su nombre.
+
+Importación:
+- Los posts se identifican por slug: si ya existe se actualiza (INSERT ...
+  ON CONFLICT), así que importar dos veces el mismo archivo no duplica nada.
+- Autores y categorías se traducen a los ids de este entorno con
+  diccionarios en memoria (una entrada por username o nombre, no por post).
+  Los autores nuevos se crean sin contraseña utilizable.
+- Cada lote se guarda en una transacción (los posts con sus tarjetas) y
+  después se anota en el archivo de progreso cuántos registros hay
+  guardados: una importación interrumpida sigue tras el último lote.
+- La puntuación de tendencia se calcula al importar, como con
+  `calcular_tendencias --completo`. bulk_create no dispara señales: al
+  terminar se recalculan los contadores de categorías y el índice de
+  búsqueda.
+
+Las imágenes se exportan solo por nombre; los archivos de MEDIA_ROOT se
+copian aparte.
+"""
+import csv
+import json
+import os
+from datetime import datetime
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import reset_queries, transaction
+from django.db.models import Exists, OuterRef
+from django.utils.dateparse import parse_datetime
+
+from . import busqueda, contadores, fragmentos, tarjetas, tendencias
+from .contenido import renderizar
+from .datos_fake import fechas_manuales
+from .models import Categoria, Post
+
+COLUMNAS_CATEGORIA = ['nombre', 'descripcion']
+COLUMNAS_AUTOR = ['username', 'first_name', 'last_name', 'email']
+COLUMNAS_POST = [
+    'slug', 'titulo', 'contenido', 'autor', 'categoria', 'publicado', 'fecha_creacion',
+    'fecha_publicacion', 'fecha_actualizacion', 'visitas', 'imagen', 'imagen_anchos',
+]
+# Campos que no pueden faltar ni estar vacíos en cada tipo de registro
+OBLIGATORIOS = {
+    'categoria': ['nombre'],
+    'autor': ['username'],
+    'post': ['slug', 'titulo', 'autor', 'fecha_creacion'],
+}
+# Columnas de COLUMNAS_POST que no son campos de Post
+REFERENCIAS = {'autor': 'autor__username', 'categoria': 'categoria__nombre'}
+
+# Campos que el upsert sobrescribe en los posts que ya existen
+CAMPOS_ACTUALIZADOS = [
+    'titulo', 'contenido', 'contenido_html', 'extracto', 'autor', 'categoria', 'publicado',
+    'fecha_creacion', 'fecha_publicacion', 'fecha_actualizacion', 'visitas', 'imagen', 'imagen_anchos',
+    'puntuacion_tendencia', 'visitas_puntuadas',
+]
+
+FORMATOS = ('jsonl', 'csv')
+
+
+def formato_de(archivo):
+    return 'csv' if archivo.lower().endswith('.csv') else 'jsonl'
+
+
+# Exportación
+
+def registros(posts=None, lote=2000, referencias=True):
+    """
+    Registros a exportar (dicts con `tipo`) de los posts del queryset, leídos
+    con `.iterator()`: la memoria no depende del número de posts.
+    """
+    posts = Post.objects.all() if posts is None else posts
+    if referencias:
+        categorias = Categoria.objects.order_by('pk').values_list(*COLUMNAS_CATEGORIA)
+        for fila in categorias.iterator(chunk_size=lote):
+            yield {'tipo': 'categoria', **dict(zip(COLUMNAS_CATEGORIA, fila))}
+        autores = User.objects.filter(Exists(posts.filter(autor=OuterRef('pk'))))
+        for fila in autores.order_by('pk').values_list(*COLUMNAS_AUTOR).iterator(chunk_size=lote):
+            yield {'tipo': 'autor', **dict(zip(COLUMNAS_AUTOR, fila))}
+    campos = [REFERENCIAS.get(columna, columna) for columna in COLUMNAS_POST]
+    for fila in posts.order_by('pk').values_list(*campos).iterator(chunk_size=lote):
+        yield {'tipo': 'post', **dict(zip(COLUMNAS_POST, fila))}
+
+
+def _a_json(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    raise TypeError(f'{type(valor).__name__} no se puede exportar')
+
+
+def escribir_jsonl(registros, salida):
+    """Escribe los registros, uno por línea. Devuelve cuántos posts escribió."""
+    posts = 0
+    for registro in registros:
+        salida.write(json.dumps(registro, ensure_ascii=False, default=_a_json) + '\n')
+        posts += registro['tipo'] == 'post'
+    return posts
+
+
+def _a_celda(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return '1' if valor else '0'
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, list):
+        return json.dumps(valor)
+    return valor
+
+
+def escribir_csv(registros, salida):
+    """Escribe las filas de los posts con cabecera. Devuelve cuántos posts escribió."""
+    escritor = csv.writer(salida)
+    escritor.writerow(COLUMNAS_POST)
+    posts = 0
+    for registro in registros:
+        if registro['tipo'] == 'post':
+            escritor.writerow([_a_celda(registro[columna]) for columna in COLUMNAS_POST])
+            posts += 1
+    return posts
+
+
+# Importación
+
+def leer_jsonl(entrada, saltar=0):
+    """Registros del archivo, sin decodificar los `saltar` primeros"""
+    for linea in entrada:
+        if not linea.strip():
+            continue
+        if saltar:
+            saltar -= 1
+            continue
+        yield json.loads(linea)
+
+
+def leer_csv(entrada, saltar=0):
+    filas = csv.DictReader(entrada)
+    for fila in filas:
+        if saltar:
+            saltar -= 1
+            continue
+        yield {'tipo': 'post', **fila}
+
+
+def _fecha(valor):
+    if not valor:
+        return None
+    return valor if isinstance(valor, datetime) else parse_datetime(valor)
+
+
+def validar(registro):
+    """Comprueba el tipo y los campos obligatorios del registro (ValueError si no valen)"""
+    tipo = registro.get('tipo')
+    if tipo not in OBLIGATORIOS:
+        raise ValueError(f'tipo {tipo!r} desconocido')
+    vacios = [campo for campo in OBLIGATORIOS[tipo] if not registro.get(campo)]
+    if vacios:
+        raise ValueError(f'faltan campos obligatorios: {", ".join(vacios)}')
+    if tipo == 'post' and _fecha(registro['fecha_creacion']) is None:
+        raise ValueError(f'fecha_creacion {registro["fecha_creacion"]!r} no es una fecha')
+
+
+def _booleano(valor):
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() in ('1', 'true', 'si', 'sí')
+
+
+def _anchos(valor):
+    if isinstance(valor, list):
+        return valor
+    return json.loads(valor) if valor else []
+
+
+def leer_progreso(ruta, archivo):
+    """Registros ya importados de `archivo` según el archivo de progreso (0 si no hay)"""
+    try:
+        with open(ruta, encoding='utf-8') as entrada:
+            progreso = json.load(entrada)
+    except FileNotFoundError:
+        return 0
+    if progreso.get('archivo') != os.path.abspath(archivo) or progreso.get('tamano') != os.path.getsize(archivo):
+        raise ValueError(f'{ruta} es de otro archivo o el archivo ha cambiado')
+    return progreso['registros']
+
+
+def guardar_progreso(ruta, archivo, registros):
+    # Escritura atómica: una interrupción a medias deja el progreso anterior
+    temporal = f'{ruta}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as salida:
+        json.dump({
+            'archivo': os.path.abspath(archivo),
+            'tamano': os.path.getsize(archivo),
+            'registros': registros,
+        }, salida)
+    os.replace(temporal, ruta)
+
+
+class Importador:
+    """
+    Guarda los registros por lotes de `lote`. `al_guardar(leidos)` se llama
+    tras el commit de cada lote con el total de registros guardados.
+    """
+    GUARDAR = {'categoria': 'guardar_categorias', 'autor': 'guardar_autores', 'post': 'guardar_posts'}
+
+    def __init__(self, lote=1000, al_guardar=None):
+        self.lote = lote
+        self.al_guardar = al_guardar
+        # username / nombre -> id en esta base de datos
+        self.autores = {}
+        self.categorias = dict(Categoria.objects.values_list('nombre', 'pk'))
+        self.leidos = 0
+        self.posts = 0
+
+    def importar(self, registros, ya_importados=0):
+        """Devuelve el número de posts importados en esta ejecución"""
+        self.leidos = ya_importados
+        bloque, tipo_bloque = [], None
+        for registro in registros:
+            # Antes de guardar nada del lote: un registro incompleto haría
+            # fallar el INSERT de todo el lote con un IntegrityError
+            try:
+                validar(registro)
+            except ValueError as error:
+                raise ValueError(f'registro {self.leidos + len(bloque) + 1}: {error}') from None
+            tipo = registro['tipo']
+            # Cada lote es de un solo tipo: los autores y categorías se
+            # guardan antes que los posts que los usan
+            if bloque and (tipo != tipo_bloque or len(bloque) >= self.lote):
+                self.guardar(tipo_bloque, bloque)
+                bloque = []
+            tipo_bloque = tipo
+            bloque.append(registro)
+        if bloque:
+            self.guardar(tipo_bloque, bloque)
+        return self.posts
+
+    def guardar(self, tipo, bloque):
+        try:
+            getattr(self, self.GUARDAR[tipo])(bloque)
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f'registros {self.leidos + 1}-{self.leidos + len(bloque)}: {error!r}') from error
+        self.leidos += len(bloque)
+        # Con DEBUG, Django guarda el SQL de cada consulta (con los posts
+        # enteros de cada INSERT): la memoria crecería con cada lote
+        reset_queries()
+        if self.al_guardar:
+            self.al_guardar(self.leidos)
+
+    def guardar_categorias(self, bloque):
+        with transaction.atomic():
+            Categoria.objects.bulk_create(
+                [Categoria(nombre=fila['nombre'], descripcion=fila.get('descripcion') or '') for fila in bloque],
+                update_conflicts=True, unique_fields=['nombre'], update_fields=['descripcion'],
+            )
+        self.categorias.update(
+            Categoria.objects.filter(nombre__in=[fila['nombre'] for fila in bloque]).values_list('nombre', 'pk')
+        )
+
+    def guardar_autores(self, bloque):
+        # Los usuarios que ya existen no se tocan
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=fila['username'],
+                        first_name=fila.get('first_name') or '',
+                        last_name=fila.get('last_name') or '',
+                        email=fila.get('email') or '',
+                        password=make_password(None),
+                    )
+                    for fila in bloque
+                ],
+                ignore_conflicts=True,
+            )
+        self.autores.update(
+            User.objects.filter(username__in=[fila['username'] for fila in bloque]).values_list('username', 'pk')
+        )
+
+    def ids_autores(self, usernames):
+        nuevos = set(usernames) - self.autores.keys()
+        if nuevos:
+            self.autores.update(User.objects.filter(username__in=nuevos).values_list('username', 'pk'))
+            if nuevos - self.autores.keys():
+                # Sin registro de autor (CSV): se crean solo con el username
+                self.guardar_autores([{'username': username} for username in nuevos - self.autores.keys()])
+        return self.autores
+
+    def ids_categorias(self, nombres):
+        nuevas = set(nombres) - self.categorias.keys()
+        if nuevas:
+            with transaction.atomic():
+                Categoria.objects.bulk_create([Categoria(nombre=nombre) for nombre in nuevas], ignore_conflicts=True)
+            self.categorias.update(Categoria.objects.filter(nombre__in=nuevas).values_list('nombre', 'pk'))
+        return self.categorias
+
+    def guardar_posts(self, bloque):
+        autores = self.ids_autores(fila['autor'] for fila in bloque)
+        categorias = self.ids_categorias(fila['categoria'] for fila in bloque if fila.get('categoria'))
+        # Un slug repetido en el mismo INSERT ... ON CONFLICT falla en
+        # PostgreSQL: se queda la última versión
+        posts = {}
+        for fila in bloque:
+            contenido_html, extracto = renderizar(fila.get('contenido') or '')
+            fecha_creacion = _fecha(fila['fecha_creacion'])
+            fecha_publicacion = _fecha(fila.get('fecha_publicacion'))
+            publicado = _booleano(fila.get('publicado', False))
+            visitas = int(fila.get('visitas') or 0)
+            posts[fila['slug']] = Post(
+                slug=fila['slug'],
+                titulo=fila['titulo'],
+                contenido=fila.get('contenido') or '',
+                contenido_html=contenido_html,
+                extracto=extracto,
+                autor_id=autores[fila['autor']],
+                categoria_id=categorias[fila['categoria']] if fila.get('categoria') else None,
+                publicado=publicado,
+                fecha_creacion=fecha_creacion,
+                fecha_publicacion=fecha_publicacion,
+                fecha_actualizacion=_fecha(fila.get('fecha_actualizacion')) or fecha_creacion,
+                visitas=visitas,
+                imagen=fila.get('imagen') or '',
+                imagen_anchos=_anchos(fila.get('imagen_anchos')),
+                puntuacion_tendencia=(
+                    tendencias.puntuacion_inicial(visitas, fecha_publicacion or fecha_creacion)
+                    if publicado else None
+                ),
+                visitas_puntuadas=visitas if publicado else 0,
+            )
+        with fechas_manuales(Post), transaction.atomic():
+            Post.objects.bulk_create(
+                posts.values(), update_conflicts=True, unique_fields=['slug'], update_fields=CAMPOS_ACTUALIZADOS,
+            )
+            tarjetas.copiar(Post.objects.filter(slug__in=posts.keys()))
+        self.posts += len(bloque)
+
+
+def terminar_importacion():
+    """Lo que las señales de Post habrían mantenido al guardar uno a uno"""
+    contadores.reconciliar()
+    busqueda.reconstruir_indice_seguro()
+    fragmentos.invalidar(
+        'global', 'categorias',
+        *(fragmentos.ambito_categoria(pk) for pk in Categoria.objects.values_list('pk', flat=True))
+    )
@@ -0,0 +1,28 @@
+from django import forms
+from django.core.exceptions import ValidationError
+
+from .models import Post
+
+
+class PostForm(forms.ModelForm):
+    """Formulario de creación de posts desde el sitio público"""
+
+    class Meta:
+        model = Post
+        fields = ['titulo', 'categoria', 'contenido', 'publicado']
+
+
+class PostAdminForm(forms.ModelForm):
+    """
+    Formulario del admin. Al crear un post, un slug repetido no es un error:
+    PostAdmin.save_model lo toma como base y guardar_con_slug_unico le añade
+    el siguiente sufijo libre (hola-mundo-1, hola-mundo-2...).
+    """
+
+    def validate_unique(self):
+        if not self.instance._state.adding:
+            return super().validate_unique()
+        try:
+            self.instance.validate_unique(exclude=self._get_validation_exclusions() | {'slug'})
+        except ValidationError as error:
+            self._update_errors(error)
@@ -0,0 +1,95 @@
+"""
+Caché de fragmentos de plantilla con invalidación por versiones.
+
+Cada fragmento depende de uno o más "ámbitos" ('global', 'categorias',
+'categoria:5'...). Cada ámbito tiene un número de versión guardado en la
+caché, y la versión forma parte de la clave del fragmento. Invalidar un
+ámbito es solo incrementar su versión (O(1), sin recorrer claves): las
+entradas viejas dejan de pedirse y caducan solas.
+
+Funciona con cualquier backend de caché. Con LocMem las versiones son
+locales a cada proceso, así que con varios workers conviene una caché
+compartida (Redis, Memcached, base de datos...).
+"""
+import hashlib
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Aciertos y fallos de este proceso, por nombre de fragmento
+aciertos = Counter()
+fallos = Counter()
+
+
+def _clave_version(ambito):
+    return f'blog:version:{ambito}'
+
+
+def _version_inicial():
+    # Si la clave de versión se pierde (expulsión de la caché), la nueva
+    # versión nunca coincide con una anterior
+    return int(time.time() * 1000)
+
+
+def versiones(ambitos):
+    """Versión actual de cada ámbito, en una sola lectura de la caché"""
+    claves = [_clave_version(ambito) for ambito in ambitos]
+    actuales = cache.get_many(claves)
+    resultado = []
+    for clave in claves:
+        version = actuales.get(clave)
+        if version is None:
+            cache.add(clave, _version_inicial(), timeout=None)
+            version = cache.get(clave)
+        resultado.append(version)
+    return resultado
+
+
+def invalidar(*ambitos):
+    """Incrementa la versión de los ámbitos indicados"""
+    for ambito in set(ambitos):
+        clave = _clave_version(ambito)
+        try:
+            cache.incr(clave)
+        except ValueError:
+            cache.add(clave, _version_inicial(), timeout=None)
+
+
+def clave_fragmento(nombre, ambitos, variantes):
+    version = '.'.join(str(v) for v in versiones(ambitos))
+    variantes = hashlib.md5(
+        '|'.join(str(variante) for variante in variantes).encode()
+    ).hexdigest()
+    return f'blog:fragmento:{nombre}:{version}:{variantes}'
+
+
+def obtener(nombre, clave):
+    contenido = cache.get(clave)
+    if contenido is None:
+        fallos[nombre] += 1
+    else:
+        aciertos[nombre] += 1
+    return contenido
+
+
+def guardar(clave, contenido):
+    cache.set(clave, contenido, timeout=getattr(settings, 'BLOG_FRAGMENTOS_TIMEOUT', 60))
+
+
+def estadisticas():
+    """Aciertos, fallos y ratio de aciertos por fragmento en este proceso"""
+    resultado = {}
+    for nombre in sorted(set(aciertos) | set(fallos)):
+        total = aciertos[nombre] + fallos[nombre]
+        resultado[nombre] = {
+            'aciertos': aciertos[nombre],
+            'fallos': fallos[nombre],
+            'ratio': aciertos[nombre] / total if total else 0.0,
+        }
+    return resultado
+
+
+def ambito_categoria(categoria_id):
+    return f'categoria:{categoria_id}' if categoria_id else 'global'
@@ -0,0 +1,143 @@
+"""
+Variantes redimensionadas de Post.imagen.
+
+Por cada ancho de `ANCHOS` menor que el de la imagen original se guardan
+una versión WebP y otra JPEG en un directorio propio de ese original, bajo
+DIRECTORIO_VARIANTES, donde nunca se sube nada:
+
+    blog/imagenes/foto.png -> variantes/blog/imagenes/foto.png/320w.webp, 320w.jpg...
+
+Así, sobrescribir una variante no puede borrar otra imagen subida (por
+ejemplo, una que se llame foto-320w.jpg).
+
+Los anchos generados se guardan en Post.imagen_anchos, que es lo que usa la
+etiqueta `{% imagen_post %}` para el `srcset`, sin consultar el
+almacenamiento en cada petición. Post.imagen_ancho (el ancho del original)
+marca la imagen como procesada, también si es más estrecha que todos los
+ANCHOS y no tiene variantes.
+
+Al subir una imagen las variantes se generan en la cola de tareas (el
+worker `procesar_tareas`), para no alargar la petición; si fallan se
+reintentan. El comando `regenerar_imagenes` las genera en bloque con
+varios procesos.
+"""
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from PIL import Image, ImageOps
+
+from tareas.cola import tarea
+
+from . import fragmentos
+from .models import Post, TarjetaPost
+
+ANCHOS = (320, 640, 1024)
+DIRECTORIO_VARIANTES = 'variantes'
+# extensión -> (formato de Pillow, opciones de guardado)
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def nombre_variante(nombre, ancho, extension):
+    """Ruta de la variante de `ancho` px de la imagen `nombre`"""
+    return posixpath.join(DIRECTORIO_VARIANTES, nombre, f'{ancho}w.{extension}')
+
+
+def generar_variantes(nombre, storage=default_storage):
+    """
+    Genera las variantes de la imagen `nombre` y devuelve (ancho del
+    original, lista de anchos generados). No toca la base de datos.
+    """
+    with storage.open(nombre, 'rb') as archivo, Image.open(archivo) as original:
+        imagen = ImageOps.exif_transpose(original)
+        if imagen.mode not in ('RGB', 'RGBA'):
+            imagen = imagen.convert('RGBA' if 'transparency' in imagen.info else 'RGB')
+        ancho_original = imagen.width
+        anchos = sorted((ancho for ancho in ANCHOS if ancho < ancho_original), reverse=True)
+
+        # De mayor a menor, cada variante se reduce a partir de la anterior
+        for ancho in anchos:
+            alto = max(1, round(imagen.height * ancho / imagen.width))
+            imagen = imagen.resize((ancho, alto), Image.LANCZOS)
+            for extension, (formato, opciones) in FORMATOS.items():
+                salida = imagen if formato != 'JPEG' else imagen.convert('RGB')
+                contenido = BytesIO()
+                salida.save(contenido, formato, **opciones)
+                destino = nombre_variante(nombre, ancho, extension)
+                # Sin borrar antes, el storage guardaría con otro nombre.
+                # En DIRECTORIO_VARIANTES solo hay variantes de `nombre`.
+                storage.delete(destino)
+                storage.save(destino, ContentFile(contenido.getvalue()))
+    return ancho_original, sorted(anchos)
+
+
+def guardar_anchos(post_id, nombre, ancho_original, anchos):
+    """Guarda los anchos generados si el post sigue teniendo la misma imagen"""
+    actualizados = Post.objects.filter(pk=post_id, imagen=nombre).update(
+        imagen_anchos=anchos, imagen_ancho=ancho_original,
+    )
+    if actualizados:
+        TarjetaPost.objects.filter(post_id=post_id, imagen=nombre).update(imagen_anchos=anchos)
+        # Las tarjetas cacheadas del listado pasan a usar el srcset
+        categoria_id = Post.objects.filter(pk=post_id).values_list('categoria_id', flat=True).first()
+        fragmentos.invalidar('global', fragmentos.ambito_categoria(categoria_id))
+    return actualizados
+
+
+@tarea(max_intentos=3)
+def procesar_post(post_id):
+    """Genera las variantes de la imagen actual del post"""
+    nombre = Post.objects.filter(pk=post_id).values_list('imagen', flat=True).first()
+    if nombre:
+        guardar_anchos(post_id, nombre, *generar_variantes(nombre))
+
+
+def _generar_en_proceso(post_id, nombre):
+    """Trabajo de un proceso del pool de regenerar_imagenes"""
+    try:
+        return post_id, nombre, *generar_variantes(nombre), None
+    except Exception as error:
+        return post_id, nombre, None, None, str(error)
+
+
+def regenerar(posts, procesos):
+    """
+    Genera las variantes de los posts (tuplas (id, imagen)) con un pool de
+    procesos. Devuelve un iterador de (post_id, anchos, error).
+    """
+    # Los procesos hijos no usan la base de datos, pero no deben heredar
+    # conexiones abiertas
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [pool.submit(_generar_en_proceso, post_id, nombre) for post_id, nombre in posts]
+        for futuro in futuros:
+            post_id, nombre, ancho_original, anchos, error = futuro.result()
+            if error is None:
+                guardar_anchos(post_id, nombre, ancho_original, anchos)
+            yield post_id, anchos, error
+
+
+def borrar_variantes_antiguas(nombres, storage=default_storage):
+    """
+    Borra las variantes del formato anterior, guardadas junto al original
+    (blog/imagenes/foto-320w.jpg para foto.png), de las imágenes `nombres`.
+    No borra ningún archivo de `nombres`: una imagen subida puede llamarse
+    así. Devuelve cuántos archivos se han borrado.
+    """
+    nombres = set(nombres)
+    borradas = 0
+    for nombre in nombres:
+        raiz, _ = posixpath.splitext(nombre)
+        for ancho in ANCHOS:
+            for extension in FORMATOS:
+                antigua = f'{raiz}-{ancho}w.{extension}'
+                if antigua not in nombres and storage.exists(antigua):
+                    storage.delete(antigua)
+                    borradas += 1
+    return borradas
@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import platform
+import tempfile
+from datetime import datetime
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from blog import datos_fake
+from blog.benchmark import ejecutar_carga, regresiones, resumen_medidas, tabla
+from blog.models import Categoria, Post
+
+PASSWORD = 'bench-contraseña'
+COLUMNAS = ['ruta', 'peticiones', 'por_segundo', 'p50_ms', 'p95_ms', 'p99_ms', 'consultas_media', 'bytes_media', 'errores']
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de carga y latencia de todas las rutas (blog, login y admin) sobre una base '
+        'de datos de prueba con datos generados. Informa peticiones por segundo, p50/p95/p99, '
+        'consultas SQL y bytes por respuesta, y puede compararse con un resultado anterior.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escala',
+            choices=sorted(datos_fake.ESCALAS),
+            default='small',
+            help='Tamaño de los datos generados (por defecto: small)',
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Semilla de los datos (por defecto: 1)')
+        parser.add_argument('--peticiones', type=int, default=100, help='Peticiones por ruta (por defecto: 100)')
+        parser.add_argument('--concurrencia', type=int, default=8, help='Clientes simultáneos (por defecto: 8)')
+        parser.add_argument('--calentamiento', type=int, default=5, help='Peticiones no medidas por ruta (por defecto: 5)')
+        parser.add_argument('--rutas', help='Solo las rutas cuyo nombre empiece por alguno de estos prefijos, separados por comas')
+        parser.add_argument('--json', dest='salida', help='Guardar los resultados en este archivo JSON')
+        parser.add_argument('--comparar', help='Resultado JSON anterior: falla si alguna ruta empeora')
+        parser.add_argument(
+            '--tolerancia',
+            type=float,
+            default=0.25,
+            help='Empeoramiento del p95 admitido al comparar, en tanto por uno (por defecto: 0.25)',
+        )
+        parser.add_argument(
+            '--reutilizar',
+            action='store_true',
+            help='Conservar la base de datos del benchmark y reutilizarla en la siguiente ejecución',
+        )
+
+    def handle(self, *args, **options):
+        base = None
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as archivo:
+                base = json.load(archivo)
+
+        # Base de datos propia: los datos generados no tocan la del proyecto
+        if connection.vendor == 'sqlite' and not connection.settings_dict['TEST'].get('NAME'):
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.gettempdir(), 'blog_bench.sqlite3')
+        nombre_original = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['reutilizar'])
+        try:
+            datos = self.preparar_datos(options)
+            # Las trazas de los errores 500 ya se resumen en la columna "errores"
+            registro = logging.getLogger('django.request')
+            nivel = registro.level
+            registro.setLevel(logging.CRITICAL)
+            try:
+                # Las réplicas no apuntan a la base de datos del benchmark
+                with override_settings(DEBUG=False, REPLICAS=[]):
+                    resultados = self.ejecutar(datos, options)
+            finally:
+                registro.setLevel(nivel)
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0, keepdb=options['reutilizar'])
+            teardown_test_environment()
+
+        informe = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'motor': connection.vendor,
+            'escala': options['escala'],
+            'posts': datos['posts'],
+            'concurrencia': options['concurrencia'],
+            'peticiones': options['peticiones'],
+            'rutas': resultados,
+        }
+        self.stdout.write(tabla(
+            [{'ruta': ruta, **datos_ruta} for ruta, datos_ruta in resultados.items()], COLUMNAS
+        ))
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(informe, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f'✓ Resultados guardados en {options["salida"]}'))
+
+        if base is not None:
+            problemas = regresiones(resultados, base['rutas'], options['tolerancia'])
+            if problemas:
+                for problema in problemas:
+                    self.stdout.write(self.style.ERROR(f'  ✗ {problema}'))
+                raise CommandError(f'{len(problemas)} regresiones respecto a {options["comparar"]}')
+            self.stdout.write(self.style.SUCCESS(f'✓ Sin regresiones respecto a {options["comparar"]}'))
+
+    def preparar_datos(self, options):
+        """Genera los datos si la base de datos está vacía y elige los de cada ruta"""
+        if not Post.objects.exists():
+            num_usuarios, num_posts = datos_fake.ESCALAS[options['escala']]
+            semilla = options['seed']
+            procesos = os.cpu_count() or 1
+            self.stdout.write(f'Generando {num_usuarios} usuarios y {num_posts} posts...')
+            categorias = datos_fake.crear_categorias(semilla)
+            autores_ids = datos_fake.crear_usuarios(
+                num_usuarios, PASSWORD, procesos, semilla, referencia=datos_fake.FECHA_REFERENCIA
+            )
+            datos_fake.crear_posts(
+                num_posts, autores_ids, categorias, procesos, semilla, referencia=datos_fake.FECHA_REFERENCIA
+            )
+            User.objects.create(
+                username='bench_admin', password=make_password(PASSWORD), is_staff=True, is_superuser=True
+            )
+            # bulk_create no dispara señales
+            call_command('reconciliar_contadores', stdout=open(os.devnull, 'w'))
+            call_command('calcular_tendencias', '--completo', stdout=open(os.devnull, 'w'))
+            call_command('reconstruir_tarjetas', stdout=open(os.devnull, 'w'))
+            try:
+                call_command('reconstruir_indice_busqueda', stdout=open(os.devnull, 'w'))
+            except CommandError:
+                pass
+            # Estadísticas del planificador, como en una base de datos en uso
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        publicados = Post.objects.filter(publicado=True)
+        autor_id = (
+            publicados.order_by().values('autor_id').annotate(total=Count('id'))
+            .order_by('-total').values_list('autor_id', flat=True).first()
+        )
+        titulo = publicados.order_by('-visitas').values_list('titulo', flat=True).first()
+        return {
+            'posts': Post.objects.count(),
+            'slugs': list(publicados.order_by('-visitas').values_list('slug', flat=True)[:50]),
+            'categoria': Categoria.objects.order_by('-total_publicados').values_list('pk', flat=True).first(),
+            'termino': max(titulo.split(), key=len),
+            'pagina_profunda': max(1, publicados.count() // 9 // 2),
+            'autor': User.objects.get(pk=autor_id),
+            'admin': User.objects.get(username='bench_admin'),
+        }
+
+    def rutas(self, datos):
+        """(nombre, sesión, función índice -> (método, url, datos), estado esperado)"""
+        slugs = datos['slugs']
+        formulario = {
+            'categoria': datos['categoria'],
+            'contenido': 'Contenido generado por el benchmark.\n\nSegundo párrafo.',
+            'publicado': 'on',
+        }
+        return [
+            ('home', 'autor', lambda i: ('get', '/', None), 200),
+            ('lista_posts', None, lambda i: ('get', '/blog/', None), 200),
+            ('lista_posts:busqueda', None, lambda i: ('get', f'/blog/?q={datos["termino"]}', None), 200),
+            ('lista_posts:categoria', None, lambda i: ('get', f'/blog/?categoria={datos["categoria"]}', None), 200),
+            ('lista_posts:populares', None, lambda i: ('get', '/blog/?orden=populares', None), 200),
+            ('lista_posts:tendencias', None, lambda i: ('get', '/blog/?orden=tendencias', None), 200),
+            ('lista_posts:pagina_profunda', None, lambda i: ('get', f'/blog/?page={datos["pagina_profunda"]}', None), 200),
+            ('detalle_post', None, lambda i: ('get', f'/blog/post/{slugs[i % len(slugs)]}/', None), 200),
+            ('crear_post', 'autor', lambda i: ('post', '/blog/crear/', {**formulario, 'titulo': f'Post de benchmark {i}'}), 302),
+            ('mis_posts', 'autor', lambda i: ('get', '/blog/mis-posts/', None), 200),
+            ('login', None, lambda i: ('post', '/login/', {'username': datos['autor'].username, 'password': PASSWORD}), 302),
+            ('admin:post', 'admin', lambda i: ('get', '/admin/blog/post/', None), 200),
+            ('admin:post:busqueda', 'admin', lambda i: ('get', f'/admin/blog/post/?q={datos["termino"]}', None), 200),
+            ('admin:categoria', 'admin', lambda i: ('get', '/admin/blog/categoria/', None), 200),
+            ('admin:usuarios', 'admin', lambda i: ('get', '/admin/auth/user/', None), 200),
+        ]
+
+    def ejecutar(self, datos, options):
+        prefijos = [prefijo.strip() for prefijo in (options['rutas'] or '').split(',') if prefijo.strip()]
+        resultados = {}
+        for nombre, sesion, peticion, esperado in self.rutas(datos):
+            if prefijos and not any(nombre.startswith(prefijo) for prefijo in prefijos):
+                continue
+            self.stdout.write(f'  {nombre}...')
+
+            def preparar(sesion=sesion):
+                # Los errores de la vista se cuentan como respuestas 500 en lugar de abortar
+                cliente = Client(raise_request_exception=False)
+                if sesion:
+                    cliente.force_login(datos[sesion])
+                return cliente
+
+            def pedir(cliente, indice, nombre=nombre, peticion=peticion):
+                metodo, url, formulario = peticion(indice)
+                if nombre == 'login':
+                    # Cada login con un cliente sin sesión
+                    cliente = Client(raise_request_exception=False)
+                return getattr(cliente, metodo)(url, formulario)
+
+            if options['calentamiento']:
+                # Índices negativos: los títulos de crear_post no se repiten al medir
+                ejecutar_carga(
+                    preparar, lambda cliente, i: pedir(cliente, -1 - i),
+                    options['calentamiento'], options['concurrencia'],
+                )
+            medidas, duracion = ejecutar_carga(preparar, pedir, options['peticiones'], options['concurrencia'])
+            resultado = resultados[nombre] = resumen_medidas(medidas, duracion)
+            resultado['errores'] = sum(
+                total for estado, total in resultado['estados'].items() if estado != str(esperado)
+            )
+            if resultado['errores']:
+                self.stdout.write(self.style.WARNING(
+                    f'    ⚠ {resultado["errores"]} respuestas distintas de {esperado}: {resultado["estados"]}'
+                ))
+        return resultados
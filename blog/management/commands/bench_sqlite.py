@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from blog import sqlite
+from blog.benchmark import ejecutar_carga, resumen, tabla
+
+from . import bench
+
+# Peticiones de cada ruta en cada vuelta de la carga mixta: lecturas del
+# listado, detalle (lectura más el INSERT de la visita) y posts nuevos
+MEZCLA = {'lista_posts': 4, 'lista_posts:categoria': 2, 'detalle_post': 4, 'crear_post': 2}
+ESCRITURAS = {'crear_post'}
+
+# CONN_MAX_AGE de cada perfil, como en proyecto/settings.py
+CONN_MAX_AGE = {'desarrollo': 0, 'produccion': 600}
+
+COLUMNAS = ['perfil', 'tipo', 'peticiones', 'por_segundo', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'errores']
+
+
+class Command(bench.Command):
+    help = (
+        'Benchmark de contención de SQLite: la misma carga concurrente de lecturas y escrituras '
+        'con cada perfil de blog/sqlite.py, cada uno sobre una copia de la misma base de datos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--perfiles',
+            default=','.join(sqlite.PERFILES),
+            help=f'Perfiles a comparar, separados por comas (por defecto: {",".join(sqlite.PERFILES)})',
+        )
+        parser.add_argument(
+            '--escala',
+            choices=sorted(bench.datos_fake.ESCALAS),
+            default='small',
+            help='Tamaño de los datos generados (por defecto: small)',
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Semilla de los datos (por defecto: 1)')
+        parser.add_argument('--peticiones', type=int, default=600, help='Peticiones por perfil (por defecto: 600)')
+        parser.add_argument('--concurrencia', type=int, default=8, help='Clientes simultáneos (por defecto: 8)')
+        parser.add_argument('--json', dest='salida', help='Guardar los resultados en este archivo JSON')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('El benchmark de contención solo tiene sentido con SQLite.')
+        perfiles = [perfil.strip() for perfil in options['perfiles'].split(',') if perfil.strip()]
+        for perfil in perfiles:
+            if perfil not in sqlite.PERFILES:
+                raise CommandError(f"Perfil '{perfil}' desconocido. Opciones: {', '.join(sqlite.PERFILES)}")
+        options['reutilizar'] = False
+
+        # Los datos se generan una vez, con el perfil de desarrollo (el
+        # archivo queda sin WAL), y cada perfil trabaja sobre una copia
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.gettempdir(), 'blog_bench_sqlite.sqlite3')
+        nombre_original = connection.settings_dict['NAME']
+        setup_test_environment()
+        with override_settings(SQLITE_PERFIL='desarrollo'):
+            base = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(SQLITE_PERFIL='desarrollo'):
+                datos = self.preparar_datos(options)
+            connections.close_all()
+            # Los errores y las peticiones lentas ya se resumen en la tabla
+            registros = [logging.getLogger(nombre) for nombre in ('django.request', 'monitoreo')]
+            niveles = [registro.level for registro in registros]
+            for registro in registros:
+                registro.setLevel(logging.CRITICAL)
+            resultados = {}
+            try:
+                for perfil in perfiles:
+                    resultados[perfil] = self.ejecutar_perfil(perfil, base, datos, options)
+            finally:
+                for registro, nivel in zip(registros, niveles):
+                    registro.setLevel(nivel)
+                connection.settings_dict['NAME'] = base
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+
+        filas = [
+            {'perfil': perfil, 'tipo': tipo, **datos_tipo}
+            for perfil, resultado in resultados.items()
+            for tipo, datos_tipo in resultado['carga'].items()
+        ]
+        self.stdout.write(tabla(filas, COLUMNAS))
+        if options['salida']:
+            informe = {
+                'escala': options['escala'],
+                'posts': datos['posts'],
+                'concurrencia': options['concurrencia'],
+                'peticiones': options['peticiones'],
+                'perfiles': resultados,
+            }
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(informe, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f'✓ Resultados guardados en {options["salida"]}'))
+
+    def ejecutar_perfil(self, perfil, base, datos, options):
+        """Lanza la carga mixta sobre una copia de la base de datos con el perfil indicado"""
+        copia = f'{os.path.splitext(base)[0]}_{perfil}.sqlite3'
+        shutil.copyfile(base, copia)
+        connection.settings_dict['NAME'] = copia
+        connection.settings_dict['CONN_MAX_AGE'] = CONN_MAX_AGE[perfil]
+        self.stdout.write(f'  {perfil}...')
+        rutas = {nombre: (peticion, esperado) for nombre, _, peticion, esperado in self.rutas(datos)}
+        vuelta = [nombre for nombre, veces in MEZCLA.items() for _ in range(veces)]
+
+        def preparar():
+            cliente = Client(raise_request_exception=False)
+            cliente.force_login(datos['autor'])
+            return cliente
+
+        def pedir(cliente, indice):
+            metodo, url, formulario = rutas[vuelta[indice % len(vuelta)]][0](indice)
+            return getattr(cliente, metodo)(url, formulario)
+
+        try:
+            with override_settings(SQLITE_PERFIL=perfil, DEBUG=False, REPLICAS=[]):
+                configuracion = sqlite.estado(connection)
+                connection.close()
+                medidas, duracion = ejecutar_carga(preparar, pedir, options['peticiones'], options['concurrencia'])
+        finally:
+            connections.close_all()
+            for sufijo in ('', '-wal', '-shm'):
+                if os.path.exists(copia + sufijo):
+                    os.remove(copia + sufijo)
+
+        carga = {}
+        for tipo, incluir in (
+            ('todas', lambda nombre: True),
+            ('lecturas', lambda nombre: nombre not in ESCRITURAS),
+            ('escrituras', lambda nombre: nombre in ESCRITURAS),
+        ):
+            seleccion = [medida for medida in medidas if incluir(vuelta[medida.indice % len(vuelta)])]
+            carga[tipo] = resumen([medida.latencia for medida in seleccion], duracion)
+            carga[tipo]['errores'] = sum(
+                1 for medida in seleccion if medida.estado != rutas[vuelta[medida.indice % len(vuelta)]][1]
+            )
+        return {'pragmas': configuracion, 'carga': carga}
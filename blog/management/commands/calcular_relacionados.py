@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import relacionados
+
+
+class Command(BaseCommand):
+    help = (
+        'Calcula los posts relacionados por similitud de contenido (TF-IDF). '
+        'Por defecto solo recalcula los posts modificados desde el último cálculo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completo',
+            action='store_true',
+            help='Recalcular los vecinos de todos los posts',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        posts, filas = relacionados.calcular(completo=options['completo'])
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {posts} posts recalculados, {filas} relaciones guardadas en {duracion:.1f}s'
+        ))
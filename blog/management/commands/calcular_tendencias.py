@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.tendencias import calcular
+
+
+class Command(BaseCommand):
+    help = (
+        'Actualiza la puntuación de tendencia de los posts (orden=tendencias) con las visitas '
+        'volcadas desde la última ejecución'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completo',
+            action='store_true',
+            help='Recalcular todas las puntuaciones desde cero (tras cambiar BLOG_TENDENCIAS_VIDA_MEDIA)',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=None,
+            help='Repetir el cálculo cada N segundos en lugar de ejecutarlo una vez',
+        )
+
+    def handle(self, *args, **options):
+        if options['intervalo'] is None:
+            total = calcular(completo=options['completo'])
+            self.stdout.write(self.style.SUCCESS(f'✓ {total} puntuaciones de tendencia actualizadas'))
+            return
+
+        if options['completo']:
+            calcular(completo=True)
+        self.stdout.write(f'Calculando tendencias cada {options["intervalo"]} segundos (CTRL+C para salir)...')
+        try:
+            while True:
+                total = calcular()
+                if total:
+                    self.stdout.write(f'  ✓ {total} puntuaciones actualizadas')
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nCálculo detenido.'))
@@ -0,0 +1,139 @@
+import asyncio
+import importlib
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches
+
+from blog.benchmark import resumen, tabla
+from blog.models import Post
+
+COLUMNAS = ['modo', 'peticiones', 'por_segundo', 'p50_ms', 'p95_ms', 'p99_ms']
+
+
+def recargar_urls():
+    """Vuelve a importar las URLs para que apliquen el valor actual de BLOG_VISTAS_ASYNC"""
+    for modulo in ('blog.urls', settings.ROOT_URLCONF):
+        if modulo in sys.modules:
+            importlib.reload(sys.modules[modulo])
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara peticiones por segundo y latencia p99 de las vistas de lectura con WSGI '
+        '(vistas síncronas) y con ASGI (vistas async) bajo la misma carga concurrente'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=400, help='Peticiones por modo (por defecto: 400)')
+        parser.add_argument('--concurrencia', type=int, default=16, help='Peticiones simultáneas (por defecto: 16)')
+        parser.add_argument('--calentamiento', type=int, default=40, help='Peticiones previas no medidas (por defecto: 40)')
+
+    def handle(self, *args, **options):
+        post = Post.objects.filter(publicado=True).order_by('-visitas').only('slug').first()
+        usuario = User.objects.order_by('pk').first()
+        if post is None or usuario is None:
+            raise CommandError(
+                'No hay datos. Genera un conjunto de prueba, por ejemplo: '
+                'python manage.py generar_datos_fake --bulk --escala small --seed 1'
+            )
+
+        rutas = ['/', '/blog/', '/blog/?orden=populares', f'/blog/post/{post.slug}/']
+        aleatorio = random.Random(0)
+        carga = [aleatorio.choice(rutas) for _ in range(options['peticiones'])]
+        calentamiento = [rutas[i % len(rutas)] for i in range(options['calentamiento'])]
+        concurrencia = options['concurrencia']
+
+        self.stdout.write(
+            f'{len(carga)} peticiones por modo, {concurrencia} simultáneas, rutas: {", ".join(rutas)}\n'
+        )
+        filas = []
+        por_ruta = {}
+        ajustes = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'], 'DEBUG': False}
+        try:
+            for modo in ('wsgi', 'asgi'):
+                with override_settings(BLOG_VISTAS_ASYNC=modo == 'asgi', **ajustes):
+                    recargar_urls()
+                    medir = self.medir_wsgi if modo == 'wsgi' else self.medir_asgi
+                    medidas, duracion = medir(usuario, calentamiento, carga, concurrencia)
+                filas.append({'modo': modo, **resumen([latencia for _, latencia in medidas], duracion)})
+                agrupadas = defaultdict(list)
+                for ruta, latencia in medidas:
+                    agrupadas[ruta].append(latencia)
+                por_ruta[modo] = {ruta: resumen(latencias, duracion)['p99_ms'] for ruta, latencias in agrupadas.items()}
+        finally:
+            recargar_urls()
+
+        self.stdout.write(tabla(filas, COLUMNAS))
+        self.stdout.write('\np99 por ruta (ms):')
+        self.stdout.write(tabla(
+            [{'ruta': ruta, 'wsgi': por_ruta['wsgi'].get(ruta, 0.0), 'asgi': por_ruta['asgi'].get(ruta, 0.0)} for ruta in rutas],
+            ['ruta', 'wsgi', 'asgi'],
+        ))
+        wsgi, asgi = filas
+        if wsgi['por_segundo']:
+            self.stdout.write(self.style.SUCCESS(
+                f'\nASGI/WSGI: {asgi["por_segundo"] / wsgi["por_segundo"]:.2f}x peticiones por segundo, '
+                f'p99 {asgi["p99_ms"]:.1f} ms frente a {wsgi["p99_ms"]:.1f} ms'
+            ))
+
+    def medir_wsgi(self, usuario, calentamiento, carga, concurrencia):
+        """Vistas síncronas con el handler WSGI, un hilo por petición simultánea"""
+        clientes = threading.local()
+
+        def pedir(ruta):
+            if not hasattr(clientes, 'cliente'):
+                clientes.cliente = Client()
+                clientes.cliente.force_login(usuario)
+            inicio = time.perf_counter()
+            respuesta = clientes.cliente.get(ruta)
+            latencia = time.perf_counter() - inicio
+            self.comprobar(ruta, respuesta)
+            return ruta, latencia
+
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            list(pool.map(pedir, calentamiento))
+            inicio = time.perf_counter()
+            medidas = list(pool.map(pedir, carga))
+            return medidas, time.perf_counter() - inicio
+
+    def medir_asgi(self, usuario, calentamiento, carga, concurrencia):
+        """Vistas async con el handler ASGI, una tarea por petición simultánea"""
+
+        async def ejecutar():
+            clientes = [AsyncClient() for _ in range(concurrencia)]
+            for cliente in clientes:
+                await cliente.aforce_login(usuario)
+
+            async def trabajador(cliente, pendientes, medidas):
+                while pendientes:
+                    ruta = pendientes.pop()
+                    inicio = time.perf_counter()
+                    respuesta = await cliente.get(ruta)
+                    medidas.append((ruta, time.perf_counter() - inicio))
+                    self.comprobar(ruta, respuesta)
+
+            async def lanzar(rutas):
+                pendientes, medidas = list(reversed(rutas)), []
+                await asyncio.gather(*(trabajador(cliente, pendientes, medidas) for cliente in clientes))
+                return medidas
+
+            await lanzar(calentamiento)
+            inicio = time.perf_counter()
+            medidas = await lanzar(carga)
+            return medidas, time.perf_counter() - inicio
+
+        return asyncio.run(ejecutar())
+
+    def comprobar(self, ruta, respuesta):
+        if respuesta.status_code != 200:
+            raise CommandError(f'{ruta} respondió {respuesta.status_code}')
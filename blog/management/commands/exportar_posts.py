@@ -0,0 +1,45 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import exportacion
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta los posts, sus autores y las categorías como JSON Lines (o solo los posts como CSV), '
+        'leyendo por bloques: la memoria no crece con el número de posts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Archivo de salida (- para la salida estándar)')
+        parser.add_argument(
+            '--formato',
+            choices=exportacion.FORMATOS,
+            help='jsonl o csv (por defecto, según la extensión del archivo; jsonl si no es .csv)',
+        )
+        parser.add_argument('--lote', type=int, default=2000, help='Filas por lectura (por defecto: 2000)')
+        parser.add_argument('--publicados', action='store_true', help='Exportar solo los posts publicados')
+
+    def handle(self, *args, **options):
+        archivo = options['archivo']
+        formato = options['formato'] or exportacion.formato_de(archivo)
+        posts = Post.objects.filter(publicado=True) if options['publicados'] else Post.objects.all()
+        registros = exportacion.registros(posts, options['lote'], referencias=formato == 'jsonl')
+        escribir = exportacion.escribir_csv if formato == 'csv' else exportacion.escribir_jsonl
+
+        inicio = time.perf_counter()
+        if archivo == '-':
+            total = escribir(registros, sys.stdout)
+            # El resumen no puede ir a la salida estándar, que es el archivo
+            informe = self.stderr
+        else:
+            with open(archivo, 'w', encoding='utf-8', newline='') as salida:
+                total = escribir(registros, salida)
+            informe = self.stdout
+        duracion = time.perf_counter() - inicio
+        informe.write(self.style.SUCCESS(
+            f'✓ {total} posts exportados en {duracion:.1f}s ({total / duracion if duracion else 0:.0f} posts/s)'
+        ))
@@ -1,11 +1,15 @@
-from django.core.management.base import BaseCommand
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
-from blog.models import Post, Categoria
+from blog import datos_fake
+from blog.models import Post, Categoria, TarjetaPost
+from blog.slugs import guardar_con_slug_unico
 from faker import Faker
+import os
 import random
-from django.utils.text import slugify
+import time
 from django.utils import timezone
-from datetime import timedelta
+from datetime import timedelta, timezone as dt_timezone
 from pathlib import Path
 
 fake = Faker('es_ES')  # Español de España
@@ -27,11 +31,51 @@ class Command(BaseCommand):
             default=200,
             help='Número de posts a crear (default: 200)',
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Modo masivo: bulk_create por bloques y Faker en varios procesos',
+        )
+        parser.add_argument(
+            '--escala',
+            choices=sorted(datos_fake.ESCALAS),
+            help='Tamaño predefinido (small, medium, large); implica --bulk '
+                 'y sustituye a --usuarios y --posts',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Semilla para generar siempre los mismos datos',
+        )
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos para generar los textos en modo masivo (default: núcleos de la CPU)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=2000,
+            help='Filas por bloque en modo masivo (default: 2000)',
+        )
 
     def handle(self, *args, **options):
+        if options['escala']:
+            options['usuarios'], options['posts'] = datos_fake.ESCALAS[options['escala']]
+            options['bulk'] = True
+
+        if options['bulk']:
+            return self.generar_en_bloque(options)
+
         num_usuarios = options['usuarios']
         num_posts = options['posts']
 
+        if options['seed'] is not None:
+            fake.seed_instance(options['seed'])
+            random.seed(options['seed'])
+
         self.stdout.write(self.style.SUCCESS('Iniciando generación de datos fake...'))
 
         # Crear categorías
@@ -88,7 +132,7 @@ class Command(BaseCommand):
                 first_name=first_name,
                 last_name=last_name,
                 is_active=True,
-                date_joined=fake.date_time_between(start_date='-2y', end_date='now', tzinfo=timezone.UTC)
+                date_joined=fake.date_time_between(start_date='-2y', end_date='now', tzinfo=dt_timezone.utc)
             )
             usuarios_creados.append(usuario)
             credenciales.append({
@@ -132,14 +176,6 @@ class Command(BaseCommand):
         
         for i in range(num_posts):
             titulo = fake.sentence(nb_words=6).rstrip('.')
-            # Asegurar que el slug sea único
-            slug_base = slugify(titulo)
-            slug = slug_base
-            counter = 1
-            while Post.objects.filter(slug=slug).exists():
-                slug = f"{slug_base}-{counter}"
-                counter += 1
-            
             autor = random.choice(usuarios_creados)
             categoria = random.choice(categorias) if random.random() > 0.1 else None  # 90% con categoría
             
@@ -154,7 +190,7 @@ class Command(BaseCommand):
             fecha_creacion = fake.date_time_between(
                 start_date='-2y',
                 end_date='now',
-                tzinfo=timezone.UTC
+                tzinfo=dt_timezone.utc
             )
             
             # 80% de los posts publicados
@@ -165,19 +201,19 @@ class Command(BaseCommand):
                     days=random.randint(0, 30)
                 )
             
-            post = Post.objects.create(
+            post = guardar_con_slug_unico(Post(
                 titulo=titulo,
-                slug=slug,
                 autor=autor,
                 categoria=categoria,
                 contenido=contenido,
                 publicado=publicado,
                 fecha_publicacion=fecha_publicacion,
                 visitas=random.randint(0, 5000) if publicado else 0,
-            )
+            ))
             
             # Actualizar fecha_creacion manualmente
             Post.objects.filter(id=post.id).update(fecha_creacion=fecha_creacion)
+            TarjetaPost.objects.filter(post_id=post.id).update(fecha_creacion=fecha_creacion)
             
             posts_creados += 1
             
@@ -196,3 +232,79 @@ class Command(BaseCommand):
         self.stdout.write(self.style.WARNING('\n⚠️  IMPORTANTE: Las contraseñas de los usuarios se han guardado en el archivo credenciales_usuarios.txt'))
         self.stdout.write(self.style.WARNING('    Cada usuario tiene una contraseña única generada automáticamente.'))
 
+
+    def generar_en_bloque(self, options):
+        """Modo masivo (--bulk): ver blog/datos_fake.py"""
+        num_usuarios = options['usuarios']
+        num_posts = options['posts']
+        semilla = options['seed']
+        procesos = max(1, options['procesos'])
+        lote = max(1, options['lote'])
+        referencia = datos_fake.FECHA_REFERENCIA if semilla is not None else timezone.now()
+        inicio = time.monotonic()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Iniciando generación masiva: {num_usuarios} usuarios, {num_posts} posts '
+            f'({procesos} procesos, bloques de {lote}, semilla {semilla})'
+        ))
+
+        def progreso(nombre):
+            def mostrar(hechos, total):
+                transcurrido = time.monotonic() - inicio
+                self.stdout.write(f'  ✓ {hechos}/{total} {nombre} ({transcurrido:.1f}s)')
+            return mostrar
+
+        categorias = datos_fake.crear_categorias(semilla)
+        self.stdout.write(f'✓ {len(categorias)} categorías')
+
+        # Una sola contraseña (y un solo hash PBKDF2) para todos los usuarios
+        password = Faker('es_ES')
+        password.seed_instance(semilla)
+        password = password.password(length=12)
+        autores_ids = datos_fake.crear_usuarios(
+            num_usuarios, password, procesos, semilla, lote, referencia, progreso('usuarios')
+        )
+        if autores_ids:
+            self.guardar_credenciales_compartidas(autores_ids, password)
+        else:
+            autores_ids = list(User.objects.values_list('id', flat=True))
+
+        if num_posts:
+            if not autores_ids:
+                raise CommandError('No hay usuarios para asignar como autores de los posts.')
+            datos_fake.crear_posts(
+                num_posts, autores_ids, categorias, procesos, semilla, lote, referencia, progreso('posts')
+            )
+
+            # bulk_create no dispara señales: recalcular lo que mantienen
+            call_command('reconciliar_contadores', stdout=self.stdout)
+            call_command('calcular_tendencias', '--completo', stdout=self.stdout)
+            call_command('reconstruir_tarjetas', stdout=self.stdout)
+            try:
+                call_command('reconstruir_indice_busqueda', stdout=self.stdout)
+            except CommandError as error:
+                self.stdout.write(self.style.WARNING(str(error)))
+
+        total = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✓ Generación masiva terminada en {total:.1f}s '
+            f'({num_posts / total if total else 0:.0f} posts/s)'
+        ))
+
+    def guardar_credenciales_compartidas(self, usuarios_ids, password):
+        base_dir = Path(__file__).resolve().parent.parent.parent.parent
+        credenciales_file = base_dir / 'credenciales_usuarios.txt'
+        usernames = User.objects.filter(id__in=usuarios_ids).values_list('username', flat=True)
+
+        with open(credenciales_file, 'w', encoding='utf-8') as f:
+            f.write('=' * 70 + '\n')
+            f.write('CREDENCIALES DE USUARIOS GENERADOS (MODO MASIVO)\n')
+            f.write('=' * 70 + '\n\n')
+            f.write(f'Total de usuarios: {len(usuarios_ids)}\n')
+            f.write(f'Generado el: {timezone.now().strftime("%Y-%m-%d %H:%M:%S")}\n')
+            f.write(f'Contraseña (común a todos): {password}\n\n')
+            f.write('-' * 70 + '\n\n')
+            for username in usernames.iterator():
+                f.write(f'{username}\n')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Credenciales guardadas en: {credenciales_file}'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog import contadores
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el contador de posts publicados de cada categoría'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            diferencias = contadores.reconciliar()
+
+        for categoria, guardado, real in diferencias:
+            self.stdout.write(f'  ✓ {categoria.nombre}: {guardado} → {real}')
+
+        if diferencias:
+            self.stdout.write(self.style.SUCCESS(f'✓ {len(diferencias)} contadores corregidos'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ Todos los contadores están al día'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from blog import busqueda
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de texto completo de los posts'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Reconstruyendo índice de búsqueda...')
+        with transaction.atomic():
+            if not busqueda.reconstruir_indice(connection):
+                raise CommandError(
+                    f'El motor "{connection.vendor}" no soporta el índice de búsqueda; '
+                    f'se usará la búsqueda sin índice.'
+                )
+        self.stdout.write(self.style.SUCCESS('✓ Índice de búsqueda reconstruido'))
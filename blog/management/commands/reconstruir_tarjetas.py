@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog import fragmentos, tarjetas
+from blog.models import Categoria, Post
+
+
+class Command(BaseCommand):
+    help = 'Vuelve a copiar las tarjetas del listado (TarjetaPost) de todos los posts'
+
+    def handle(self, *args, **options):
+        total = tarjetas.reconstruir(Post.objects.all())
+        fragmentos.invalidar(
+            'global',
+            *(fragmentos.ambito_categoria(pk) for pk in Categoria.objects.values_list('pk', flat=True))
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ {total} tarjetas reconstruidas'))
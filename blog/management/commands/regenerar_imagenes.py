@@ -0,0 +1,56 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import imagenes
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Genera las variantes redimensionadas (WebP/JPEG) de las imágenes de los posts usando varios procesos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--todos',
+            action='store_true',
+            help='Regenerar también las imágenes ya procesadas',
+        )
+        parser.add_argument(
+            '--borrar-antiguas',
+            action='store_true',
+            help='Borrar las variantes del formato anterior (foto-320w.jpg junto a foto.png)',
+        )
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos en paralelo (por defecto: número de CPUs)',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(imagen='').exclude(imagen__isnull=True)
+        if options['borrar_antiguas']:
+            borradas = imagenes.borrar_variantes_antiguas(posts.values_list('imagen', flat=True).iterator())
+            self.stdout.write(f'{borradas} variantes antiguas borradas')
+        if not options['todos']:
+            # Sin variantes ni marca de procesada (las importadas traen sus anchos)
+            posts = posts.filter(imagen_anchos=[], imagen_ancho__isnull=True)
+        pendientes = list(posts.order_by('pk').values_list('pk', 'imagen'))
+        if not pendientes:
+            self.stdout.write(self.style.SUCCESS('✓ No hay imágenes pendientes'))
+            return
+
+        self.stdout.write(f'Procesando {len(pendientes)} imágenes con {options["procesos"]} procesos...')
+        inicio = time.perf_counter()
+        errores = 0
+        for post_id, anchos, error in imagenes.regenerar(pendientes, options['procesos']):
+            if error:
+                errores += 1
+                self.stdout.write(self.style.WARNING(f'  ⚠ Post {post_id}: {error}'))
+        duracion = time.perf_counter() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {len(pendientes) - errores} imágenes procesadas en {duracion:.1f}s'
+            + (f' ({errores} con errores)' if errores else '')
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog import contenido, fragmentos, tarjetas
+from blog.models import Categoria, Post
+
+
+class Command(BaseCommand):
+    help = 'Calcula el HTML y el extracto guardados de los posts que aún no los tienen'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--todos',
+            action='store_true',
+            help='Recalcular todos los posts (por ejemplo, tras cambiar el formato del extracto)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Posts por lote (por defecto: 500)',
+        )
+
+    def handle(self, *args, **options):
+        actualizados = contenido.rellenar(Post, todos=options['todos'], lote=options['lote'])
+        if actualizados:
+            # bulk_update no dispara señales: las tarjetas (y sus fragmentos
+            # cacheados) muestran el extracto
+            tarjetas.copiar(Post.objects.all())
+            fragmentos.invalidar(
+                'global',
+                *(fragmentos.ambito_categoria(pk) for pk in Categoria.objects.values_list('pk', flat=True))
+            )
+        self.stdout.write(self.style.SUCCESS(f'✓ {actualizados} posts renderizados'))
@@ -0,0 +1,57 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Copia la base de datos principal a las réplicas SQLite de DB_REPLICAS (para probar '
+        'las réplicas en local). Con --intervalo simula una réplica que va N segundos por detrás.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=None,
+            help='Repetir la copia cada N segundos en lugar de hacerla una vez',
+        )
+
+    def handle(self, *args, **options):
+        primaria = connections[DEFAULT_DB_ALIAS]
+        if not settings.REPLICAS:
+            raise CommandError('No hay réplicas configuradas (variable de entorno DB_REPLICAS).')
+        if primaria.vendor != 'sqlite':
+            raise CommandError('Solo copia bases de datos SQLite; otros motores tienen su propia replicación.')
+
+        if options['intervalo'] is None:
+            self.sincronizar(primaria)
+            return
+        self.stdout.write(f'Copiando a las réplicas cada {options["intervalo"]} segundos (CTRL+C para salir)...')
+        try:
+            while True:
+                self.sincronizar(primaria)
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nSincronización detenida.'))
+
+    def sincronizar(self, primaria):
+        primaria.ensure_connection()
+        for alias in settings.REPLICAS:
+            nombre = connections[alias].settings_dict['NAME']
+            if connections[alias].vendor != 'sqlite':
+                self.stdout.write(self.style.WARNING(f'  ⚠ {alias} no es SQLite: se omite'))
+                continue
+            inicio = time.perf_counter()
+            # API de copia de SQLite: copia consistente aunque haya escrituras
+            destino = sqlite3.connect(nombre)
+            try:
+                primaria.connection.backup(destino)
+            finally:
+                destino.close()
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {alias} ({nombre}) copiada en {(time.perf_counter() - inicio) * 1000:.0f} ms'
+            ))
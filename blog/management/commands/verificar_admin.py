@@ -0,0 +1,39 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.presupuestos import cargar, paginas_del_admin, problemas
+
+
+class Command(BaseCommand):
+    help = (
+        'Carga las páginas del admin del blog y falla si alguna supera su presupuesto '
+        'de consultas o el listado de posts carga columnas que no muestra'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-consultas',
+            action='store_true',
+            help='Mostrar las consultas de cada página',
+        )
+
+    def handle(self, *args, **options):
+        # Superusuario en memoria: no se escribe nada en la base de datos
+        usuario = User(username='verificar_admin', is_active=True, is_staff=True, is_superuser=True)
+
+        errores = []
+        for nombre, url in paginas_del_admin():
+            respuesta, consultas = cargar(url, usuario)
+            encontrados = problemas(nombre, respuesta, consultas)
+            if encontrados:
+                errores.append(nombre)
+                self.stdout.write(self.style.ERROR(f'  ✗ {nombre}: {", ".join(encontrados)}'))
+            else:
+                self.stdout.write(f'  ✓ {nombre}: {len(consultas)} consultas')
+            if options['verbose_consultas']:
+                for consulta in consultas:
+                    self.stdout.write(f'      | {consulta["sql"]}')
+
+        if errores:
+            raise CommandError(f'{len(errores)} páginas del admin fuera de presupuesto: {", ".join(errores)}')
+        self.stdout.write(self.style.SUCCESS('✓ El admin respeta los presupuestos de consultas'))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.planes import consultas_de_las_vistas, problemas
+
+
+class Command(BaseCommand):
+    help = (
+        'Revisa el plan de ejecución (EXPLAIN QUERY PLAN) de las consultas de las vistas '
+        'y falla si alguna recorre una tabla completa u ordena en memoria'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-planes',
+            action='store_true',
+            help='Mostrar el plan completo de cada consulta',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('La verificación de planes solo está implementada para SQLite.')
+
+        errores = []
+        for nombre, queryset in consultas_de_las_vistas():
+            plan = queryset.explain()
+            encontrados = problemas(plan)
+            if encontrados:
+                errores.append(nombre)
+                self.stdout.write(self.style.ERROR(f'  ✗ {nombre}'))
+                for problema in encontrados:
+                    self.stdout.write(f'      {problema}')
+            else:
+                self.stdout.write(f'  ✓ {nombre}')
+            if options['verbose_planes']:
+                self.stdout.write('\n'.join(f'      | {linea}' for linea in plan.splitlines()))
+
+        if errores:
+            raise CommandError(f'{len(errores)} consultas sin índice adecuado: {", ".join(errores)}')
+        self.stdout.write(self.style.SUCCESS('✓ Todas las consultas usan índices'))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.visitas import intervalo_volcado, volcar_visitas
+
+
+class Command(BaseCommand):
+    help = 'Suma las visitas pendientes a Post.visitas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=None,
+            help='Repetir el volcado cada N segundos en lugar de ejecutarlo una vez '
+                 '(0 = usar BLOG_VISITAS_INTERVALO)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Máximo de posts por UPDATE (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        intervalo = options['intervalo']
+        if intervalo is None:
+            total = volcar_visitas(tamano_lote=options['lote'])
+            self.stdout.write(self.style.SUCCESS(f'✓ {total} visitas volcadas'))
+            return
+
+        intervalo = intervalo or intervalo_volcado()
+        self.stdout.write(f'Volcando visitas cada {intervalo} segundos (CTRL+C para salir)...')
+        try:
+            while True:
+                total = volcar_visitas(tamano_lote=options['lote'])
+                if total:
+                    self.stdout.write(f'  ✓ {total} visitas volcadas')
+                time.sleep(intervalo)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nVolcado detenido.'))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitaPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lote', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visitas_pendientes', to='blog.post')),
+            ],
+            options={
+                'verbose_name': 'Visita pendiente',
+                'verbose_name_plural': 'Visitas pendientes',
+            },
+        ),
+    ]
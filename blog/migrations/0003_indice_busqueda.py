@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from blog import busqueda
+
+
+def crear_indice(apps, schema_editor):
+    busqueda.reconstruir_indice_seguro(schema_editor.connection)
+
+
+def eliminar_indice(apps, schema_editor):
+    busqueda.eliminar_indice(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_visitapendiente'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
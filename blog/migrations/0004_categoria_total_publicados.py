@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:01
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def calcular_totales(apps, schema_editor):
+    Categoria = apps.get_model('blog', 'Categoria')
+    Post = apps.get_model('blog', 'Post')
+    totales = (
+        Post.objects.filter(publicado=True, categoria__isnull=False)
+        .values_list('categoria_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for categoria_id, total in totales:
+        Categoria.objects.filter(pk=categoria_id).update(total_publicados=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoria',
+            name='total_publicados',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_totales, migrations.RunPython.noop),
+    ]
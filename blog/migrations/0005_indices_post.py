@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_categoria_total_publicados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='categoria',
+            index=models.Index(fields=['total_publicados'], name='blog_cat_total_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['fecha_creacion', 'id'], name='blog_post_pub_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['visitas', 'id'], name='blog_post_pub_visitas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['categoria', 'fecha_creacion', 'id'], name='blog_post_cat_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['categoria', 'visitas', 'id'], name='blog_post_cat_visitas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['autor', 'fecha_creacion'], name='blog_post_autor_fecha_idx'),
+        ),
+    ]
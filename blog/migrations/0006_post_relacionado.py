@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_indices_post'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRelacionado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puntuacion', models.FloatField()),
+                ('orden', models.PositiveSmallIntegerField()),
+                ('fecha_calculo', models.DateTimeField()),
+                ('post', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='vecinos', to='blog.post')),
+                ('relacionado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vecino_de', to='blog.post')),
+            ],
+            options={
+                'verbose_name': 'Post relacionado',
+                'verbose_name_plural': 'Posts relacionados',
+                'ordering': ['post', 'orden'],
+                'constraints': [models.UniqueConstraint(fields=('post', 'orden'), name='blog_relacionado_post_orden_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+from blog import contenido
+
+
+def rellenar_contenido(apps, schema_editor):
+    contenido.rellenar(apps.get_model('blog', 'Post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_relacionado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='contenido_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='extracto',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(rellenar_contenido, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_contenido_renderizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='imagen_anchos',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_imagen_anchos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['fecha_actualizacion'], name='blog_post_pub_actual_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['categoria', 'fecha_actualizacion'], name='blog_post_cat_actual_idx'),
+        ),
+    ]
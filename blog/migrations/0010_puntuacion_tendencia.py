@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_indices_ultima_actualizacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='puntuacion_tendencia',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='visitas_puntuadas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['puntuacion_tendencia', 'id'], name='blog_post_pub_tendencia_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['categoria', 'puntuacion_tendencia', 'id'], name='blog_post_cat_tendencia_idx'),
+        ),
+    ]
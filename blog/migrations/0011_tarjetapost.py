@@ -0,0 +1,119 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from blog import tarjetas
+
+
+def copiar_tarjetas(apps, schema_editor):
+    tarjetas.copiar(apps.get_model('blog', 'Post').objects.all(), apps.get_model('blog', 'TarjetaPost'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_puntuacion_tendencia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarjetaPost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='tarjeta', serialize=False, to='blog.post')),
+                ('slug', models.SlugField(db_index=False, max_length=200)),
+                ('titulo', models.CharField(max_length=200)),
+                ('extracto', models.TextField(blank=True)),
+                ('autor_nombre', models.CharField(max_length=300)),
+                ('categoria_nombre', models.CharField(blank=True, max_length=100)),
+                ('imagen', models.ImageField(blank=True, null=True, upload_to='blog/imagenes/')),
+                ('imagen_anchos', models.JSONField(blank=True, default=list)),
+                ('fecha_creacion', models.DateTimeField()),
+                ('fecha_actualizacion', models.DateTimeField()),
+                ('publicado', models.BooleanField(default=False)),
+                ('visitas', models.PositiveIntegerField(default=0)),
+                ('puntuacion_tendencia', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Tarjeta de post',
+                'verbose_name_plural': 'Tarjetas de posts',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='blog_post_pub_fecha_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='blog_post_pub_visitas_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='blog_post_cat_visitas_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='blog_post_pub_actual_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='blog_post_cat_actual_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='blog_post_pub_tendencia_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='blog_post_cat_tendencia_idx',
+        ),
+        migrations.AddField(
+            model_name='tarjetapost',
+            name='autor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='tarjetapost',
+            name='categoria',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.categoria'),
+        ),
+        migrations.AddIndex(
+            model_name='tarjetapost',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['fecha_creacion', 'post'], name='blog_tarjeta_pub_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarjetapost',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['visitas', 'post'], name='blog_tarjeta_pub_visitas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarjetapost',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['puntuacion_tendencia', 'post'], name='blog_tarjeta_pub_tend_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarjetapost',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['categoria', 'fecha_creacion', 'post'], name='blog_tarjeta_cat_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarjetapost',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['categoria', 'visitas', 'post'], name='blog_tarjeta_cat_visitas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarjetapost',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['categoria', 'puntuacion_tendencia', 'post'], name='blog_tarjeta_cat_tend_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarjetapost',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['fecha_actualizacion'], name='blog_tarjeta_pub_actual_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarjetapost',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['categoria', 'fecha_actualizacion'], name='blog_tarjeta_cat_actual_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarjetapost',
+            index=models.Index(fields=['autor', 'fecha_creacion'], name='blog_tarjeta_autor_fecha_idx'),
+        ),
+        migrations.RunPython(copiar_tarjetas, migrations.RunPython.noop),
+    ]
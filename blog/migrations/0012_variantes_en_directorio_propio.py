@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def olvidar_variantes(apps, schema_editor):
+    # Las variantes anteriores estaban junto al original: hasta que
+    # `regenerar_imagenes` las cree en variantes/, se muestra el original
+    for modelo in ('Post', 'TarjetaPost'):
+        apps.get_model('blog', modelo).objects.exclude(imagen_anchos=[]).update(imagen_anchos=[])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_tarjetapost'),
+    ]
+
+    operations = [
+        migrations.RunPython(olvidar_variantes, migrations.RunPython.noop),
+    ]
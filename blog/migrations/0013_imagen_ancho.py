@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_variantes_en_directorio_propio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='imagen_ancho',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
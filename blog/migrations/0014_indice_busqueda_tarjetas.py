@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:05
+
+import blog.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_imagen_ancho'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicePost',
+            fields=[
+                ('rowid', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('documento', blog.models.DocumentoFTS(db_column='blog_post_fts')),
+            ],
+            options={
+                'db_table': 'blog_post_fts',
+                'managed': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='tarjetapost',
+            name='indice',
+            field=models.ForeignObject(default=None, from_fields=['post'], on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='blog.indicepost', to_fields=['rowid']),
+            preserve_default=False,
+        ),
+    ]
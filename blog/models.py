@@ -1,24 +1,83 @@
-from django.db import models
+from collections import Counter
+
+from django.db import models, transaction
+from django.db.models import Count
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
 
+from .contenido import renderizar
+
 
 class Categoria(models.Model):
     """Modelo para categorías de blog"""
     nombre = models.CharField(max_length=100, unique=True)
     descripcion = models.TextField(blank=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Contador desnormalizado de posts publicados, mantenido por blog/contadores.py
+    total_publicados = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = 'Categoría'
         verbose_name_plural = 'Categorías'
         ordering = ['nombre']
+        indexes = [
+            # Barra lateral del listado
+            models.Index(fields=['total_publicados'], name='blog_cat_total_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
 
 
+class PostQuerySet(models.QuerySet):
+    """Operaciones en bloque sobre posts"""
+
+    def publicar(self):
+        """Publica los posts del queryset con un solo UPDATE. Devuelve cuántos cambiaron."""
+        return self._cambiar_publicacion(True)
+
+    def despublicar(self):
+        """Pasa a borrador los posts del queryset con un solo UPDATE. Devuelve cuántos cambiaron."""
+        return self._cambiar_publicacion(False)
+
+    def _cambiar_publicacion(self, publicado):
+        # QuerySet.update no dispara señales: los contadores de categoría, las
+        # tarjetas y la caché de fragmentos se actualizan aquí
+        from . import contadores, fragmentos
+
+        ahora = timezone.now()
+        campos = {'publicado': publicado, 'fecha_actualizacion': ahora}
+        if publicado:
+            campos['fecha_publicacion'] = ahora
+
+        with transaction.atomic():
+            pendientes = self.filter(publicado=not publicado)
+            por_categoria = dict(
+                pendientes.order_by().values_list('categoria_id').annotate(total=Count('id'))
+            )
+            # Antes que los posts: después ya no coinciden con `pendientes`
+            TarjetaPost.objects.filter(post__in=pendientes.values('pk')).update(
+                publicado=publicado, fecha_actualizacion=ahora
+            )
+            cambiados = pendientes.update(**campos)
+            signo = 1 if publicado else -1
+            deltas = Counter({categoria_id: signo * total for categoria_id, total in por_categoria.items()})
+            if cambiados == sum(por_categoria.values()):
+                contadores.ajustar(deltas)
+            else:
+                # Otra transacción cambió alguno de los posts entre el recuento
+                # y el UPDATE: se recalculan las categorías afectadas
+                for categoria_id in deltas:
+                    contadores.recalcular(categoria_id)
+            if cambiados:
+                fragmentos.invalidar(
+                    'global', 'categorias',
+                    *(fragmentos.ambito_categoria(categoria_id) for categoria_id in deltas)
+                )
+        return cambiados
+
+
 class Post(models.Model):
     """Modelo para posts del blog"""
     titulo = models.CharField(max_length=200)
@@ -26,17 +85,41 @@ class Post(models.Model):
     autor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     categoria = models.ForeignKey(Categoria, on_delete=models.SET_NULL, null=True, blank=True, related_name='posts')
     contenido = models.TextField()
+    # Precalculados a partir de `contenido` en save() (ver blog/contenido.py)
+    contenido_html = models.TextField(blank=True, editable=False)
+    extracto = models.TextField(blank=True, editable=False)
     imagen = models.ImageField(upload_to='blog/imagenes/', blank=True, null=True)
+    # Anchos de las variantes generadas de `imagen` y ancho del original
+    # (None mientras no se ha procesado; ver blog/imagenes.py)
+    imagen_anchos = models.JSONField(default=list, blank=True, editable=False)
+    imagen_ancho = models.PositiveIntegerField(null=True, blank=True, editable=False)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     fecha_publicacion = models.DateTimeField(null=True, blank=True)
     publicado = models.BooleanField(default=False)
     visitas = models.PositiveIntegerField(default=0)
+    # Orden por tendencias (ver blog/tendencias.py): log2 de la puntuación y
+    # visitas ya sumadas a ella
+    puntuacion_tendencia = models.FloatField(null=True, blank=True, editable=False)
+    visitas_puntuadas = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Posts relacionados de la misma categoría (el listado y "Mis
+            # posts" leen de TarjetaPost)
+            models.Index(
+                fields=['categoria', 'fecha_creacion', 'id'],
+                condition=models.Q(publicado=True),
+                name='blog_post_cat_fecha_idx',
+            ),
+            # Filtro por autor del admin
+            models.Index(fields=['autor', 'fecha_creacion'], name='blog_post_autor_fecha_idx'),
+        ]
 
     def __str__(self):
         return self.titulo
@@ -44,14 +127,190 @@ class Post(models.Model):
     def get_absolute_url(self):
         return reverse('detalle_post', kwargs={'slug': self.slug})
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # Solo si el contenido está cargado y se va a guardar
+        if 'contenido' in self.__dict__ and (update_fields is None or 'contenido' in update_fields):
+            self.renderizar_contenido()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'contenido_html', 'extracto'}
+        super().save(*args, **kwargs)
+
+    def renderizar_contenido(self):
+        """Recalcula contenido_html y extracto a partir de contenido"""
+        self.contenido_html, self.extracto = renderizar(self.contenido)
+
     def publicar(self):
         """Marca el post como publicado"""
-        self.publicado = True
-        self.fecha_publicacion = timezone.now()
+        self._cambiar_publicacion(True)
+
+    def despublicar(self):
+        """Vuelve a dejar el post como borrador"""
+        self._cambiar_publicacion(False)
+
+    def _cambiar_publicacion(self, publicado):
+        # Con save() y no con Post.objects...publicar(): se guardan también
+        # los cambios pendientes de la instancia (post.titulo = ...;
+        # post.publicar()). Las señales de blog/signals.py ajustan contadores,
+        # tarjetas y fragmentos.
+        if self.publicado != publicado:
+            self.publicado = publicado
+            if publicado:
+                self.fecha_publicacion = timezone.now()
         self.save()
 
-    def incrementar_visitas(self):
-        """Incrementa el contador de visitas"""
-        self.visitas += 1
-        self.save(update_fields=['visitas'])
 
+class DocumentoFTS(models.TextField):
+    """Columna oculta de una tabla FTS5 (con su mismo nombre), para el lookup `coincide`"""
+
+
+@DocumentoFTS.register_lookup
+class Coincide(models.Lookup):
+    """`campo MATCH consulta` de FTS5: `.filter(indice__documento__coincide='"django"*')`"""
+    lookup_name = 'coincide'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class IndicePost(models.Model):
+    """
+    Tabla virtual FTS5 del índice de búsqueda en SQLite (rowid = id del
+    post). La crea y mantiene blog/busqueda.py; el modelo solo sirve para
+    unirla a TarjetaPost en las consultas.
+    """
+    rowid = models.BigIntegerField(primary_key=True)
+    # Columna oculta con el nombre de la tabla: `blog_post_fts MATCH ...`
+    documento = DocumentoFTS(db_column='blog_post_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_fts'
+
+
+class TarjetaPost(models.Model):
+    """
+    Lo que muestran las tarjetas del listado y de "Mis posts", copiado de
+    Post, su autor y su categoría (ver blog/tarjetas.py): las vistas leen una
+    sola tabla, sin JOIN ni el cuerpo del post.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='tarjeta')
+    slug = models.SlugField(max_length=200, db_index=False)
+    titulo = models.CharField(max_length=200)
+    extracto = models.TextField(blank=True)
+    autor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    autor_nombre = models.CharField(max_length=300)
+    categoria = models.ForeignKey(Categoria, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    categoria_nombre = models.CharField(max_length=100, blank=True)
+    imagen = models.ImageField(upload_to='blog/imagenes/', blank=True, null=True)
+    imagen_anchos = models.JSONField(default=list, blank=True)
+    fecha_creacion = models.DateTimeField()
+    fecha_actualizacion = models.DateTimeField()
+    publicado = models.BooleanField(default=False)
+    visitas = models.PositiveIntegerField(default=0)
+    puntuacion_tendencia = models.FloatField(null=True, blank=True)
+    # Fila del post en el índice de búsqueda de SQLite (sin columna propia)
+    indice = models.ForeignObject(
+        IndicePost, on_delete=models.DO_NOTHING, from_fields=['post'], to_fields=['rowid'], related_name='+',
+    )
+
+    class Meta:
+        verbose_name = 'Tarjeta de post'
+        verbose_name_plural = 'Tarjetas de posts'
+        # Un índice por cada forma de acceso de las vistas (ver blog/consultas.py
+        # y `python manage.py verificar_planes`). Los del listado son parciales
+        # (solo posts publicados): Django filtra los booleanos como
+        # `WHERE "publicado"` y SQLite solo usa un índice para eso si el índice
+        # tiene la misma condición. El post_id final permite paginar por
+        # cursor sin ordenar en memoria.
+        indexes = [
+            # Listado: recientes / antiguos
+            models.Index(
+                fields=['fecha_creacion', 'post'],
+                condition=models.Q(publicado=True),
+                name='blog_tarjeta_pub_fecha_idx',
+            ),
+            # Listado: populares
+            models.Index(
+                fields=['visitas', 'post'],
+                condition=models.Q(publicado=True),
+                name='blog_tarjeta_pub_visitas_idx',
+            ),
+            # Listado: tendencias
+            models.Index(
+                fields=['puntuacion_tendencia', 'post'],
+                condition=models.Q(publicado=True),
+                name='blog_tarjeta_pub_tend_idx',
+            ),
+            # Listado por categoría
+            models.Index(
+                fields=['categoria', 'fecha_creacion', 'post'],
+                condition=models.Q(publicado=True),
+                name='blog_tarjeta_cat_fecha_idx',
+            ),
+            models.Index(
+                fields=['categoria', 'visitas', 'post'],
+                condition=models.Q(publicado=True),
+                name='blog_tarjeta_cat_visitas_idx',
+            ),
+            models.Index(
+                fields=['categoria', 'puntuacion_tendencia', 'post'],
+                condition=models.Q(publicado=True),
+                name='blog_tarjeta_cat_tend_idx',
+            ),
+            # GET condicional del listado: última actualización (ver blog/condicional.py)
+            models.Index(
+                fields=['fecha_actualizacion'],
+                condition=models.Q(publicado=True),
+                name='blog_tarjeta_pub_actual_idx',
+            ),
+            models.Index(
+                fields=['categoria', 'fecha_actualizacion'],
+                condition=models.Q(publicado=True),
+                name='blog_tarjeta_cat_actual_idx',
+            ),
+            # Mis posts
+            models.Index(fields=['autor', 'fecha_creacion'], name='blog_tarjeta_autor_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return self.titulo
+
+
+class VisitaPendiente(models.Model):
+    """Visita registrada que aún no se ha sumado a Post.visitas"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='visitas_pendientes')
+    lote = models.CharField(max_length=32, blank=True, db_index=True)
+    fecha = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Visita pendiente'
+        verbose_name_plural = 'Visitas pendientes'
+
+    def __str__(self):
+        return f'{self.post_id} @ {self.fecha}'
+
+
+
+class PostRelacionado(models.Model):
+    """Vecino precalculado de un post por similitud de contenido (ver blog/relacionados.py)"""
+    # Sin índice propio: lo cubre la restricción única (post, orden)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='vecinos', db_index=False)
+    relacionado = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='vecino_de')
+    puntuacion = models.FloatField()
+    orden = models.PositiveSmallIntegerField()
+    fecha_calculo = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Post relacionado'
+        verbose_name_plural = 'Posts relacionados'
+        ordering = ['post', 'orden']
+        constraints = [
+            # También es el índice de la lectura en detalle_post
+            models.UniqueConstraint(fields=['post', 'orden'], name='blog_relacionado_post_orden_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} -> {self.relacionado_id} ({self.puntuacion:.3f})'
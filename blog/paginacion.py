@@ -0,0 +1,255 @@
+"""
+Paginación por cursor (keyset) para el listado del blog.
+
+En lugar de `OFFSET` + `COUNT(*)`, cada página se pide a partir del último
+(o primer) post de la página anterior: `WHERE (campo, id) < (valor, id)`.
+Así la página 1000 cuesta lo mismo que la página 1, siempre que exista un
+índice sobre (campo, id).
+
+Los cursores son opacos para el cliente: base64 de un JSON con el valor del
+campo de orden, el id y la dirección.
+"""
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+# orden -> (campo, descendente)
+ORDENES_CURSOR = {
+    'recientes': ('fecha_creacion', True),
+    'antiguos': ('fecha_creacion', False),
+    'populares': ('visitas', True),
+    'tendencias': ('puntuacion_tendencia', True),
+}
+
+SIGUIENTE = 'sig'
+ANTERIOR = 'ant'
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def codificar_cursor(valor, pk, direccion):
+    if hasattr(valor, 'isoformat'):
+        valor = valor.isoformat()
+    datos = json.dumps([valor, pk, direccion], separators=(',', ':'))
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, campo_modelo):
+    """Devuelve (valor, pk, direccion) o lanza CursorInvalido"""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valor, pk, direccion = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        valor = campo_modelo.to_python(valor)
+        pk = int(pk)
+    except (binascii.Error, ValueError, TypeError, ValidationError):
+        raise CursorInvalido(cursor)
+    if direccion not in (SIGUIENTE, ANTERIOR) or valor is None:
+        raise CursorInvalido(cursor)
+    return valor, pk, direccion
+
+
+class PaginaCursor:
+    """
+    Página de resultados paginada por cursor.
+
+    Imita la parte de `django.core.paginator.Page` que usan las plantillas
+    (iteración, has_next, has_previous, has_other_pages) y añade
+    `cursor_siguiente` y `cursor_anterior`. La consulta es perezosa: no se
+    ejecuta hasta que la plantilla recorre la página.
+    """
+
+    def __init__(self, queryset, campo, descendente, por_pagina, cursor=None):
+        self.queryset = queryset
+        self.campo = campo
+        self.descendente = descendente
+        self.por_pagina = por_pagina
+        self.valor = self.pk = None
+        self.direccion = SIGUIENTE
+        if cursor:
+            campo_modelo = queryset.model._meta.get_field(campo)
+            try:
+                self.valor, self.pk, self.direccion = decodificar_cursor(cursor, campo_modelo)
+            except CursorInvalido:
+                pass  # Un cursor manipulado o antiguo lleva a la primera página
+        self._objetos = None
+        self._hay_siguiente = self._hay_anterior = False
+
+    def _consulta(self, direccion, con_cursor=True):
+        # Hacia atrás se recorre el índice en sentido contrario y luego se invierte
+        descendente = self.descendente if direccion == SIGUIENTE else not self.descendente
+        signo = '-' if descendente else ''
+        consulta = self.queryset.order_by(f'{signo}{self.campo}', f'{signo}pk')
+        if con_cursor and self.pk is not None:
+            # (campo, id) < (valor, pk) escrito como un rango sobre `campo` más
+            # un filtro residual; con un OR SQLite no usa el índice del orden
+            hasta, desde = ('lte', 'gte') if descendente else ('gte', 'lte')
+            consulta = consulta.filter(
+                Q(**{f'{self.campo}__{hasta}': self.valor}) &
+                ~Q(**{self.campo: self.valor, f'pk__{desde}': self.pk})
+            )
+        return consulta
+
+    def _cargar(self):
+        if self._objetos is not None:
+            return self._objetos
+
+        if self._pide_anterior():
+            if self._recibir_anterior(list(self._consulta(ANTERIOR)[:self.por_pagina + 1])):
+                return self._objetos
+
+        self._recibir_siguiente(list(self._consulta_siguiente()[:self.por_pagina + 1]))
+        return self._objetos
+
+    async def acargar(self):
+        """Como _cargar, con el ORM asíncrono (para vistas async)"""
+        if self._objetos is not None:
+            return self._objetos
+
+        if self._pide_anterior():
+            filas = [fila async for fila in self._consulta(ANTERIOR)[:self.por_pagina + 1]]
+            if self._recibir_anterior(filas):
+                return self._objetos
+
+        self._recibir_siguiente([fila async for fila in self._consulta_siguiente()[:self.por_pagina + 1]])
+        return self._objetos
+
+    def _pide_anterior(self):
+        return self.pk is not None and self.direccion == ANTERIOR
+
+    def _consulta_siguiente(self):
+        return self._consulta(SIGUIENTE, con_cursor=self.pk is not None)
+
+    def _recibir_anterior(self, filas):
+        if len(filas) > self.por_pagina:
+            self._objetos = filas[:self.por_pagina][::-1]
+            self._hay_anterior = True
+            self._hay_siguiente = True
+            return True
+        # Se llegó al principio: servir la primera página completa
+        self.pk = None
+        return False
+
+    def _recibir_siguiente(self, filas):
+        self._objetos = filas[:self.por_pagina]
+        self._hay_siguiente = len(filas) > self.por_pagina
+        self._hay_anterior = self.pk is not None
+
+    def __iter__(self):
+        return iter(self._cargar())
+
+    def __len__(self):
+        return len(self._cargar())
+
+    def __getitem__(self, indice):
+        return self._cargar()[indice]
+
+    def has_next(self):
+        self._cargar()
+        return self._hay_siguiente
+
+    def has_previous(self):
+        self._cargar()
+        return self._hay_anterior
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _cursor(self, objeto, direccion):
+        return codificar_cursor(getattr(objeto, self.campo), objeto.pk, direccion)
+
+    @property
+    def cursor_siguiente(self):
+        objetos = self._cargar()
+        if not self._hay_siguiente or not objetos:
+            return None
+        return self._cursor(objetos[-1], SIGUIENTE)
+
+    @property
+    def cursor_anterior(self):
+        objetos = self._cargar()
+        if not self._hay_anterior or not objetos:
+            return None
+        return self._cursor(objetos[0], ANTERIOR)
+
+
+def contar_aproximado(queryset, timeout=300):
+    """
+    Total de resultados cacheado durante `timeout` segundos.
+
+    Evita un COUNT(*) por petición; el número puede ir por detrás de la
+    base de datos como mucho ese tiempo.
+    """
+    return cache.get_or_set(_clave_conteo(queryset), queryset.count, timeout)
+
+
+async def acontar_aproximado(queryset, timeout=300):
+    """Como contar_aproximado, con la caché y el ORM asíncronos"""
+    clave = _clave_conteo(queryset)
+    total = await cache.aget(clave)
+    if total is None:
+        total = await queryset.acount()
+        await cache.aset(clave, total, timeout)
+    return total
+
+
+def _clave_conteo(queryset):
+    return 'blog:conteo:' + hashlib.md5(str(queryset.query).encode()).hexdigest()
+
+
+def estimar_filas(modelo, using='default'):
+    """
+    Número aproximado de filas de la tabla del modelo según las estadísticas
+    del motor (sqlite_stat1 tras ANALYZE, pg_class.reltuples en PostgreSQL).
+    Devuelve None si no hay estadísticas.
+    """
+    conexion = connections[using]
+    tabla = modelo._meta.db_table
+    if conexion.vendor == 'sqlite':
+        # La primera cifra de `stat` es el número de filas de cada índice; el
+        # mayor es el de la tabla (los índices parciales cuentan menos)
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s'
+    elif conexion.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    else:
+        return None
+    try:
+        with transaction.atomic(using=using), conexion.cursor() as cursor:
+            cursor.execute(sql, [tabla])
+            filas = [int(str(fila[0]).split()[0]) for fila in cursor.fetchall()]
+    except DatabaseError:
+        # SQLite sin ANALYZE previo no tiene la tabla sqlite_stat1
+        return None
+    if not filas or max(filas) < 0:
+        return None
+    return max(filas)
+
+
+class PaginadorEstimado(Paginator):
+    """
+    Paginator que no hace COUNT(*) sobre tablas grandes: sin filtros usa la
+    estimación del motor y con filtros un recuento cacheado.
+    """
+    # Por debajo de este tamaño el COUNT exacto es barato
+    umbral = 10_000
+    timeout_conteo = 60
+
+    @cached_property
+    def count(self):
+        consulta = self.object_list
+        if not isinstance(consulta, QuerySet):
+            return super().count
+        if not consulta.query.where:
+            estimado = estimar_filas(consulta.model, consulta.db)
+            if estimado is not None and estimado >= self.umbral:
+                return estimado
+        return contar_aproximado(consulta, self.timeout_conteo)
@@ -0,0 +1,59 @@
+"""
+Planes de ejecución (EXPLAIN QUERY PLAN, SQLite) de las consultas de las
+vistas del blog. Los revisan el test PlanesDeLasVistasTests y el comando
+`verificar_planes`: ninguna debe recorrer una tabla completa ni ordenar en
+memoria.
+"""
+import re
+
+from django.utils import timezone
+
+from .consultas import (
+    categorias_sidebar, posts_de_autor, posts_del_listado, relacionados_por_categoria, ultima_actualizacion,
+    vecinos_calculados,
+)
+from .models import Categoria, Post
+from .paginacion import ORDENES_CURSOR, PaginaCursor
+
+# "SCAN tabla" sin "USING ..." es un recorrido completo de la tabla
+RE_RECORRIDO_COMPLETO = re.compile(r'\bSCAN (?!.*\b(USING|VIRTUAL TABLE)\b)(\S+)')
+RE_ORDEN_TEMPORAL = re.compile(r'USE TEMP B-TREE')
+
+
+def _pagina_profunda(posts, orden):
+    """Consulta de una página intermedia en modo cursor"""
+    campo, descendente = ORDENES_CURSOR[orden]
+    pagina = PaginaCursor(posts, campo, descendente, 9)
+    pagina.valor = timezone.now() if campo == 'fecha_creacion' else 100
+    pagina.pk = 1000
+    return pagina._consulta('sig')[:10]
+
+
+def consultas_de_las_vistas():
+    """(nombre, queryset) de cada consulta que ejecutan las vistas del blog"""
+    post = Post(id=1, categoria=Categoria(id=1))
+    consultas = [
+        ('categorias_sidebar', categorias_sidebar()),
+        ('detalle_post:relacionados', vecinos_calculados(post)),
+        ('detalle_post:relacionados:categoria', relacionados_por_categoria(post)),
+        ('mis_posts', posts_de_autor(1)),
+    ]
+    for orden in ORDENES_CURSOR:
+        for categoria_id in (None, 1):
+            posts, _ = posts_del_listado(None, categoria_id, orden)
+            nombre = f'lista_posts:{orden}' + (':categoria' if categoria_id else '')
+            consultas.append((nombre, posts[:10]))
+            consultas.append((nombre + ':cursor', _pagina_profunda(posts, orden)))
+    for categoria_id in (None, 1):
+        posts, _ = posts_del_listado(None, categoria_id)
+        nombre = 'lista_posts:ultima_actualizacion' + (':categoria' if categoria_id else '')
+        consultas.append((nombre, ultima_actualizacion(posts)[:1]))
+    return consultas
+
+
+def problemas(plan):
+    """Líneas del plan con un recorrido completo o un orden en memoria"""
+    return [
+        linea.strip() for linea in plan.splitlines()
+        if RE_RECORRIDO_COMPLETO.search(linea) or RE_ORDEN_TEMPORAL.search(linea)
+    ]
@@ -0,0 +1,73 @@
+"""
+Presupuestos de consultas de las páginas del admin del blog. Los
+comprueban el test PresupuestosAdminTests y el comando `verificar_admin`.
+"""
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from .models import Post
+
+# Número máximo de consultas por página del admin. No debe depender del
+# número de filas, usuarios o categorías.
+PRESUPUESTOS = {
+    'post:listado': 6,
+    'post:listado:autor': 7,
+    'post:listado:busqueda': 6,
+    'post:nuevo': 3,
+    'post:editar': 4,
+    'categoria:listado': 4,
+    'autor:autocompletar': 4,
+    'categoria:autocompletar': 4,
+}
+
+
+def paginas_del_admin():
+    """(nombre, url) de las páginas del admin que se revisan"""
+    paginas = [
+        ('post:listado', reverse('admin:blog_post_changelist')),
+        ('post:listado:busqueda', reverse('admin:blog_post_changelist') + '?q=django'),
+        ('post:nuevo', reverse('admin:blog_post_add')),
+        ('categoria:listado', reverse('admin:blog_categoria_changelist')),
+        ('autor:autocompletar', reverse('admin:autocomplete') + (
+            '?term=a&app_label=blog&model_name=post&field_name=autor'
+        )),
+        ('categoria:autocompletar', reverse('admin:autocomplete') + (
+            '?term=a&app_label=blog&model_name=post&field_name=categoria'
+        )),
+    ]
+    post = Post.objects.only('id', 'autor_id').order_by().first()
+    if post:
+        paginas.append((
+            'post:listado:autor',
+            reverse('admin:blog_post_changelist') + f'?autor={post.autor_id}',
+        ))
+        paginas.append(('post:editar', reverse('admin:blog_post_change', args=[post.pk])))
+    return paginas
+
+
+def cargar(url, usuario):
+    """Carga la página del admin como `usuario` (sin middlewares). Devuelve (respuesta, consultas)."""
+    request = RequestFactory().get(url)
+    request.user = usuario
+    vista = resolve(request.path_info)
+    with CaptureQueriesContext(connection) as consultas:
+        respuesta = vista.func(request, *vista.args, **vista.kwargs)
+        if hasattr(respuesta, 'render'):
+            respuesta.render()
+    return respuesta, consultas.captured_queries
+
+
+def problemas(nombre, respuesta, consultas):
+    """Por qué la página `nombre` no cumple su presupuesto (lista vacía si lo cumple)"""
+    encontrados = []
+    if respuesta.status_code != 200:
+        encontrados.append(f'respuesta {respuesta.status_code}')
+    if len(consultas) > PRESUPUESTOS[nombre]:
+        encontrados.append(f'{len(consultas)} consultas (presupuesto {PRESUPUESTOS[nombre]})')
+    if nombre.startswith('post:listado') and any(
+        '"blog_post"."contenido"' in consulta['sql'] for consulta in consultas
+    ):
+        encontrados.append('el listado carga blog_post.contenido')
+    return encontrados
@@ -0,0 +1,310 @@
+"""
+Posts relacionados por similitud de contenido.
+
+Cada post publicado se representa con un vector TF-IDF de su título y su
+contenido (el título pesa más). La similitud entre dos posts es el coseno
+entre sus vectores, y los `VECINOS` más parecidos de cada post se guardan en
+PostRelacionado, así que detalle_post solo hace una lectura por índice.
+
+Los cálculos usan NumPy sobre una matriz dispersa hecha a mano (formato CSR
+más su índice invertido) y se hacen por bloques de posts para acotar la
+memoria:
+- De cada post solo se guardan sus `TERMINOS_POR_POST` términos de más
+  peso, y se descartan los términos que aparecen en un solo post o en más
+  de una fracción `MAX_DF` de ellos.
+- Los candidatos de cada término salen de su "lista de campeones": los
+  `CAMPEONES_POR_TERMINO` posts en los que ese término pesa más. Así el
+  coste por post no crece con el tamaño del blog, a cambio de que algún
+  vecino de puntuación baja pueda quedar fuera.
+- En modo incremental solo se recalculan los posts modificados desde el
+  último cálculo y los posts en cuya lista entran o estaban. El IDF se
+  recalcula entero, pero las listas del resto no; `--completo` las rehace.
+"""
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Post, PostRelacionado
+
+VECINOS = 6
+TERMINOS_POR_POST = 32
+MAX_DF = 0.3
+PESO_TITULO = 3
+CAMPEONES_POR_TERMINO = 100
+# Pares (post, post) candidatos que se expanden como mucho por bloque
+PARES_POR_BLOQUE = 2_000_000
+# Filas de PostRelacionado por transacción al guardar
+FILAS_POR_LOTE = 2_000
+
+RE_PALABRA = re.compile(r'[a-z0-9]{3,}')
+
+
+def tokenizar(texto):
+    """Palabras de 3 o más caracteres, en minúsculas y sin tildes"""
+    texto = unicodedata.normalize('NFKD', texto.lower()).encode('ascii', 'ignore').decode()
+    return RE_PALABRA.findall(texto)
+
+
+@dataclass
+class Corpus:
+    """Matriz TF-IDF (filas normalizadas) de los posts publicados"""
+    ids: np.ndarray  # id del post de cada fila, ordenados
+    # CSR: los términos de la fila i están en indices[indptr[i]:indptr[i + 1]]
+    indptr: np.ndarray
+    indices: np.ndarray
+    pesos: np.ndarray
+    # Índice invertido: filas que contienen el término t
+    t_indptr: np.ndarray
+    t_filas: np.ndarray
+    t_pesos: np.ndarray
+    # Pares candidatos que genera cada fila al calcular sus similitudes
+    coste: np.ndarray
+
+    def __len__(self):
+        return len(self.ids)
+
+    def posiciones(self, ids):
+        """Fila de cada id y máscara de los ids que están en el corpus"""
+        ids = np.asarray(ids, dtype=np.int64)
+        posiciones = np.searchsorted(self.ids, ids)
+        presentes = posiciones < len(self.ids)
+        presentes[presentes] = self.ids[posiciones[presentes]] == ids[presentes]
+        return posiciones, presentes
+
+    def filas(self, ids):
+        """Filas (ordenadas, sin repetir) de los ids que están en el corpus"""
+        posiciones, presentes = self.posiciones(ids)
+        return np.unique(posiciones[presentes])
+
+
+def _rangos(inicios, longitudes):
+    """Concatenación de range(inicio, inicio + longitud) para cada par, sin bucles"""
+    desplazamientos = np.repeat(np.cumsum(longitudes) - longitudes, longitudes)
+    return np.arange(longitudes.sum()) - desplazamientos + np.repeat(inicios, longitudes)
+
+
+def _indptr(filas, total):
+    return np.concatenate(([0], np.cumsum(np.bincount(filas, minlength=total))))
+
+
+def construir_corpus(posts):
+    """Construye el corpus a partir de tuplas (id, titulo, contenido) ordenadas por id"""
+    vocabulario = {}
+    ids = array('q')
+    longitudes = array('q')
+    terminos = array('q')
+    frecuencias = array('q')
+    for pk, titulo, contenido in posts:
+        cuenta = Counter(tokenizar(titulo) * PESO_TITULO + tokenizar(contenido))
+        ids.append(pk)
+        longitudes.append(len(cuenta))
+        terminos.extend(vocabulario.setdefault(termino, len(vocabulario)) for termino in cuenta)
+        frecuencias.extend(cuenta.values())
+
+    n = len(ids)
+    fila = np.repeat(np.arange(n), np.frombuffer(longitudes, dtype=np.int64))
+    termino = np.frombuffer(terminos, dtype=np.int64)
+    tf = np.frombuffer(frecuencias, dtype=np.int64)
+
+    # Términos útiles: ni exclusivos de un post ni demasiado comunes
+    df = np.bincount(termino, minlength=len(vocabulario))
+    validos = (df >= 2) & (df <= max(2, MAX_DF * n))
+    mascara = validos[termino]
+    fila, termino, tf = fila[mascara], termino[mascara], tf[mascara]
+    idf = np.log((1 + n) / (1 + df)) + 1
+    peso = (1 + np.log(tf)) * idf[termino]
+
+    # Solo los términos de más peso de cada post (ordenados por fila y peso)
+    orden = np.lexsort((termino, -peso, fila))
+    fila, termino, peso = fila[orden], termino[orden], peso[orden]
+    indptr = _indptr(fila, n)
+    rango = np.arange(len(fila)) - indptr[fila]
+    mascara = rango < TERMINOS_POR_POST
+    fila, termino, peso = fila[mascara], termino[mascara], peso[mascara]
+
+    norma = np.sqrt(np.bincount(fila, weights=peso ** 2, minlength=n))
+    peso = peso / norma[fila]
+
+    # Índice invertido con las listas de campeones de cada término
+    invertido = np.lexsort((fila, -peso, termino))
+    t_indptr = _indptr(termino, len(vocabulario))
+    rango = np.arange(len(invertido)) - t_indptr[termino[invertido]]
+    invertido = invertido[rango < CAMPEONES_POR_TERMINO]
+    t_indptr = _indptr(termino[invertido], len(vocabulario))
+    por_termino = np.diff(t_indptr)
+    return Corpus(
+        ids=np.frombuffer(ids, dtype=np.int64),
+        indptr=_indptr(fila, n),
+        indices=termino,
+        pesos=peso,
+        t_indptr=t_indptr,
+        t_filas=fila[invertido],
+        t_pesos=peso[invertido],
+        coste=np.bincount(fila, weights=por_termino[termino], minlength=n),
+    )
+
+
+def _bloques(corpus, filas):
+    """Divide las filas en bloques de como mucho PARES_POR_BLOQUE pares candidatos"""
+    acumulado = np.cumsum(corpus.coste[filas])
+    inicio = 0
+    while inicio < len(filas):
+        base = acumulado[inicio - 1] if inicio else 0
+        fin = max(inicio + 1, int(np.searchsorted(acumulado, base + PARES_POR_BLOQUE, 'right')))
+        yield filas[inicio:fin]
+        inicio = fin
+
+
+def similitudes(corpus, filas):
+    """
+    Similitud de cada fila de `filas` con todos los posts con los que
+    comparte algún término. Devuelve arrays (origen, destino, puntuacion),
+    con `origen` como posición dentro de `filas`.
+    """
+    n = len(corpus)
+    longitudes = corpus.indptr[filas + 1] - corpus.indptr[filas]
+    posiciones = _rangos(corpus.indptr[filas], longitudes)
+    origen = np.repeat(np.arange(len(filas)), longitudes)
+    termino = corpus.indices[posiciones]
+    peso = corpus.pesos[posiciones]
+
+    # Cada término de la fila se cruza con su lista del índice invertido
+    longitudes = corpus.t_indptr[termino + 1] - corpus.t_indptr[termino]
+    posiciones = _rangos(corpus.t_indptr[termino], longitudes)
+    origen = np.repeat(origen, longitudes)
+    destino = corpus.t_filas[posiciones]
+    producto = np.repeat(peso, longitudes) * corpus.t_pesos[posiciones]
+
+    # Producto escalar: suma de los productos de cada par (origen, destino)
+    claves, inverso = np.unique(origen * n + destino, return_inverse=True)
+    puntuacion = np.bincount(inverso, weights=producto)
+    origen, destino = claves // n, claves % n
+    distinto = destino != filas[origen]
+    return origen[distinto], destino[distinto], puntuacion[distinto]
+
+
+def mejores(origen, destino, puntuacion, k=VECINOS):
+    """Los k pares de más puntuación de cada origen, con su posición (0..k-1)"""
+    orden = np.lexsort((destino, -puntuacion, origen))
+    origen, destino, puntuacion = origen[orden], destino[orden], puntuacion[orden]
+    inicios = np.flatnonzero(np.r_[True, origen[1:] != origen[:-1]])
+    rango = np.arange(len(origen)) - np.repeat(inicios, np.diff(np.r_[inicios, len(origen)]))
+    mascara = rango < k
+    return origen[mascara], destino[mascara], puntuacion[mascara], rango[mascara]
+
+
+def _en_trozos(valores, tamano=500):
+    valores = list(valores)
+    for inicio in range(0, len(valores), tamano):
+        yield valores[inicio:inicio + tamano]
+
+
+def _calcular_filas(corpus, filas, umbrales=None):
+    """
+    Vecinos de las filas indicadas. Con `umbrales` (puntuación mínima para
+    entrar en la lista guardada de cada fila) devuelve además las filas en
+    cuya lista entraría alguna de las calculadas.
+    """
+    resultados = []
+    afectadas = set()
+    for bloque in _bloques(corpus, filas):
+        origen, destino, puntuacion = similitudes(corpus, bloque)
+        if umbrales is not None:
+            # La similitud es simétrica: si A entra en la lista de B, B se recalcula
+            afectadas.update(destino[puntuacion > umbrales[destino]].tolist())
+        origen, destino, puntuacion, orden = mejores(origen, destino, puntuacion)
+        resultados.append((bloque[origen], destino, puntuacion, orden))
+    return resultados, afectadas
+
+
+def _guardar(corpus, posts_ids, resultados, fecha):
+    """Sustituye los vecinos guardados de `posts_ids` por los calculados"""
+    if resultados:
+        fila, destino, puntuacion, orden = (np.concatenate(columna) for columna in zip(*resultados))
+    else:
+        fila = destino = orden = np.array([], dtype=np.int64)
+        puntuacion = np.array([], dtype=np.float64)
+    post_id = corpus.ids[fila]
+    relacionado_id = corpus.ids[destino]
+    ordenadas = np.lexsort((orden, post_id))
+
+    # Filas de cada post, en el orden de `posts_ids`
+    posts_ids = np.sort(posts_ids)
+    limites = _indptr(np.searchsorted(posts_ids, post_id), len(posts_ids))
+    guardadas = 0
+    por_lote = max(1, FILAS_POR_LOTE // VECINOS)
+    for inicio in range(0, len(posts_ids), por_lote):
+        fin = min(inicio + por_lote, len(posts_ids))
+        seleccion = ordenadas[limites[inicio]:limites[fin]]
+        with transaction.atomic():
+            PostRelacionado.objects.filter(post_id__in=posts_ids[inicio:fin].tolist()).delete()
+            PostRelacionado.objects.bulk_create([
+                PostRelacionado(
+                    post_id=int(post_id[i]),
+                    relacionado_id=int(relacionado_id[i]),
+                    puntuacion=float(puntuacion[i]),
+                    orden=int(orden[i]),
+                    fecha_calculo=fecha,
+                )
+                for i in seleccion
+            ])
+        guardadas += len(seleccion)
+    return guardadas
+
+
+def calcular(completo=False):
+    """
+    Recalcula los posts relacionados. Sin `completo`, solo los posts que
+    han cambiado desde el último cálculo y los que se ven afectados.
+    Devuelve (posts recalculados, filas guardadas).
+    """
+    fecha = timezone.now()
+    marca = None if completo else PostRelacionado.objects.aggregate(marca=Max('fecha_calculo'))['marca']
+
+    corpus = construir_corpus(
+        Post.objects.filter(publicado=True).order_by('id')
+        .values_list('id', 'titulo', 'contenido').iterator(chunk_size=2000)
+    )
+
+    if marca is None:
+        # Cálculo completo: también se borran los vecinos de los posts no publicados
+        PostRelacionado.objects.exclude(post__publicado=True).delete()
+        resultados, _ = _calcular_filas(corpus, np.arange(len(corpus)))
+        return len(corpus), _guardar(corpus, corpus.ids, resultados, fecha)
+
+    modificados = list(
+        Post.objects.filter(fecha_actualizacion__gt=marca).values_list('id', flat=True).iterator()
+    )
+    # Posts que tenían como vecino a un post modificado
+    afectados = set()
+    for trozo in _en_trozos(modificados):
+        afectados.update(
+            PostRelacionado.objects.filter(relacionado_id__in=trozo).values_list('post_id', flat=True)
+        )
+
+    # Puntuación del último vecino guardado de cada fila: un post modificado
+    # que la supere entra en su lista. Las listas incompletas admiten cualquiera.
+    umbrales = np.zeros(len(corpus))
+    ultimos = np.array(
+        list(PostRelacionado.objects.filter(orden=VECINOS - 1).values_list('post_id', 'puntuacion')),
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    posiciones, presentes = corpus.posiciones(ultimos[:, 0].astype(np.int64))
+    umbrales[posiciones[presentes]] = ultimos[presentes, 1]
+
+    filas_modificadas = corpus.filas(modificados)
+    resultados, entran = _calcular_filas(corpus, filas_modificadas, umbrales)
+    afectados.update(corpus.ids[list(entran)].tolist())
+    filas_afectadas = np.setdiff1d(corpus.filas(sorted(afectados)), filas_modificadas)
+    resultados += _calcular_filas(corpus, filas_afectadas)[0]
+
+    # Los modificados que ya no están publicados se quedan sin vecinos
+    posts_ids = np.union1d(np.array(modificados, dtype=np.int64), corpus.ids[filas_afectadas])
+    return len(posts_ids), _guardar(corpus, posts_ids, resultados, fecha)
@@ -0,0 +1,210 @@
+"""
+Lecturas del blog desde réplicas de la base de datos.
+
+- Las funciones marcadas con @leer_de_replica (la vista del listado y las
+  lecturas del detalle) leen los modelos del blog de una réplica (REPLICAS)
+  elegida al azar. Todo lo demás (escrituras, sesiones, usuarios, admin,
+  comandos, tareas) va a 'default'.
+- Dentro de una petición, tras escribir, las lecturas siguientes van a la
+  primaria. La visita del detalle no cuenta (ver blog/visitas.py).
+- Después de un POST (o de una escritura en una petición GET), el
+  middleware deja una cookie que fija al cliente en la primaria durante
+  REPLICAS_FIJAR_SEGUNDOS: quien acaba de crear un post lo ve aunque la
+  réplica vaya con retraso.
+- Si la réplica no tiene todavía lo que se pide (Http404: un post recién
+  publicado que abre otro cliente) o falla (DatabaseError), la función se
+  repite contra la primaria, así que no debe tener otros efectos (el
+  detalle registra la visita después de leer). Tras un fallo, la réplica no
+  se usa en este proceso durante REPLICAS_ESPERA_FALLO segundos.
+
+En local, DB_REPLICAS apunta a una copia de db.sqlite3 que mantiene el
+comando `sincronizar_replicas`.
+"""
+import contextlib
+import contextvars
+import functools
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http import Http404
+
+# Apps cuyos modelos se leen de las réplicas
+APPS_REPLICADAS = {'blog'}
+
+COOKIE = 'leer_primaria'
+
+estado_actual = contextvars.ContextVar('blog_replicas', default=None)
+
+# alias -> time.monotonic() hasta el que no se usa, tras un fallo
+_caidas = {}
+
+
+class Estado:
+    """Enrutado de una petición. Es mutable: lo comparten los hilos de sync_to_async."""
+
+    def __init__(self, fijado=False):
+        # Cliente fijado a la primaria por la cookie
+        self.fijado = fijado
+        # Réplica de la que lee la vista en curso (None = primaria)
+        self.alias = None
+        self.escrito = False
+        self.sin_fijar = 0
+
+
+def replicas():
+    return getattr(settings, 'REPLICAS', [])
+
+
+def elegir_replica():
+    """Réplica para la petición en curso, o None si debe leer de la primaria"""
+    estado = estado_actual.get()
+    if estado is None or estado.fijado or estado.escrito:
+        return None
+    ahora = time.monotonic()
+    disponibles = [alias for alias in replicas() if _caidas.get(alias, 0) <= ahora]
+    return random.choice(disponibles) if disponibles else None
+
+
+def marcar_caida(alias):
+    _caidas[alias] = time.monotonic() + getattr(settings, 'REPLICAS_ESPERA_FALLO', 30)
+
+
+@contextlib.contextmanager
+def leyendo_de(alias):
+    estado = estado_actual.get()
+    anterior, estado.alias = estado.alias, alias
+    try:
+        yield
+    finally:
+        estado.alias = anterior
+
+
+@contextlib.contextmanager
+def sin_fijar():
+    """Las escrituras de este bloque no fijan la petición ni al cliente a la primaria"""
+    estado = estado_actual.get()
+    if estado is None:
+        yield
+        return
+    estado.sin_fijar += 1
+    try:
+        yield
+    finally:
+        estado.sin_fijar -= 1
+
+
+def leer_de_replica(funcion):
+    """
+    Las lecturas de la función (modelos del blog) van a una réplica. Con
+    Http404 o DatabaseError se repite contra la primaria: no debe escribir
+    nada.
+    """
+    if iscoroutinefunction(funcion):
+        @functools.wraps(funcion)
+        async def envoltura(*args, **kwargs):
+            alias = elegir_replica()
+            if alias is not None:
+                try:
+                    with leyendo_de(alias):
+                        return await funcion(*args, **kwargs)
+                except Http404:
+                    pass
+                except DatabaseError:
+                    marcar_caida(alias)
+            return await funcion(*args, **kwargs)
+        return envoltura
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        alias = elegir_replica()
+        if alias is not None:
+            try:
+                with leyendo_de(alias):
+                    return funcion(*args, **kwargs)
+            except Http404:
+                # Puede que el post aún no haya llegado a la réplica
+                pass
+            except DatabaseError:
+                marcar_caida(alias)
+        return funcion(*args, **kwargs)
+    return envoltura
+
+
+class RouterReplicas:
+    """Router de DATABASE_ROUTERS: reparte las lecturas según el Estado de la petición"""
+
+    def db_for_read(self, model, **hints):
+        estado = estado_actual.get()
+        if (
+            estado is None
+            or estado.alias is None
+            or estado.escrito
+            or model._meta.app_label not in APPS_REPLICADAS
+            # Lo que se lee dentro de una transacción se escribe después
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return estado.alias
+
+    def db_for_write(self, model, **hints):
+        estado = estado_actual.get()
+        if estado is not None and not estado.sin_fijar:
+            estado.escrito = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas tienen los mismos datos que la primaria
+        bases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Las réplicas reciben el esquema de la primaria
+        return False if db in replicas() else None
+
+
+class ReplicasMiddleware:
+    """
+    Crea el Estado de cada petición y fija al cliente en la primaria
+    (cookie COOKIE) tras un POST o una escritura. Sin REPLICAS no se usa.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.fijar = getattr(settings, 'REPLICAS_FIJAR_SEGUNDOS', 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        estado = Estado(fijado=COOKIE in request.COOKIES)
+        token = estado_actual.set(estado)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            estado_actual.reset(token)
+        return self.terminar(request, respuesta, estado)
+
+    async def __acall__(self, request):
+        estado = Estado(fijado=COOKIE in request.COOKIES)
+        token = estado_actual.set(estado)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            estado_actual.reset(token)
+        return self.terminar(request, respuesta, estado)
+
+    def terminar(self, request, respuesta, estado):
+        if estado.escrito or request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            respuesta.set_cookie(COOKIE, '1', max_age=self.fijar, httponly=True, samesite='Lax')
+        return respuesta
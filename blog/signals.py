@@ -0,0 +1,149 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import busqueda, contadores, fragmentos, imagenes, tarjetas
+from .models import Categoria, Post
+
+CAMPOS_INDEXADOS = {'titulo', 'contenido', 'autor'}
+CAMPOS_CONTADOR = {'categoria', 'categoria_id', 'publicado'}
+CAMPOS_NOMBRE_AUTOR = {'first_name', 'last_name', 'username'}
+CAMPOS_INDEXADOS_AUTOR = {'username'}
+
+
+@receiver(post_init, sender=Post)
+def recordar_estado(sender, instance, **kwargs):
+    """Guarda la categoría y el estado de publicación con los que se cargó el post"""
+    instance._estado_guardado = contadores.estado(instance)
+
+
+@receiver(post_init, sender=Post)
+def recordar_imagen(sender, instance, **kwargs):
+    """Guarda el nombre de la imagen con el que se cargó el post (None si está diferida)"""
+    instance._imagen_guardada = _nombre_imagen(instance)
+
+
+def _nombre_imagen(post):
+    if 'imagen' not in post.__dict__:
+        return None
+    return post.imagen.name or ''
+
+
+@receiver(post_save, sender=Post)
+def programar_variantes_imagen(sender, instance, created, update_fields=None, **kwargs):
+    """Encola la generación de las variantes de una imagen nueva"""
+    if update_fields is not None and 'imagen' not in update_fields:
+        return
+    actual = _nombre_imagen(instance)
+    anterior = '' if created else instance._imagen_guardada
+    if actual is None or actual == anterior:
+        return
+    instance._imagen_guardada = actual
+    if instance.imagen_anchos or instance.imagen_ancho is not None:
+        # Las variantes guardadas son de la imagen anterior
+        instance.imagen_anchos, instance.imagen_ancho = [], None
+        Post.objects.filter(pk=instance.pk).update(imagen_anchos=[], imagen_ancho=None)
+    if actual:
+        imagenes.procesar_post.encolar(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def indexar_post(sender, instance, update_fields=None, **kwargs):
+    """Mantiene el índice de búsqueda al crear o editar un post"""
+    if update_fields is not None and not CAMPOS_INDEXADOS.intersection(update_fields):
+        return
+    busqueda.indexar_post(instance)
+
+
+# Debe registrarse antes que actualizar_contadores, que sobrescribe _estado_guardado
+@receiver(post_save, sender=Post)
+def invalidar_fragmentos_post(sender, instance, created, update_fields=None, **kwargs):
+    """Invalida los fragmentos del listado en los que aparece el post"""
+    if update_fields is not None and set(update_fields) <= {'visitas'}:
+        return
+    anterior = None if created else instance._estado_guardado
+    actual = contadores.estado(instance)
+    ambitos = ['global', fragmentos.ambito_categoria(instance.categoria_id)]
+    if anterior:
+        ambitos.append(fragmentos.ambito_categoria(anterior[0]))
+    if anterior != actual:
+        ambitos.append('categorias')
+    fragmentos.invalidar(*ambitos)
+
+
+@receiver(post_save, sender=Post)
+def actualizar_contadores(sender, instance, created, update_fields=None, **kwargs):
+    """Ajusta Categoria.total_publicados al crear, publicar o recategorizar un post"""
+    if update_fields is not None and not CAMPOS_CONTADOR.intersection(update_fields):
+        return
+
+    anterior = None if created else instance._estado_guardado
+    actual = contadores.estado(instance)
+    if not created and anterior is None:
+        # El post se cargó con campos diferidos: no sabemos de dónde venía
+        contadores.recalcular(actual[0] if actual else instance.categoria_id)
+    else:
+        contadores.ajustar(contadores.deltas_por_cambio(anterior, actual))
+    instance._estado_guardado = actual
+
+
+# Después de programar_variantes_imagen, que puede vaciar imagen_anchos
+@receiver(post_save, sender=Post)
+def copiar_tarjeta(sender, instance, **kwargs):
+    """Crea o actualiza la tarjeta del post (ver blog/tarjetas.py)"""
+    tarjetas.copiar(Post.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def desindexar_post(sender, instance, **kwargs):
+    """Quita el post borrado del índice de búsqueda"""
+    busqueda.desindexar_post(instance.id)
+
+
+@receiver(post_delete, sender=Post)
+def descontar_post(sender, instance, **kwargs):
+    """Descuenta el post borrado del contador de su categoría"""
+    contadores.ajustar(contadores.deltas_por_cambio(instance._estado_guardado, None))
+
+
+@receiver(post_delete, sender=Post)
+def invalidar_fragmentos_post_borrado(sender, instance, **kwargs):
+    """Invalida los fragmentos del listado en los que aparecía el post"""
+    fragmentos.invalidar('global', 'categorias', fragmentos.ambito_categoria(instance.categoria_id))
+
+
+@receiver([post_save, post_delete], sender=Categoria)
+def invalidar_fragmentos_categoria(sender, instance, **kwargs):
+    """Invalida la barra lateral y las tarjetas que muestran la categoría"""
+    fragmentos.invalidar('global', 'categorias', fragmentos.ambito_categoria(instance.id))
+
+
+@receiver(post_save, sender=Categoria)
+def renombrar_categoria_tarjetas(sender, instance, created, **kwargs):
+    """Copia el nombre de la categoría a las tarjetas de sus posts"""
+    if not created:
+        tarjetas.renombrar_categoria(instance)
+
+
+@receiver(pre_delete, sender=Categoria)
+def quitar_categoria_tarjetas(sender, instance, **kwargs):
+    """Las tarjetas de los posts de la categoría borrada dejan de mostrarla"""
+    tarjetas.quitar_categoria(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def renombrar_autor_tarjetas(sender, instance, created, update_fields=None, **kwargs):
+    """Copia el nombre del usuario a las tarjetas de sus posts"""
+    if created or (update_fields is not None and not CAMPOS_NOMBRE_AUTOR.intersection(update_fields)):
+        return
+    categorias = tarjetas.renombrar_autor(instance)
+    if categorias:
+        fragmentos.invalidar('global', *(fragmentos.ambito_categoria(pk) for pk in categorias))
+
+
+@receiver(post_save, sender=User)
+def indexar_posts_de_autor(sender, instance, created, update_fields=None, **kwargs):
+    """Mantiene el nombre de usuario del autor en el índice de búsqueda"""
+    if created or (update_fields is not None and not CAMPOS_INDEXADOS_AUTOR.intersection(update_fields)):
+        return
+    busqueda.indexar_posts_de_autor(instance.pk)
@@ -0,0 +1,68 @@
+"""
+Asignación de slugs únicos para posts nuevos.
+
+En lugar de probar `slug`, `slug-1`, `slug-2`... con una consulta cada uno,
+se leen de una vez todos los slugs `base` y `base-N` existentes con una
+consulta de rango sobre el índice único de `slug`, y se elige el siguiente
+sufijo. Si otra petición se adelanta con el mismo slug, el INSERT falla por
+la restricción única dentro de un savepoint y se vuelve a intentar.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from .models import Post
+
+# Deja sitio para "-" más el sufijo numérico dentro de max_length
+MAX_BASE = Post._meta.get_field('slug').max_length - 10
+
+
+def slug_base(texto):
+    return slugify(texto)[:MAX_BASE].strip('-') or 'post'
+
+
+def siguiente_slug(base):
+    """Primer slug libre para `base`: la propia base o `base-N` con el menor N libre"""
+    # 'base' y 'base-...' son exactamente los valores en [base, base + '.'),
+    # porque '-' es el único carácter de un slug anterior a '.'
+    existentes = Post.objects.filter(
+        slug__gte=base, slug__lt=base + '.'
+    ).order_by().values_list('slug', flat=True)
+
+    patron = re.compile(rf'^{re.escape(base)}-(\d+)$')
+    base_ocupada = False
+    sufijos = set()
+    for slug in existentes:
+        if slug == base:
+            base_ocupada = True
+        else:
+            coincidencia = patron.match(slug)
+            if coincidencia:
+                sufijos.add(int(coincidencia.group(1)))
+
+    if not base_ocupada:
+        return base
+    numero = 1
+    while numero in sufijos:
+        numero += 1
+    return f'{base}-{numero}'
+
+
+def guardar_con_slug_unico(post, intentos=5):
+    """
+    Inserta un post nuevo con un slug libre, derivado de `post.slug` si ya
+    tiene uno o del título si no.
+    """
+    base = slug_base(post.slug or post.titulo)
+    for intento in range(intentos):
+        post.slug = siguiente_slug(base)
+        try:
+            with transaction.atomic():
+                post.save(force_insert=True)
+            return post
+        except IntegrityError:
+            # Solo se reintenta si el conflicto fue el slug
+            ultimo_intento = intento == intentos - 1
+            if ultimo_intento or not Post.objects.filter(slug=post.slug).exists():
+                raise
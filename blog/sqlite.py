@@ -0,0 +1,83 @@
+"""
+Perfiles de configuración de SQLite.
+
+El perfil (SQLITE_PERFIL) se aplica a cada conexión nueva desde la señal
+connection_created:
+- 'desarrollo': lo que trae Django (diario de rollback, synchronous=FULL).
+- 'produccion': pensado para varios workers de Gunicorn sobre el mismo
+  archivo:
+  - journal_mode=WAL: los lectores no esperan a los escritores ni al revés;
+    solo se serializan las escrituras.
+  - synchronous=NORMAL: en WAL no se pierde la integridad, solo las últimas
+    transacciones si se cae la máquina (no el proceso).
+  - busy_timeout: un escritor espera el bloqueo en lugar de fallar con
+    "database is locked".
+  - mmap_size, cache_size y temp_store=MEMORY: menos lecturas de disco y
+    tablas temporales (ORDER BY, GROUP BY) en memoria.
+  - Transacciones IMMEDIATE (Django 5.1+): transaction.atomic() toma el
+    bloqueo de escritura al empezar. Con DEFERRED, una transacción que lee
+    y luego escribe no puede esperar al bloqueo y falla al momento si otra
+    escribió entre medias.
+
+SQLITE_PRAGMAS cambia o añade pragmas sobre los del perfil. WAL queda
+guardado en el archivo de la base de datos: volver a 'desarrollo' no lo
+desactiva.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+
+PERFILES = {
+    'desarrollo': {},
+    'produccion': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,  # ms
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -32000,  # negativo: KiB por conexión
+        'temp_store': 'MEMORY',
+        # Tamaño al que se recorta el archivo -wal tras cada checkpoint
+        'journal_size_limit': 64 * 1024 * 1024,
+    },
+}
+
+# Modo de las transacciones de cada perfil (BEGIN <modo>)
+MODOS_TRANSACCION = {
+    'desarrollo': None,
+    'produccion': 'IMMEDIATE',
+}
+
+
+def pragmas(perfil=None):
+    """Pragmas del perfil indicado (por defecto, SQLITE_PERFIL) con SQLITE_PRAGMAS encima"""
+    perfil = perfil or getattr(settings, 'SQLITE_PERFIL', 'desarrollo')
+    if perfil not in PERFILES:
+        raise ImproperlyConfigured(
+            f"SQLITE_PERFIL '{perfil}' no existe. Opciones: {', '.join(PERFILES)}"
+        )
+    return {**PERFILES[perfil], **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+def configurar_conexion(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    perfil = getattr(settings, 'SQLITE_PERFIL', 'desarrollo')
+    # Directamente sobre la conexión de sqlite3: sin execute_wrappers ni log
+    for nombre, valor in pragmas(perfil).items():
+        connection.connection.execute(f'PRAGMA {nombre} = {valor}')
+    if MODOS_TRANSACCION[perfil] and not connection.settings_dict['OPTIONS'].get('transaction_mode'):
+        connection.transaction_mode = MODOS_TRANSACCION[perfil]
+
+
+def estado(connection):
+    """Valor actual de los pragmas del perfil en una conexión abierta"""
+    with connection.cursor() as cursor:
+        resultado = {}
+        for nombre in PERFILES['produccion']:
+            cursor.execute(f'PRAGMA {nombre}')
+            resultado[nombre] = cursor.fetchone()[0]
+    return resultado
+
+
+def instalar():
+    connection_created.connect(configurar_conexion, dispatch_uid='blog_sqlite_perfil')
@@ -0,0 +1,86 @@
+"""
+Tarjetas de los posts (TarjetaPost): copia de lo que muestran el listado y
+"Mis posts", para leerlo de una sola tabla.
+
+- Las señales de Post, User y Categoria (ver blog/signals.py) mantienen las
+  tarjetas al guardar, y el borrado de un post borra su tarjeta (CASCADE).
+- Las operaciones en bloque que no disparan señales actualizan también la
+  tarjeta: publicar/despublicar, volcar_visitas, calcular_tendencias y las
+  variantes de imagen.
+- `python manage.py reconstruir_tarjetas` las vuelve a copiar todas (tras
+  bulk_create, SQL directo, etc.).
+"""
+from django.db import transaction
+
+from .models import TarjetaPost
+
+# Campos que se copian tal cual del post
+CAMPOS_POST = (
+    'slug', 'titulo', 'extracto', 'autor_id', 'categoria_id', 'imagen', 'imagen_anchos',
+    'fecha_creacion', 'fecha_actualizacion', 'publicado', 'visitas', 'puntuacion_tendencia',
+)
+CAMPOS = CAMPOS_POST + ('autor_nombre', 'categoria_nombre')
+
+
+def nombre_autor(nombre, apellidos, username):
+    """Como User.get_full_name() con el username por defecto (también con modelos históricos)"""
+    return f'{nombre} {apellidos}'.strip() or username
+
+
+def copiar(posts, modelo=TarjetaPost, lote=1000):
+    """
+    Crea o actualiza las tarjetas de los posts del queryset, por lotes de
+    `lote` posts con un INSERT ... ON CONFLICT cada uno. `modelo` permite
+    usarlo desde las migraciones. Devuelve el número de tarjetas escritas.
+    """
+    filas = posts.order_by('pk').values_list(
+        'pk', *CAMPOS_POST,
+        'autor__first_name', 'autor__last_name', 'autor__username', 'categoria__nombre',
+    )
+    copiadas = 0
+    ultimo = 0
+    while True:
+        bloque = list(filas.filter(pk__gt=ultimo)[:lote])
+        if not bloque:
+            return copiadas
+        tarjetas = []
+        for pk, *valores, nombre, apellidos, username, categoria in bloque:
+            tarjetas.append(modelo(
+                post_id=pk,
+                **dict(zip(CAMPOS_POST, valores)),
+                autor_nombre=nombre_autor(nombre, apellidos, username),
+                categoria_nombre=categoria or '',
+            ))
+        modelo.objects.bulk_create(
+            tarjetas, update_conflicts=True, unique_fields=['post'], update_fields=CAMPOS,
+        )
+        copiadas += len(tarjetas)
+        ultimo = bloque[-1][0]
+
+
+def reconstruir(posts):
+    """Borra todas las tarjetas y las vuelve a copiar de los posts del queryset"""
+    with transaction.atomic():
+        TarjetaPost.objects.all().delete()
+        return copiar(posts)
+
+
+def renombrar_autor(usuario):
+    """Copia el nombre del usuario a sus tarjetas. Devuelve los ids de categoría afectados."""
+    nombre = nombre_autor(usuario.first_name, usuario.last_name, usuario.username)
+    tarjetas = TarjetaPost.objects.filter(autor_id=usuario.pk).exclude(autor_nombre=nombre)
+    categorias = set(tarjetas.values_list('categoria_id', flat=True).distinct())
+    if categorias:
+        tarjetas.update(autor_nombre=nombre)
+    return categorias
+
+
+def renombrar_categoria(categoria):
+    TarjetaPost.objects.filter(categoria_id=categoria.pk).exclude(
+        categoria_nombre=categoria.nombre
+    ).update(categoria_nombre=categoria.nombre)
+
+
+def quitar_categoria(categoria_id):
+    """Antes de borrar una categoría (el borrado deja categoria_id a NULL)"""
+    TarjetaPost.objects.filter(categoria_id=categoria_id).update(categoria_nombre='')
@@ -0,0 +1,95 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from blog import fragmentos, imagenes
+
+register = template.Library()
+
+
+class FragmentoNode(template.Node):
+    def __init__(self, nodelist, nombre, ambitos, variantes):
+        self.nodelist = nodelist
+        self.nombre = nombre
+        self.ambitos = ambitos
+        self.variantes = variantes
+
+    def render(self, context):
+        nombre = self.nombre.resolve(context)
+        ambitos = self.ambitos.resolve(context)
+        if isinstance(ambitos, str):
+            ambitos = ambitos.split(',')
+        variantes = [variante.resolve(context) for variante in self.variantes]
+
+        clave = fragmentos.clave_fragmento(nombre, ambitos, variantes)
+        contenido = fragmentos.obtener(nombre, clave)
+        if contenido is None:
+            contenido = self.nodelist.render(context)
+            fragmentos.guardar(clave, contenido)
+        return contenido
+
+
+@register.tag('fragmento')
+def do_fragmento(parser, token):
+    """
+    Cachea un fragmento de plantilla con invalidación por versiones.
+
+    Uso::
+
+        {% fragmento "nombre" "ambito1,ambito2" variante1 variante2 ... %}
+            ...
+        {% endfragmento %}
+
+    El fragmento se regenera cuando cambia la versión de alguno de los
+    ámbitos (ver blog/fragmentos.py) o cualquiera de las variantes.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' necesita al menos un nombre y los ámbitos del fragmento."
+        )
+    nodelist = parser.parse(('endfragmento',))
+    parser.delete_first_token()
+    return FragmentoNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
+
+
+@register.simple_tag
+def imagen_post(post, sizes='100vw', clase='', estilo='', lazy=True):
+    """
+    <picture> con las variantes WebP y JPEG de la imagen del post (o de su
+    TarjetaPost) en `srcset`.
+
+    Uso::
+
+        {% imagen_post post sizes="(min-width: 992px) 33vw, 100vw" clase="card-img-top" %}
+
+    Si las variantes aún no están generadas, usa la imagen original.
+    """
+    nombre = post.imagen.name
+    carga = 'lazy' if lazy else 'eager'
+    if not post.imagen_anchos:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" style="{}" loading="{}" decoding="async">',
+            post.imagen.url, clase, post.titulo, estilo, carga,
+        )
+
+    def srcset(extension):
+        return ', '.join(
+            f'{default_storage.url(imagenes.nombre_variante(nombre, ancho, extension))} {ancho}w'
+            for ancho in post.imagen_anchos
+        )
+
+    mayor = imagenes.nombre_variante(nombre, max(post.imagen_anchos), 'jpg')
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" style="{}" loading="{}" decoding="async">'
+        '</picture>',
+        srcset('webp'), sizes,
+        default_storage.url(mayor), srcset('jpg'), sizes, clase, post.titulo, estilo, carga,
+    )
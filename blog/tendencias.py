@@ -0,0 +1,106 @@
+"""
+Puntuación de tendencia de los posts (listado con orden=tendencias).
+
+Cada visita vale 2^((t - ORIGEN) / vida media), con t el momento en que se
+cuenta: una visita vale el doble que otra de una vida media antes
+("forward decay"). Dividir todas las puntuaciones entre
+2^((ahora - ORIGEN) / vida media) da la puntuación con decaimiento
+exponencial de hoy, pero como el divisor es el mismo para todos los posts
+el orden no cambia: las puntuaciones guardadas no se recalculan con el paso
+del tiempo, solo se les suman las visitas nuevas.
+
+- Al calcularla por primera vez (o con `--completo`), un post parte de sus
+  visitas más PESO_PUBLICACION, todas en su fecha de publicación: los posts
+  nuevos entran arriba y bajan si no reciben visitas.
+- Después, cada ejecución de `calcular_tendencias` suma las visitas
+  volcadas desde la anterior (Post.visitas - Post.visitas_puntuadas) con el
+  peso del momento actual.
+
+Se guarda el log2 de la puntuación, que crece de forma lineal con el tiempo
+y no desborda. Cambiar BLOG_TENDENCIAS_VIDA_MEDIA cambia la escala:
+requiere `calcular_tendencias --completo`.
+"""
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import fragmentos
+from .models import Post, TarjetaPost
+
+ORIGEN = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+PESO_PUBLICACION = 10
+POSTS_POR_LOTE = 2000
+
+
+def vida_media():
+    """Vida media de una visita, en segundos"""
+    return getattr(settings, 'BLOG_TENDENCIAS_VIDA_MEDIA', 48) * 3600
+
+
+def exponente(fecha):
+    return (fecha - ORIGEN).total_seconds() / vida_media()
+
+
+def sumar(puntuacion, visitas, fecha):
+    """log2(2^puntuacion + visitas * 2^exponente(fecha)), sin pasar por valores enormes"""
+    if visitas <= 0:
+        return puntuacion
+    nueva = math.log2(visitas) + exponente(fecha)
+    if puntuacion is None:
+        return nueva
+    mayor, menor = max(puntuacion, nueva), min(puntuacion, nueva)
+    return mayor + math.log2(1 + 2 ** (menor - mayor))
+
+
+def puntuacion_inicial(visitas, fecha_publicacion):
+    return sumar(None, visitas + PESO_PUBLICACION, fecha_publicacion)
+
+
+def calcular(completo=False):
+    """
+    Actualiza las puntuaciones de los posts publicados: los que no la tienen
+    (o todos, con `completo`) desde cero y el resto con sus visitas nuevas.
+    Devuelve el número de posts actualizados.
+    """
+    ahora = timezone.now()
+    pendientes = Post.objects.filter(publicado=True)
+    if not completo:
+        pendientes = pendientes.filter(
+            Q(puntuacion_tendencia__isnull=True) | Q(visitas__gt=F('visitas_puntuadas'))
+        )
+    actualizados = 0
+    ultimo_id = 0
+    while True:
+        # Por rangos de id: sin cursores abiertos mientras se escribe
+        filas = list(
+            pendientes.filter(id__gt=ultimo_id).order_by('id').values_list(
+                'id', 'visitas', 'visitas_puntuadas', 'puntuacion_tendencia',
+                'fecha_publicacion', 'fecha_creacion',
+            )[:POSTS_POR_LOTE]
+        )
+        if not filas:
+            break
+        ultimo_id = filas[-1][0]
+        posts, tarjetas = [], []
+        for pk, visitas, puntuadas, puntuacion, publicacion, creacion in filas:
+            if completo or puntuacion is None:
+                puntuacion = puntuacion_inicial(visitas, publicacion or creacion)
+            else:
+                puntuacion = sumar(puntuacion, visitas - puntuadas, ahora)
+            posts.append(Post(id=pk, puntuacion_tendencia=puntuacion, visitas_puntuadas=visitas))
+            tarjetas.append(TarjetaPost(post_id=pk, puntuacion_tendencia=puntuacion))
+        # Solo estas dos columnas: las visitas que se vuelquen mientras tanto
+        # se suman en la siguiente ejecución
+        with transaction.atomic():
+            Post.objects.bulk_update(posts, ['puntuacion_tendencia', 'visitas_puntuadas'], batch_size=500)
+            TarjetaPost.objects.bulk_update(tarjetas, ['puntuacion_tendencia'], batch_size=500)
+        actualizados += len(posts)
+
+    if actualizados:
+        # El orden del listado cambia: nuevo ETag (ver blog/condicional.py)
+        fragmentos.invalidar('visitas')
+    return actualizados
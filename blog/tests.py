@@ -0,0 +1,100 @@
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from . import planes, presupuestos
+from .models import Categoria, Post
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def crear_post(self, titulo):
+        return self.client.post(reverse('admin:blog_post_add'), {
+            'titulo': titulo,
+            'slug': 'hola-mundo',  # lo que rellena prepopulated_fields
+            'autor': self.admin.pk,
+            'contenido': 'Contenido',
+            'publicado': 'on',
+        })
+
+    def test_titulo_repetido_recibe_el_siguiente_sufijo(self):
+        for _ in range(3):
+            respuesta = self.crear_post('Hola mundo')
+            self.assertEqual(respuesta.status_code, 302)
+
+        self.assertEqual(
+            sorted(Post.objects.values_list('slug', flat=True)),
+            ['hola-mundo', 'hola-mundo-1', 'hola-mundo-2'],
+        )
+
+    def test_editar_con_slug_de_otro_post_sigue_fallando(self):
+        self.crear_post('Hola mundo')
+        otro = Post.objects.create(titulo='Otro', slug='otro', contenido='x', autor=self.admin)
+        respuesta = self.client.post(reverse('admin:blog_post_change', args=[otro.pk]), {
+            'titulo': 'Otro',
+            'slug': 'hola-mundo',
+            'contenido': 'x',
+            'autor': self.admin.pk,
+        })
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(Post.objects.get(pk=otro.pk).slug, 'otro')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN solo se revisa en SQLite')
+class PlanesDeLasVistasTests(TestCase):
+    def test_las_consultas_de_las_vistas_usan_indices(self):
+        for nombre, queryset in planes.consultas_de_las_vistas():
+            with self.subTest(consulta=nombre):
+                self.assertEqual(planes.problemas(queryset.explain()), [])
+
+
+class PresupuestosAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        categorias = [Categoria.objects.create(nombre=f'Categoría {numero}') for numero in range(3)]
+        autores = [User.objects.create_user(f'autor{numero}') for numero in range(4)]
+        for numero in range(12):
+            Post.objects.create(
+                titulo=f'Django {numero}', slug=f'django-{numero}', contenido='Contenido largo',
+                autor=autores[numero % 4], categoria=categorias[numero % 3], publicado=numero % 2 == 0,
+            )
+        if connection.vendor == 'sqlite':
+            # Con estadísticas, como una base de datos en uso: sin ellas
+            # PaginadorEstimado lanza consultas de más (ver estimar_filas)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def test_paginas_del_admin_dentro_de_presupuesto(self):
+        paginas = dict(presupuestos.paginas_del_admin())
+        self.assertEqual(paginas.keys(), presupuestos.PRESUPUESTOS.keys())
+        for nombre, url in paginas.items():
+            with self.subTest(pagina=nombre):
+                respuesta, consultas = presupuestos.cargar(url, self.admin)
+                self.assertEqual(presupuestos.problemas(nombre, respuesta, consultas), [])
+
+
+class PublicarPostTests(TestCase):
+    def test_publicar_guarda_los_cambios_pendientes(self):
+        autor = User.objects.create_user('autor')
+        categoria = Categoria.objects.create(nombre='Django')
+        post = Post.objects.create(titulo='Borrador', slug='borrador', contenido='x', autor=autor, categoria=categoria)
+
+        post.titulo = 'Definitivo'
+        post.publicar()
+
+        guardado = Post.objects.get(pk=post.pk)
+        self.assertEqual(guardado.titulo, 'Definitivo')
+        self.assertTrue(guardado.publicado)
+        self.assertIsNotNone(guardado.fecha_publicacion)
+        categoria.refresh_from_db()
+        self.assertEqual(categoria.total_publicados, 1)
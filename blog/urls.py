@@ -1,10 +1,18 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Con BLOG_VISTAS_ASYNC (despliegue ASGI) las vistas de lectura son async
+if settings.BLOG_VISTAS_ASYNC:
+    lista_posts, detalle_post = views.lista_posts_async, views.detalle_post_async
+else:
+    lista_posts, detalle_post = views.lista_posts, views.detalle_post
+
 urlpatterns = [
-    path('', views.lista_posts, name='lista_posts'),
-    path('post/<slug:slug>/', views.detalle_post, name='detalle_post'),
+    path('', lista_posts, name='lista_posts'),
+    path('post/<slug:slug>/', detalle_post, name='detalle_post'),
     path('crear/', views.crear_post, name='crear_post'),
     path('mis-posts/', views.mis_posts, name='mis_posts'),
+    path('cache/estadisticas/', views.estadisticas_cache, name='estadisticas_cache'),
 ]
 
@@ -1,120 +1,217 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
-from django.utils.text import slugify
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from . import condicional, fragmentos
+from .replicas import leer_de_replica
+from .forms import PostForm
+from .consultas import (
+    buscar_relacionados, categorias_sidebar, posts_de_autor, posts_del_listado,
+    relacionados_por_categoria, ultima_actualizacion, vecinos_calculados,
+)
 from .models import Post, Categoria
+from .slugs import guardar_con_slug_unico
+from .paginacion import ORDENES_CURSOR, PaginaCursor, acontar_aproximado, contar_aproximado
+from .visitas import aregistrar_visita, registrar_visita
 
 
-def lista_posts(request):
-    """Vista para listar todos los posts publicados"""
-    posts = Post.objects.filter(publicado=True).select_related('autor', 'categoria')
-    
-    # Búsqueda
+def _parametros_listado(request):
+    """(query, categoria_id, orden, page_number, modo_cursor) de la petición"""
     query = request.GET.get('q')
-    if query:
-        posts = posts.filter(
-            Q(titulo__icontains=query) |
-            Q(contenido__icontains=query) |
-            Q(autor__username__icontains=query)
-        )
-    
-    # Filtro por categoría
     categoria_id = request.GET.get('categoria')
-    if categoria_id:
-        posts = posts.filter(categoria_id=categoria_id)
-    
-    # Ordenamiento
-    orden = request.GET.get('orden', 'recientes')
-    if orden == 'antiguos':
-        posts = posts.order_by('fecha_creacion')
-    elif orden == 'populares':
-        posts = posts.order_by('-visitas')
-    else:
-        posts = posts.order_by('-fecha_creacion')
+    # Las búsquedas se ordenan por relevancia por defecto
+    orden = request.GET.get('orden', 'relevancia' if query else 'recientes')
     
-    # Paginación
-    paginator = Paginator(posts, 9)  # 9 posts por página
+    # Paginación: por cursor (sin OFFSET ni COUNT exacto) salvo que se pida
+    # una página concreta con ?page=N o el orden no lo permita (relevancia)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    categorias = Categoria.objects.annotate(total=Count('posts')).order_by('-total')
-    
-    context = {
+    modo_cursor = (
+        getattr(settings, 'BLOG_PAGINACION', 'cursor') == 'cursor'
+        and not page_number
+        and orden in ORDENES_CURSOR
+    )
+    return query, categoria_id, orden, page_number, modo_cursor
+
+
+def _contexto_listado(page_obj, modo_cursor, total_posts, categorias, query, categoria_id, orden):
+    return {
         'page_obj': page_obj,
+        'modo_cursor': modo_cursor,
+        'total_posts': total_posts,
         'categorias': categorias,
+        # Versiones de caché de las que dependen las tarjetas (ver
+        # blog/fragmentos.py): 'visitas' cambia en cada volcado del contador
+        'ambitos_tarjetas': [fragmentos.ambito_categoria(categoria_id), 'visitas'],
         'query': query,
         'categoria_id': categoria_id,
         'orden': orden,
     }
+
+
+@leer_de_replica
+def lista_posts(request):
+    """Vista para listar todos los posts publicados"""
+    query, categoria_id, orden, page_number, modo_cursor = _parametros_listado(request)
+    posts, _ = posts_del_listado(query, categoria_id, orden)
+    
+    # Si la copia del cliente sigue valiendo, 304 sin paginar ni renderizar
+    # (ver blog/condicional.py)
+    etag, ultima = condicional.validadores_listado(
+        ultima_actualizacion(posts).first(), fragmentos.ambito_categoria(categoria_id), request.user
+    )
+    no_modificado = condicional.responder(request, etag, ultima)
+    if no_modificado:
+        return no_modificado
+    
+    if modo_cursor:
+        campo, descendente = ORDENES_CURSOR[orden]
+        page_obj = PaginaCursor(posts, campo, descendente, 9, request.GET.get('cursor'))
+        total_posts = contar_aproximado(posts)
+    else:
+        paginator = Paginator(posts, 9)  # 9 posts por página
+        page_obj = paginator.get_page(page_number)
+        total_posts = paginator.count
+    
+    categorias = categorias_sidebar()
+    
+    context = _contexto_listado(page_obj, modo_cursor, total_posts, categorias, query, categoria_id, orden)
+    return condicional.anotar(render(request, 'blog/lista_posts.html', context), etag, ultima)
+
+
+@leer_de_replica
+async def lista_posts_async(request):
+    """
+    Versión asíncrona de lista_posts: todas las consultas se hacen con el
+    ORM asíncrono antes de renderizar, y la plantilla no toca la base de datos.
+    """
+    # base.html usa request.user; así no se carga de forma síncrona
+    request.user = await request.auser()
+    query, categoria_id, orden, page_number, modo_cursor = _parametros_listado(request)
+    # Puede comprobar (como mucho cada minuto) si existe el índice de búsqueda
+    posts, _ = await sync_to_async(posts_del_listado)(query, categoria_id, orden)
+    
+    etag, ultima = condicional.validadores_listado(
+        await ultima_actualizacion(posts).afirst(), fragmentos.ambito_categoria(categoria_id), request.user
+    )
+    no_modificado = condicional.responder(request, etag, ultima)
+    if no_modificado:
+        return no_modificado
     
-    return render(request, 'blog/lista_posts.html', context)
+    if modo_cursor:
+        campo, descendente = ORDENES_CURSOR[orden]
+        page_obj = PaginaCursor(posts, campo, descendente, 9, request.GET.get('cursor'))
+        await page_obj.acargar()
+        total_posts = await acontar_aproximado(posts)
+    else:
+        paginator = Paginator(posts, 9)
+        paginator.count = total_posts = await posts.acount()
+        page_obj = paginator.get_page(page_number)
+        page_obj.object_list = [post async for post in page_obj.object_list]
+    
+    categorias = [categoria async for categoria in categorias_sidebar()]
+    
+    context = _contexto_listado(page_obj, modo_cursor, total_posts, categorias, query, categoria_id, orden)
+    return condicional.anotar(render(request, 'blog/lista_posts.html', context), etag, ultima)
+
+
+@leer_de_replica
+def _leer_detalle(slug):
+    """El post publicado y sus relacionados, sin escribir nada (ver blog/replicas.py)"""
+    post = get_object_or_404(
+        Post.objects.select_related('autor', 'categoria'), slug=slug, publicado=True
+    )
+    # Posts relacionados (por similitud de contenido, ver blog/relacionados.py)
+    return post, buscar_relacionados(post)
+
+
+@leer_de_replica
+async def _aleer_detalle(slug):
+    """Versión asíncrona de _leer_detalle"""
+    post = await aget_object_or_404(
+        Post.objects.select_related('autor', 'categoria'), slug=slug, publicado=True
+    )
+    posts_relacionados = [relacionado async for relacionado in vecinos_calculados(post)]
+    if not posts_relacionados and post.categoria_id:
+        posts_relacionados = [relacionado async for relacionado in relacionados_por_categoria(post)]
+    return post, posts_relacionados
 
 
 def detalle_post(request, slug):
     """Vista para ver el detalle de un post"""
-    post = get_object_or_404(Post, slug=slug, publicado=True)
-    post.incrementar_visitas()
+    post, posts_relacionados = _leer_detalle(slug)
+    # La visita se suma a post.visitas en el siguiente volcado. Cuenta
+    # también cuando el cliente recibe un 304.
+    registrar_visita(post.id)
     
-    # Posts relacionados (misma categoría)
-    posts_relacionados = Post.objects.filter(
-        categoria=post.categoria,
-        publicado=True
-    ).exclude(id=post.id)[:3]
+    # Si la copia del cliente sigue valiendo, 304 sin renderizar
+    etag, ultima = condicional.validadores_detalle(post, posts_relacionados, request.user)
+    no_modificado = condicional.responder(request, etag, ultima)
+    if no_modificado:
+        return no_modificado
     
     context = {
         'post': post,
         'posts_relacionados': posts_relacionados,
     }
     
-    return render(request, 'blog/detalle_post.html', context)
+    return condicional.anotar(render(request, 'blog/detalle_post.html', context), etag, ultima)
+
+
+async def detalle_post_async(request, slug):
+    """Versión asíncrona de detalle_post"""
+    request.user = await request.auser()
+    post, posts_relacionados = await _aleer_detalle(slug)
+    await aregistrar_visita(post.id)
+    
+    etag, ultima = condicional.validadores_detalle(post, posts_relacionados, request.user)
+    no_modificado = condicional.responder(request, etag, ultima)
+    if no_modificado:
+        return no_modificado
+    
+    context = {
+        'post': post,
+        'posts_relacionados': posts_relacionados,
+    }
+    
+    return condicional.anotar(render(request, 'blog/detalle_post.html', context), etag, ultima)
 
 
 @login_required
 def crear_post(request):
     """Vista para crear un nuevo post"""
-    if request.method == 'POST':
-        titulo = request.POST.get('titulo')
-        contenido = request.POST.get('contenido')
-        categoria_id = request.POST.get('categoria')
-        publicado = request.POST.get('publicado') == 'on'
+    # Se valida todo (incluida la categoría) antes de escribir, y el post
+    # se guarda con un único INSERT ya publicado y con su categoría
+    form = PostForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        post = form.save(commit=False)
+        post.autor = request.user
+        if post.publicado:
+            post.fecha_publicacion = timezone.now()
         
-        # Generar slug único
-        slug_base = slugify(titulo)
-        slug = slug_base
-        counter = 1
-        while Post.objects.filter(slug=slug).exists():
-            slug = f"{slug_base}-{counter}"
-            counter += 1
-        
-        post = Post.objects.create(
-            titulo=titulo,
-            slug=slug,
-            contenido=contenido,
-            autor=request.user,
-            publicado=publicado
-        )
-        
-        if categoria_id:
-            try:
-                categoria = Categoria.objects.get(id=categoria_id)
-                post.categoria = categoria
-                post.save()
-            except Categoria.DoesNotExist:
-                pass
-        
-        if publicado:
-            post.publicar()
+        # Slug único a partir del título (ver blog/slugs.py)
+        with transaction.atomic():
+            guardar_con_slug_unico(post)
         
         return redirect('detalle_post', slug=post.slug)
     
     categorias = Categoria.objects.all()
-    return render(request, 'blog/crear_post.html', {'categorias': categorias})
+    return render(request, 'blog/crear_post.html', {'categorias': categorias, 'form': form})
 
 
 @login_required
 def mis_posts(request):
     """Vista para ver los posts del usuario actual"""
-    posts = Post.objects.filter(autor=request.user).order_by('-fecha_creacion')
+    posts = posts_de_autor(request.user)
     return render(request, 'blog/mis_posts.html', {'posts': posts})
 
+
+
+@staff_member_required
+def estadisticas_cache(request):
+    """Aciertos y fallos de la caché de fragmentos en este proceso"""
+    return JsonResponse(fragmentos.estadisticas())
@@ -0,0 +1,103 @@
+"""
+Contador de visitas con escritura diferida.
+
+Cada visita se guarda como una fila en VisitaPendiente (un INSERT, sin leer
+ni reescribir el post). Periódicamente las filas pendientes se agrupan por
+post y se suman a Post.visitas con UPDATEs basados en F(), de modo que no se
+pierden incrementos aunque haya varios workers de Gunicorn.
+
+El volcado se dispara de dos formas:
+- Con el comando `python manage.py volcar_visitas` (por ejemplo desde cron
+  o con `--intervalo` como proceso permanente).
+- Desde la propia petición, como mucho una vez cada BLOG_VISITAS_INTERVALO
+  segundos por proceso, para que las visitas mostradas nunca tengan más de
+  ese retraso mientras haya tráfico.
+"""
+import uuid
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+
+from . import fragmentos, replicas
+from .models import Post, TarjetaPost, VisitaPendiente
+
+CLAVE_ULTIMO_VOLCADO = 'blog:visitas:ultimo_volcado'
+
+
+def intervalo_volcado():
+    """Segundos máximos que puede tardar una visita en verse en Post.visitas"""
+    return getattr(settings, 'BLOG_VISITAS_INTERVALO', 30)
+
+
+def registrar_visita(post_id):
+    """Registra una visita para el post y vuelca el buffer si toca"""
+    # El resto del detalle sigue leyendo de la réplica (ver blog/replicas.py)
+    with replicas.sin_fijar():
+        VisitaPendiente.objects.create(post_id=post_id)
+
+        # cache.add solo tiene éxito si la clave no existe, así que actúa como
+        # un temporizador: como mucho un volcado por intervalo.
+        if cache.add(CLAVE_ULTIMO_VOLCADO, True, timeout=intervalo_volcado()):
+            volcar_visitas()
+
+
+async def aregistrar_visita(post_id):
+    """Como registrar_visita, para vistas async"""
+    with replicas.sin_fijar():
+        await VisitaPendiente.objects.acreate(post_id=post_id)
+        if await cache.aadd(CLAVE_ULTIMO_VOLCADO, True, timeout=intervalo_volcado()):
+            # transaction.atomic no tiene versión asíncrona
+            await sync_to_async(volcar_visitas)()
+
+
+def volcar_visitas(tamano_lote=500):
+    """
+    Suma las visitas pendientes a Post.visitas.
+
+    Las filas se reclaman primero con un UPDATE que les asigna un lote
+    propio, así dos volcados simultáneos nunca cuentan la misma visita.
+    Devuelve el número de visitas aplicadas.
+    """
+    lote = uuid.uuid4().hex
+
+    with transaction.atomic():
+        reclamadas = VisitaPendiente.objects.filter(lote='').update(lote=lote)
+        if not reclamadas:
+            return 0
+
+        totales = (
+            VisitaPendiente.objects.filter(lote=lote)
+            .values('post_id')
+            .annotate(total=Count('id'))
+        )
+
+        # Los posts con el mismo número de visitas nuevas se actualizan juntos
+        posts_por_total = defaultdict(list)
+        for fila in totales:
+            posts_por_total[fila['total']].append(fila['post_id'])
+
+        for total, post_ids in posts_por_total.items():
+            for inicio in range(0, len(post_ids), tamano_lote):
+                Post.objects.filter(id__in=post_ids[inicio:inicio + tamano_lote]).update(
+                    visitas=F('visitas') + total
+                )
+                TarjetaPost.objects.filter(post_id__in=post_ids[inicio:inicio + tamano_lote]).update(
+                    visitas=F('visitas') + total
+                )
+
+        VisitaPendiente.objects.filter(lote=lote).delete()
+
+    # Las visitas no cambian fecha_actualizacion: el ETag del listado usa
+    # esta versión (ver blog/condicional.py)
+    fragmentos.invalidar('visitas')
+
+    return reclamadas
+
+
+def visitas_pendientes():
+    """Número de visitas registradas que aún no se han volcado"""
+    return VisitaPendiente.objects.count()
@@ -56,6 +56,11 @@ class ConfigGenerator:
         self.config['gunicorn_host'] = input("Host de Gunicorn [127.0.0.1]: ").strip() or "127.0.0.1"
         self.config['gunicorn_port'] = input("Puerto de Gunicorn [8000]: ").strip() or "8000"
         self.config['gunicorn_workers'] = input("Número de workers [auto]: ").strip() or "auto"
+        print("Interfaz de la aplicación:")
+        print("1. WSGI (workers sync, vistas síncronas)")
+        print("2. ASGI (workers Uvicorn, vistas async del blog; requiere: pip install uvicorn)")
+        interfaz = input("Selecciona interfaz (1/2) [1]: ").strip() or "1"
+        self.config['interfaz'] = 'asgi' if interfaz == '2' else 'wsgi'
         self.config['gunicorn_user'] = input("Usuario para Gunicorn [www-data]: ").strip() or "www-data"
         self.config['gunicorn_group'] = input("Grupo para Gunicorn [www-data]: ").strip() or "www-data"
         
@@ -83,12 +88,19 @@ class ConfigGenerator:
         
     def generar_gunicorn_config(self):
         """Genera el archivo de configuración de Gunicorn"""
+        asgi = self.config['interfaz'] == 'asgi'
         workers = self.config['gunicorn_workers']
         if workers == "auto":
             import multiprocessing
-            workers = multiprocessing.cpu_count() * 2 + 1
+            # Un worker ASGI atiende muchas peticiones a la vez en su bucle de
+            # eventos: basta uno por CPU
+            workers = multiprocessing.cpu_count() if asgi else multiprocessing.cpu_count() * 2 + 1
         else:
             workers = int(workers)
+        worker_class = "uvicorn.workers.UvicornWorker" if asgi else "sync"
+        # Con ASGI cada petición puede usar otro hilo: sin conexiones persistentes
+        entorno_async = "\n    'BLOG_VISTAS_ASYNC=1',\n    'DB_CONN_MAX_AGE=0'," if asgi else ""
+        metricas_dir = f"/var/run/gunicorn/{self.config['project_name']}_metricas"
         
         content = f"""# Archivo de configuración de Gunicorn generado automáticamente
 # Generado el: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -107,7 +119,7 @@ bind = "{self.config['gunicorn_host']}:{self.config['gunicorn_port']}"
 workers = {workers}
 
 # Clase de worker
-worker_class = "sync"
+worker_class = "{worker_class}"
 
 # Conexiones por worker
 worker_connections = 1000
@@ -138,11 +150,28 @@ group = "{self.config['gunicorn_group']}"
 
 # Variables de entorno
 raw_env = [
-    'DJANGO_SETTINGS_MODULE={self.config['project_name']}.settings',
+    'DJANGO_SETTINGS_MODULE={self.config['project_name']}.settings',{entorno_async}
+    # SQLite con WAL, busy_timeout y conexiones persistentes (ver blog/sqlite.py)
+    'SQLITE_PERFIL=produccion',
+    # Archivos de métricas de cada worker, que /metrics suma
+    'MONITOREO_METRICAS_DIR={metricas_dir}',
 ]
 
 # Nombre del proceso
 proc_name = '{self.config['project_name']}_django'
+
+
+def on_starting(server):
+    # Las métricas de una ejecución anterior no se mezclan con las nuevas
+    import shutil
+    shutil.rmtree("{metricas_dir}", ignore_errors=True)
+
+
+def post_fork(server, worker):
+    # Con preload_app, una conexión abierta al cargar la aplicación no debe
+    # compartirse entre workers
+    from django.db import connections
+    connections.close_all()
 """
         return content
     
@@ -162,7 +191,7 @@ Group={self.config['gunicorn_group']}
 WorkingDirectory={self.config['project_path']}
 ExecStart={self.config['venv_path']}/bin/gunicorn \\
     --config {self.config['project_path']}/gunicorn_config.py \\
-    {self.config['project_name']}.wsgi:application
+    {self.config['project_name']}.{self.config['interfaz']}:application
 
 Restart=always
 RestartSec=3
@@ -227,6 +256,15 @@ server {{
         log_not_found off;
     }}
     
+    # Métricas de Prometheus: solo desde el propio servidor
+    location = /metrics {{
+        allow 127.0.0.1;
+        deny all;
+        proxy_pass http://django;
+        proxy_set_header Host $host;
+        access_log off;
+    }}
+    
     # Proxy a Gunicorn
     location / {{
         proxy_pass http://django;
@@ -247,6 +285,14 @@ server {{
         proxy_buffer_size 4k;
         proxy_buffers 8 4k;
         proxy_busy_buffers_size 8k;
+        
+        # Compresión. Django responde con ETag débiles (W/"..."), que gzip
+        # conserva: If-None-Match llega a Django y los 304 siguen funcionando
+        gzip on;
+        gzip_proxied any;
+        gzip_vary on;
+        gzip_min_length 1024;
+        gzip_types text/plain text/css application/json application/javascript;
     }}
     
     # Denegar acceso a archivos ocultos
@@ -300,6 +346,11 @@ server {{
         </Files>
     </Directory>
 
+    # Métricas de Prometheus: solo desde el propio servidor
+    <Location /metrics>
+        Require local
+    </Location>
+
     # Archivos estáticos
     Alias /static {self.config['static_root']}
     <Directory {self.config['static_root']}>
@@ -377,6 +428,12 @@ server {{
     
     def generar_resumen(self):
         """Genera un archivo de resumen con instrucciones"""
+        nota_asgi = ""
+        if self.config['interfaz'] == 'asgi':
+            nota_asgi = (
+                "\n   - Workers Uvicorn: instalar con 'pip install uvicorn' en el entorno virtual"
+                "\n   - BLOG_VISTAS_ASYNC=1 activa las vistas async del blog"
+            )
         resumen = f"""
 {'=' * 60}
 RESUMEN DE CONFIGURACIÓN GENERADA
@@ -392,7 +449,9 @@ ARCHIVOS GENERADOS:
 
 1. gunicorn_config.py
    - Ubicación sugerida: {self.config['project_path']}/gunicorn_config.py
-   - Configuración de Gunicorn
+   - Configuración de Gunicorn ({self.config['interfaz'].upper()}){nota_asgi}
+   - Métricas de Prometheus en http://{self.config['gunicorn_host']}:{self.config['gunicorn_port']}/metrics
+     (solo accesibles desde el propio servidor)
 
 2. gunicorn.service
    - Ubicación: /etc/systemd/system/gunicorn.service
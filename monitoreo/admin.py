@@ -0,0 +1,73 @@
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+
+from . import perfiles
+from .models import Perfil
+
+
+@admin.register(Perfil)
+class PerfilAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'vista', 'metodo', 'ruta', 'motivo', 'duracion', 'muestras', 'descargas')
+    list_filter = ('motivo', 'vista')
+    search_fields = ('ruta', 'vista')
+    list_select_related = ('usuario',)
+    fields = (
+        'fecha', 'vista', 'metodo', 'ruta', 'motivo', 'usuario', 'duracion', 'muestras',
+        'descargas', 'funciones',
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def duracion(self, obj):
+        return f'{obj.duracion_ms:.1f} ms'
+    duracion.short_description = 'duración'
+    duracion.admin_order_field = 'duracion_ms'
+
+    def descargas(self, obj):
+        return format_html_join(
+            ' · ', '<a href="{}">{}</a>',
+            (
+                (reverse('admin:monitoreo_perfil_descargar', args=[obj.pk, extension]), extension)
+                for extension in perfiles.EXTENSIONES
+            ),
+        )
+
+    def funciones(self, obj):
+        try:
+            return format_html('<pre>{}</pre>', perfiles.resumen(obj))
+        except OSError:
+            return 'Archivo no disponible'
+    funciones.short_description = 'funciones más costosas (tiempo acumulado)'
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/descargar/<str:extension>/',
+                self.admin_site.admin_view(self.descargar),
+                name='monitoreo_perfil_descargar',
+            ),
+        ] + super().get_urls()
+
+    def descargar(self, request, pk, extension):
+        perfil = get_object_or_404(Perfil, pk=pk)
+        if extension not in perfiles.EXTENSIONES or not self.has_view_permission(request, perfil):
+            raise Http404
+        ruta = perfiles.ruta_archivo(perfil, extension)
+        if not ruta.exists():
+            raise Http404
+        return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=ruta.name)
+
+    def delete_model(self, request, obj):
+        perfiles.borrar(obj)
+
+    def delete_queryset(self, request, queryset):
+        for perfil in queryset:
+            perfiles.borrar(perfil)
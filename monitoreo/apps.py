@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class MonitoreoConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoreo'
+
+    def ready(self):
+        from . import medicion
+        medicion.instalar()
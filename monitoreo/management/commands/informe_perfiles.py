@@ -0,0 +1,78 @@
+import io
+import pstats
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.benchmark import percentil
+from monitoreo import perfiles
+from monitoreo.models import Perfil
+
+
+class Command(BaseCommand):
+    help = (
+        'Informe agregado de los perfiles guardados: duración por vista, funciones más '
+        'costosas sumando todos los perfiles y pilas combinadas para un flamegraph'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vista', help='Solo los perfiles de esta vista (por ejemplo, lista_posts)')
+        parser.add_argument('--motivo', choices=Perfil.Motivo.values, help='Solo los pedidos o solo los del muestreo')
+        parser.add_argument('--horas', type=float, default=24, help='Perfiles de las últimas N horas (por defecto: 24)')
+        parser.add_argument(
+            '--orden',
+            choices=['tottime', 'cumulative', 'ncalls'],
+            default='tottime',
+            help='Orden de las funciones (por defecto: tottime, tiempo propio)',
+        )
+        parser.add_argument('--limite', type=int, default=30, help='Funciones mostradas (por defecto: 30)')
+        parser.add_argument('--folded', help='Guardar aquí las pilas combinadas (formato collapsed)')
+
+    def handle(self, *args, **options):
+        consulta = Perfil.objects.filter(fecha__gte=timezone.now() - timedelta(hours=options['horas']))
+        if options['vista']:
+            consulta = consulta.filter(vista=options['vista'])
+        if options['motivo']:
+            consulta = consulta.filter(motivo=options['motivo'])
+        seleccion = list(consulta.order_by('fecha'))
+        if not seleccion:
+            self.stdout.write(self.style.WARNING('No hay perfiles con esos criterios'))
+            return
+
+        self.stdout.write(f'{len(seleccion)} perfiles\n')
+        por_vista = defaultdict(list)
+        for perfil in seleccion:
+            por_vista[perfil.vista].append(perfil.duracion_ms / 1000)
+        for vista, duraciones in sorted(por_vista.items(), key=lambda item: -sum(item[1])):
+            self.stdout.write(
+                f'  {vista}: {len(duraciones)} perfiles, p50 {percentil(duraciones, 50) * 1000:.1f} ms, '
+                f'p95 {percentil(duraciones, 95) * 1000:.1f} ms'
+            )
+
+        estadisticas = None
+        pilas = Counter()
+        for perfil in seleccion:
+            try:
+                if estadisticas is None:
+                    estadisticas = pstats.Stats(str(perfiles.ruta_archivo(perfil, 'pstats')), stream=io.StringIO())
+                else:
+                    estadisticas.add(str(perfiles.ruta_archivo(perfil, 'pstats')))
+                with open(perfiles.ruta_archivo(perfil, 'folded'), encoding='utf-8') as archivo:
+                    for linea in archivo:
+                        pila, _, veces = linea.rstrip('\n').rpartition(' ')
+                        pilas[pila] += int(veces)
+            except (OSError, ValueError):
+                self.stdout.write(self.style.WARNING(f'  ⚠ Archivos del perfil {perfil.pk} no disponibles'))
+
+        if estadisticas is not None:
+            estadisticas.sort_stats(options['orden']).print_stats(options['limite'])
+            self.stdout.write(estadisticas.stream.getvalue())
+        if options['folded']:
+            with open(options['folded'], 'w', encoding='utf-8') as archivo:
+                archivo.writelines(f'{pila} {veces}\n' for pila, veces in pilas.most_common())
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {sum(pilas.values())} muestras guardadas en {options["folded"]} '
+                '(flamegraph.pl o https://www.speedscope.app)'
+            ))
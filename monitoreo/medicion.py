@@ -0,0 +1,111 @@
+"""
+Medición de cada petición: consultas SQL, tiempo de base de datos y de
+plantillas.
+
+La petición en curso se guarda en una variable de contexto, que sigue a la
+petición también en las vistas async (sync_to_async copia el contexto al
+hilo donde se ejecuta el ORM). Sobre ella trabajan:
+- Un execute_wrapper instalado en cada conexión al crearse, que cuenta las
+  consultas, suma su duración y agrupa las que se repiten.
+- Un envoltorio de Template.render que suma el tiempo de la plantilla más
+  externa (los `{% include %}` ya van dentro).
+
+Sin medición en curso (peticiones fuera del muestreo, comandos, workers)
+ambos se limitan a una lectura de la variable de contexto.
+"""
+import contextvars
+import functools
+import heapq
+import time
+from collections import Counter
+
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+medicion_actual = contextvars.ContextVar('monitoreo_medicion', default=None)
+
+# Consultas más lentas que se guardan por petición
+CONSULTAS_LENTAS = 3
+
+
+class Medicion:
+    """Datos de una petición. Los tiempos, en segundos."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.tiempo_plantillas = 0.0
+        self.profundidad_plantillas = 0
+        # sql -> veces: misma consulta con distintos parámetros (N+1)
+        self.por_sql = Counter()
+        # (sql, parámetros) -> veces: exactamente la misma consulta
+        self.identicas = Counter()
+        # montículo de (duración, sql) con las más lentas
+        self.lentas = []
+
+    def anotar_consulta(self, sql, params, duracion):
+        self.consultas += 1
+        self.tiempo_db += duracion
+        self.por_sql[sql] += 1
+        try:
+            self.identicas[sql, repr(params)] += 1
+        except Exception:
+            pass
+        if len(self.lentas) < CONSULTAS_LENTAS:
+            heapq.heappush(self.lentas, (duracion, sql))
+        elif duracion > self.lentas[0][0]:
+            heapq.heapreplace(self.lentas, (duracion, sql))
+
+    def repetidas(self, umbral):
+        """(sql, veces) de las consultas lanzadas `umbral` o más veces con distintos parámetros"""
+        return [(sql, veces) for sql, veces in self.por_sql.most_common() if veces >= umbral]
+
+    def duplicadas(self):
+        """Consultas idénticas (también los parámetros) ejecutadas más de una vez"""
+        return sum(veces - 1 for veces in self.identicas.values() if veces > 1)
+
+    def mas_lentas(self):
+        return sorted(self.lentas, reverse=True)
+
+
+def envolver_consulta(execute, sql, params, many, context):
+    medicion = medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.anotar_consulta(sql, params, time.perf_counter() - inicio)
+
+
+def _conexion_creada(sender, connection, **kwargs):
+    # Se dispara en cada reconexión del mismo objeto: no duplicar el wrapper
+    if envolver_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(envolver_consulta)
+
+
+def _envolver_render(render):
+    @functools.wraps(render)
+    def render_medido(self, context):
+        medicion = medicion_actual.get()
+        if medicion is None:
+            return render(self, context)
+        medicion.profundidad_plantillas += 1
+        inicio = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            medicion.profundidad_plantillas -= 1
+            if not medicion.profundidad_plantillas:
+                medicion.tiempo_plantillas += time.perf_counter() - inicio
+
+    render_medido.monitoreo = True
+    return render_medido
+
+
+def instalar():
+    """Engancha la medición a las conexiones y a las plantillas (una sola vez)"""
+    connection_created.connect(_conexion_creada, dispatch_uid='monitoreo_conexion_creada')
+    if not getattr(Template.render, 'monitoreo', False):
+        Template.render = _envolver_render(Template.render)
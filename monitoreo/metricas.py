@@ -0,0 +1,241 @@
+"""
+Métricas en formato de texto de Prometheus, agregadas entre procesos.
+
+Cada proceso (worker de Gunicorn) acumula sus contadores e histogramas en
+memoria y los vuelca, como mucho una vez por segundo, a su propio archivo
+`<pid>.json` en MONITOREO_METRICAS_DIR. `/metrics` suma los archivos de
+todos los procesos, así que da igual qué worker atienda la petición.
+
+Los archivos de procesos que ya no existen (Gunicorn recicla los workers
+cada `max_requests`) se suman a `acumulado.json` y se borran, para que los
+contadores no retrocedan y el número de archivos no crezca.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin compactación
+    fcntl = None
+
+# Límites superiores (segundos) de los buckets de latencia
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Segundos mínimos entre volcados del proceso a su archivo
+VOLCADO_CADA = 1.0
+
+# nombre -> (tipo, ayuda)
+METRICAS = {
+    'blog_peticiones_total': ('counter', 'Peticiones atendidas por vista, método y código de estado'),
+    'blog_peticion_duracion_segundos': ('histogram', 'Duración de las peticiones por vista'),
+    'blog_peticiones_medidas_total': ('counter', 'Peticiones con medición de consultas (ver MONITOREO_MUESTREO)'),
+    'blog_consultas_sql_total': ('counter', 'Consultas SQL de las peticiones medidas'),
+    'blog_db_duracion_segundos_total': ('counter', 'Tiempo de base de datos de las peticiones medidas'),
+    'blog_fragmentos_aciertos_total': ('counter', 'Aciertos de la caché de fragmentos'),
+    'blog_fragmentos_fallos_total': ('counter', 'Fallos de la caché de fragmentos'),
+}
+
+_cerrojo = threading.Lock()
+_contadores = {}
+_histogramas = {}
+_ultimo_volcado = 0.0
+
+
+def directorio():
+    return Path(settings.MONITOREO_METRICAS_DIR)
+
+
+def _clave(etiquetas):
+    return tuple(sorted(etiquetas.items()))
+
+
+def incrementar(nombre, valor=1, **etiquetas):
+    serie = _contadores.setdefault(nombre, {})
+    clave = _clave(etiquetas)
+    with _cerrojo:
+        serie[clave] = serie.get(clave, 0) + valor
+
+
+def observar(nombre, valor, **etiquetas):
+    serie = _histogramas.setdefault(nombre, {})
+    clave = _clave(etiquetas)
+    with _cerrojo:
+        # [conteos por bucket (sin acumular)..., +Inf, suma]
+        datos = serie.get(clave)
+        if datos is None:
+            datos = serie[clave] = [0] * (len(BUCKETS) + 1) + [0.0]
+        indice = next((i for i, limite in enumerate(BUCKETS) if valor <= limite), len(BUCKETS))
+        datos[indice] += 1
+        datos[-1] += valor
+
+
+def registrar_peticion(request, respuesta, duracion, medicion=None):
+    """Anota una petición terminada y vuelca el proceso si toca"""
+    coincidencia = getattr(request, 'resolver_match', None)
+    vista = coincidencia.view_name if coincidencia else 'sin_ruta'
+    incrementar('blog_peticiones_total', vista=vista, metodo=request.method, estado=str(respuesta.status_code))
+    observar('blog_peticion_duracion_segundos', duracion, vista=vista)
+    if medicion is not None:
+        incrementar('blog_peticiones_medidas_total', vista=vista)
+        incrementar('blog_consultas_sql_total', medicion.consultas, vista=vista)
+        incrementar('blog_db_duracion_segundos_total', medicion.tiempo_db, vista=vista)
+    if time.monotonic() - _ultimo_volcado >= VOLCADO_CADA:
+        volcar()
+
+
+def _instantanea():
+    """Estado del proceso, serializable a JSON"""
+    from blog import fragmentos
+
+    with _cerrojo:
+        estado = {
+            'contadores': {nombre: dict(serie) for nombre, serie in _contadores.items()},
+            'histogramas': {
+                nombre: {clave: list(datos) for clave, datos in serie.items()}
+                for nombre, serie in _histogramas.items()
+            },
+        }
+    # Los aciertos de la caché se cuentan en blog/fragmentos.py
+    for nombre, origen in (
+        ('blog_fragmentos_aciertos_total', fragmentos.aciertos),
+        ('blog_fragmentos_fallos_total', fragmentos.fallos),
+    ):
+        estado['contadores'][nombre] = {
+            (('fragmento', fragmento),): total for fragmento, total in dict(origen).items()
+        }
+    return _serializar(estado)
+
+
+def volcar():
+    """Escribe el estado del proceso en su archivo (de forma atómica)"""
+    global _ultimo_volcado
+    _ultimo_volcado = time.monotonic()
+    carpeta = directorio()
+    carpeta.mkdir(parents=True, exist_ok=True)
+    destino = carpeta / f'{os.getpid()}.json'
+    temporal = carpeta / f'.{os.getpid()}-{threading.get_ident()}.tmp'
+    temporal.write_text(json.dumps(_instantanea()))
+    os.replace(temporal, destino)
+
+
+atexit.register(lambda: _contadores and volcar())
+
+
+def _sumar(total, datos):
+    for nombre, series in datos.get('contadores', {}).items():
+        destino = total['contadores'].setdefault(nombre, {})
+        for clave, valor in series:
+            clave = tuple(map(tuple, clave))
+            destino[clave] = destino.get(clave, 0) + valor
+    for nombre, series in datos.get('histogramas', {}).items():
+        destino = total['histogramas'].setdefault(nombre, {})
+        for clave, valores in series:
+            clave = tuple(map(tuple, clave))
+            anterior = destino.get(clave)
+            destino[clave] = valores if anterior is None else [a + b for a, b in zip(anterior, valores)]
+
+
+def _serializar(total):
+    return {
+        'contadores': {
+            nombre: [[list(clave), valor] for clave, valor in serie.items()]
+            for nombre, serie in total['contadores'].items()
+        },
+        'histogramas': {
+            nombre: [[list(clave), valores] for clave, valores in serie.items()]
+            for nombre, serie in total['histogramas'].items()
+        },
+    }
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _leer(ruta):
+    try:
+        return json.loads(ruta.read_text())
+    except (OSError, ValueError):
+        # Borrado o a medio escribir por otro proceso
+        return {}
+
+
+def _compactar(carpeta):
+    """Suma a acumulado.json los archivos de procesos terminados y los borra"""
+    muertos = [
+        ruta for ruta in carpeta.glob('*.json')
+        if ruta.stem.isdigit() and not _vivo(int(ruta.stem))
+    ]
+    if not muertos:
+        return
+    acumulado = {'contadores': {}, 'histogramas': {}}
+    _sumar(acumulado, _leer(carpeta / 'acumulado.json'))
+    for ruta in muertos:
+        _sumar(acumulado, _leer(ruta))
+    temporal = carpeta / '.acumulado.tmp'
+    temporal.write_text(json.dumps(_serializar(acumulado)))
+    os.replace(temporal, carpeta / 'acumulado.json')
+    for ruta in muertos:
+        ruta.unlink(missing_ok=True)
+
+
+def agregar():
+    """Suma los archivos de todos los procesos (incluido este, recién volcado)"""
+    volcar()
+    carpeta = directorio()
+    total = {'contadores': {}, 'histogramas': {}}
+    with open(carpeta / '.cerrojo', 'w') as cerrojo:
+        # Sin cerrojo, una lectura entre el acumulado nuevo y el borrado de
+        # los archivos ya sumados contaría dos veces
+        if fcntl is not None:
+            fcntl.flock(cerrojo, fcntl.LOCK_EX)
+            _compactar(carpeta)
+        for ruta in carpeta.glob('*.json'):
+            _sumar(total, _leer(ruta))
+    return total
+
+
+def _etiquetas(clave, extra=()):
+    pares = list(clave) + list(extra)
+    if not pares:
+        return ''
+    escapar = lambda valor: str(valor).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return '{' + ','.join(f'{nombre}="{escapar(valor)}"' for nombre, valor in pares) + '}'
+
+
+def exponer(total, indicadores=()):
+    """
+    Texto para Prometheus con las métricas agregadas y los `indicadores`
+    instantáneos: tuplas (nombre, ayuda, [(etiquetas, valor)]).
+    """
+    lineas = []
+    for nombre, (tipo, ayuda) in METRICAS.items():
+        lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} {tipo}']
+        if tipo == 'counter':
+            for clave, valor in sorted(total['contadores'].get(nombre, {}).items()):
+                lineas.append(f'{nombre}{_etiquetas(clave)} {valor}')
+            continue
+        for clave, valores in sorted(total['histogramas'].get(nombre, {}).items()):
+            acumulado = 0
+            for limite, cuenta in zip(list(BUCKETS) + ['+Inf'], valores[:-1]):
+                acumulado += cuenta
+                lineas.append(f'{nombre}_bucket{_etiquetas(clave, [("le", limite)])} {acumulado}')
+            lineas.append(f'{nombre}_sum{_etiquetas(clave)} {valores[-1]}')
+            lineas.append(f'{nombre}_count{_etiquetas(clave)} {acumulado}')
+    for nombre, ayuda, muestras in indicadores:
+        lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} gauge']
+        for etiquetas, valor in muestras:
+            lineas.append(f'{nombre}{_etiquetas(_clave(etiquetas))} {valor}')
+    return '\n'.join(lineas) + '\n'
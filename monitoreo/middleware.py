@@ -0,0 +1,161 @@
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from . import metricas, perfiles
+from .medicion import Medicion, medicion_actual
+from .models import Perfil
+
+logger = logging.getLogger('monitoreo')
+
+
+class InstrumentacionMiddleware:
+    """
+    Mide consultas, tiempo de base de datos, de plantillas y total de una
+    fracción de las peticiones (MONITOREO_MUESTREO). Añade la cabecera
+    Server-Timing (solo para usuarios staff o con DEBUG) y registra las
+    peticiones lentas con sus consultas más lentas y las repetidas (posibles
+    N+1).
+
+    Con MONITOREO_METRICAS, además, anota la duración y el código de estado
+    de todas las peticiones para /metrics (ver monitoreo/metricas.py).
+
+    Debe ir el primero en MIDDLEWARE para que el tiempo total lo incluya todo.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.muestreo = getattr(settings, 'MONITOREO_MUESTREO', 1.0)
+        self.lento = getattr(settings, 'MONITOREO_LENTO_MS', 500) / 1000
+        self.repeticiones = getattr(settings, 'MONITOREO_REPETICIONES', 5)
+        self.server_timing = getattr(settings, 'MONITOREO_SERVER_TIMING', True)
+        self.metricas = getattr(settings, 'MONITOREO_METRICAS', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        if not self.muestrear():
+            return self.terminar(request, self.get_response(request), inicio)
+        medicion = request.monitoreo = Medicion()
+        token = medicion_actual.set(medicion)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            medicion_actual.reset(token)
+        return self.terminar(request, respuesta, inicio, medicion, getattr(request, 'user', None))
+
+    async def __acall__(self, request):
+        inicio = time.perf_counter()
+        if not self.muestrear():
+            return self.terminar(request, await self.get_response(request), inicio)
+        medicion = request.monitoreo = Medicion()
+        token = medicion_actual.set(medicion)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            medicion_actual.reset(token)
+        usuario = None
+        if self.server_timing and not settings.DEBUG and hasattr(request, 'auser'):
+            usuario = await request.auser()
+        return self.terminar(request, respuesta, inicio, medicion, usuario)
+
+    def muestrear(self):
+        return self.muestreo >= 1 or random.random() < self.muestreo
+
+    def mostrar_server_timing(self, usuario):
+        """Los tiempos y el número de consultas no se enseñan a cualquiera"""
+        return self.server_timing and (settings.DEBUG or (usuario is not None and usuario.is_staff))
+
+    def terminar(self, request, respuesta, inicio, medicion=None, usuario=None):
+        total = time.perf_counter() - inicio
+        if self.metricas:
+            metricas.registrar_peticion(request, respuesta, total, medicion)
+        if medicion is None:
+            return respuesta
+        if self.mostrar_server_timing(usuario):
+            # El tiempo de plantillas incluye las consultas que lanzan
+            respuesta.headers['Server-Timing'] = (
+                f'db;dur={medicion.tiempo_db * 1000:.1f};desc="{medicion.consultas} consultas", '
+                f'tpl;dur={medicion.tiempo_plantillas * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+        if total >= self.lento:
+            self.registrar_lenta(request, respuesta, medicion, total)
+        return respuesta
+
+    def registrar_lenta(self, request, respuesta, medicion, total):
+        lineas = [
+            f'Petición lenta: {request.method} {request.get_full_path()} -> {respuesta.status_code} '
+            f'en {total * 1000:.0f} ms (db {medicion.tiempo_db * 1000:.0f} ms, '
+            f'{medicion.consultas} consultas, {medicion.duplicadas()} duplicadas; '
+            f'plantillas {medicion.tiempo_plantillas * 1000:.0f} ms)'
+        ]
+        for duracion, sql in medicion.mas_lentas():
+            lineas.append(f'  {duracion * 1000:.1f} ms: {sql[:500]}')
+        for sql, veces in medicion.repetidas(self.repeticiones):
+            lineas.append(f'  repetida {veces} veces (¿N+1?): {sql[:500]}')
+        logger.warning('\n'.join(lineas))
+
+
+class PerfilesMiddleware:
+    """
+    Ejecuta el resto de la petición (los process_view de los middlewares y
+    la vista) bajo los perfiladores de monitoreo/perfiles.py:
+    - cuando un usuario staff lo pide con `?perfilar=1` o la cabecera
+      `X-Perfilar: 1`;
+    - al azar, 1 de cada MONITOREO_PERFILES_MUESTREO peticiones de cada vista
+      (un número, o un dict vista -> N con '*' para el resto; 0 = nunca).
+
+    Las vistas async, y cualquier vista con la pila de middlewares async
+    (ASGI), no se perfilan: cProfile solo ve el hilo que lo activa. Debe ir
+    el último en MIDDLEWARE, después de AuthenticationMiddleware, porque usa
+    request.user para decidir.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.pedido(request) and not getattr(settings, 'MONITOREO_PERFILES_MUESTREO', 0):
+            return self.get_response(request)
+        try:
+            destino = resolve(request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            return self.get_response(request)
+        if iscoroutinefunction(destino.func):
+            return self.get_response(request)
+        motivo = self.motivo(request, destino.view_name)
+        if motivo is None:
+            return self.get_response(request)
+        return perfiles.perfilar(request, lambda: self.get_response(request), destino.view_name, motivo)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def pedido(self, request):
+        return request.GET.get('perfilar') == '1' or request.headers.get('X-Perfilar') == '1'
+
+    def motivo(self, request, nombre):
+        if self.pedido(request) and request.user.is_staff:
+            return Perfil.Motivo.PEDIDO
+        cada = getattr(settings, 'MONITOREO_PERFILES_MUESTREO', 0)
+        if isinstance(cada, dict):
+            cada = cada.get(nombre, cada.get('*', 0))
+        if cada and random.randrange(cada) == 0:
+            return Perfil.Motivo.MUESTREO
+        return None
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Perfil',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vista', models.CharField(max_length=200)),
+                ('metodo', models.CharField(max_length=10)),
+                ('ruta', models.CharField(max_length=500)),
+                ('motivo', models.CharField(choices=[('pedido', 'Pedido por staff'), ('muestreo', 'Muestreo aleatorio')], max_length=10)),
+                ('duracion_ms', models.FloatField()),
+                ('muestras', models.PositiveIntegerField(default=0)),
+                ('archivo', models.CharField(max_length=200)),
+                ('fecha', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Perfil',
+                'verbose_name_plural': 'Perfiles',
+                'ordering': ['-fecha'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class Perfil(models.Model):
+    """Perfil de una petición; los datos están en archivos (ver monitoreo/perfiles.py)"""
+
+    class Motivo(models.TextChoices):
+        PEDIDO = 'pedido', 'Pedido por staff'
+        MUESTREO = 'muestreo', 'Muestreo aleatorio'
+
+    vista = models.CharField(max_length=200)
+    metodo = models.CharField(max_length=10)
+    ruta = models.CharField(max_length=500)
+    motivo = models.CharField(max_length=10, choices=Motivo.choices)
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    duracion_ms = models.FloatField()
+    # Pilas tomadas por el muestreador
+    muestras = models.PositiveIntegerField(default=0)
+    # Nombre base de los archivos .pstats y .folded
+    archivo = models.CharField(max_length=200)
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Perfil'
+        verbose_name_plural = 'Perfiles'
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f'{self.vista} ({self.duracion_ms:.0f} ms)'
@@ -0,0 +1,142 @@
+"""
+Perfiles de peticiones con cProfile y un muestreador de pilas.
+
+Mientras se ejecuta la vista:
+- cProfile mide las llamadas de su hilo; se guarda como `.pstats`
+  (abrible con `python -m pstats`, snakeviz...).
+- Un hilo aparte toma la pila del hilo de la petición cada
+  MONITOREO_PERFILES_INTERVALO segundos; las pilas se guardan agrupadas en
+  formato "collapsed" (`.folded`), el que usan flamegraph.pl y speedscope.
+
+Cada perfil queda registrado en el modelo Perfil (listado en el admin) y
+sus archivos en MONITOREO_PERFILES_DIR. Solo se conservan los
+MONITOREO_PERFILES_MAX más recientes.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Perfil
+
+logger = logging.getLogger('monitoreo')
+
+EXTENSIONES = ('pstats', 'folded')
+
+
+def directorio():
+    return Path(settings.MONITOREO_PERFILES_DIR)
+
+
+def ruta_archivo(perfil, extension):
+    return directorio() / f'{perfil.archivo}.{extension}'
+
+
+def etiqueta(codigo):
+    return f'{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})'
+
+
+class Muestreador(threading.Thread):
+    """Cuenta las pilas de llamadas de otro hilo, tomadas a intervalos fijos"""
+
+    def __init__(self, hilo, intervalo):
+        super().__init__(daemon=True, name='monitoreo-muestreador')
+        self.hilo = hilo
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self.parar = threading.Event()
+
+    def run(self):
+        while not self.parar.wait(self.intervalo):
+            marco = sys._current_frames().get(self.hilo)
+            pila = []
+            while marco is not None:
+                pila.append(etiqueta(marco.f_code))
+                marco = marco.f_back
+            if pila:
+                self.pilas[';'.join(reversed(pila))] += 1
+
+    def terminar(self):
+        self.parar.set()
+        self.join()
+        return self.pilas
+
+
+def perfilar(request, llamar_vista, vista, motivo):
+    """Ejecuta la vista con los perfiladores activos y guarda el resultado"""
+    perfil = cProfile.Profile()
+    muestreador = Muestreador(threading.get_ident(), getattr(settings, 'MONITOREO_PERFILES_INTERVALO', 0.001))
+    muestreador.start()
+    inicio = time.perf_counter()
+    perfil.enable()
+    try:
+        respuesta = llamar_vista()
+        if hasattr(respuesta, 'render') and not respuesta.is_rendered:
+            respuesta.render()
+    finally:
+        perfil.disable()
+        duracion = time.perf_counter() - inicio
+        pilas = muestreador.terminar()
+
+    try:
+        registro = guardar(request, vista, motivo, duracion, perfil, pilas)
+    except Exception:
+        # Un fallo al guardar el perfil no debe romper la petición
+        logger.exception('No se pudo guardar el perfil de %s', request.path)
+    else:
+        respuesta['X-Perfil'] = str(registro.pk)
+    return respuesta
+
+
+def guardar(request, vista, motivo, duracion, perfil, pilas):
+    carpeta = directorio()
+    carpeta.mkdir(parents=True, exist_ok=True)
+    nombre = f'{timezone.now():%Y%m%d-%H%M%S}-{slugify(vista)}-{uuid.uuid4().hex[:8]}'
+    perfil.dump_stats(carpeta / f'{nombre}.pstats')
+    (carpeta / f'{nombre}.folded').write_text(
+        ''.join(f'{pila} {veces}\n' for pila, veces in pilas.most_common())
+    )
+    usuario = getattr(request, 'user', None)
+    registro = Perfil.objects.create(
+        vista=vista,
+        metodo=request.method,
+        ruta=request.get_full_path()[:500],
+        motivo=motivo,
+        usuario=usuario if usuario is not None and usuario.is_authenticated else None,
+        duracion_ms=duracion * 1000,
+        muestras=sum(pilas.values()),
+        archivo=nombre,
+    )
+    purgar()
+    return registro
+
+
+def purgar():
+    """Borra los perfiles (y sus archivos) que exceden MONITOREO_PERFILES_MAX"""
+    maximo = getattr(settings, 'MONITOREO_PERFILES_MAX', 200)
+    for perfil in Perfil.objects.order_by('-fecha', '-pk')[maximo:]:
+        borrar(perfil)
+
+
+def borrar(perfil):
+    for extension in EXTENSIONES:
+        ruta_archivo(perfil, extension).unlink(missing_ok=True)
+    perfil.delete()
+
+
+def resumen(perfil, orden='cumulative', limite=25):
+    """Texto de pstats con las `limite` funciones más costosas"""
+    salida = io.StringIO()
+    pstats.Stats(str(ruta_archivo(perfil, 'pstats')), stream=salida).sort_stats(orden).print_stats(limite)
+    return salida.getvalue()
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db.models import Count
+from django.http import HttpResponse, HttpResponseForbidden
+
+from . import metricas
+
+
+def metricas_prometheus(request):
+    """Métricas de todos los workers en formato de texto de Prometheus"""
+    if request.META.get('REMOTE_ADDR') not in settings.MONITOREO_METRICAS_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metricas.exponer(metricas.agregar(), indicadores()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+def indicadores():
+    """Valores instantáneos que se leen de la base de datos en cada consulta"""
+    from blog.models import VisitaPendiente
+    from tareas.models import Tarea
+
+    por_estado = dict(Tarea.objects.order_by().values_list('estado').annotate(total=Count('id')))
+    return [
+        (
+            'blog_visitas_pendientes',
+            'Visitas registradas que aún no se han sumado a Post.visitas',
+            [({}, VisitaPendiente.objects.count())],
+        ),
+        (
+            'tareas_en_cola',
+            'Tareas de la cola por estado',
+            [({'estado': estado}, por_estado.get(estado, 0)) for estado in Tarea.Estado.values],
+        ),
+    ]
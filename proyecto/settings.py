@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,9 +41,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'autenticacion',
     'blog',
+    'tareas',
+    'monitoreo',
 ]
 
 MIDDLEWARE = [
+    'monitoreo.middleware.InstrumentacionMiddleware',
+    'blog.replicas.ReplicasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitoreo.middleware.PerfilesMiddleware',
 ]
 
 ROOT_URLCONF = 'proyecto.urls'
@@ -75,13 +82,46 @@ WSGI_APPLICATION = 'proyecto.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Perfil de SQLite: 'desarrollo' (valores de Django) o 'produccion' (WAL,
+# synchronous=NORMAL, mmap, busy_timeout... ver blog/sqlite.py)
+SQLITE_PERFIL = os.environ.get('SQLITE_PERFIL', 'desarrollo')
+
+# Pragmas que se cambian o añaden a los del perfil, p. ej. {'mmap_size': 0}
+SQLITE_PRAGMAS = {}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Conexiones persistentes entre peticiones (segundos; 0 = una por
+        # petición). Con ASGI conviene 0: cada petición puede usar otro hilo.
+        'CONN_MAX_AGE': int(os.environ.get(
+            'DB_CONN_MAX_AGE', '600' if SQLITE_PERFIL == 'produccion' else '0'
+        )),
+        # Comprueba la conexión persistente antes de reutilizarla
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Réplicas de lectura del listado y el detalle del blog (ver blog/replicas.py).
+# DB_REPLICAS: rutas de archivos SQLite separadas por comas (en local, copias
+# de db.sqlite3 que mantiene `sincronizar_replicas`). Con otro motor, se
+# añaden aquí con su ENGINE, HOST...
+REPLICAS = []
+for numero, ruta in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), 1):
+    REPLICAS.append(f'replica{numero}')
+    # En los tests, las réplicas son la misma base de datos que la primaria
+    DATABASES[f'replica{numero}'] = {**DATABASES['default'], 'NAME': ruta, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['blog.replicas.RouterReplicas']
+
+# Segundos que un cliente lee de la primaria después de escribir (POST),
+# mientras la réplica se pone al día
+REPLICAS_FIJAR_SEGUNDOS = int(os.environ.get('DB_REPLICAS_FIJAR', '5'))
+
+# Segundos sin usar una réplica que ha fallado (en cada proceso)
+REPLICAS_ESPERA_FALLO = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -137,3 +177,74 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'home'
 
+# Blog: segundos máximos de retraso del contador de visitas (ver
+# blog/visitas.py), también en las tarjetas cacheadas del listado
+BLOG_VISITAS_INTERVALO = 30
+
+# Blog: 'cursor' (keyset, sin OFFSET ni COUNT) o 'paginas' (Paginator clásico)
+BLOG_PAGINACION = 'cursor'
+
+# Blog: segundos que se guardan en caché los fragmentos del listado. Las
+# ediciones y los volcados de visitas los invalidan al momento.
+BLOG_FRAGMENTOS_TIMEOUT = 60
+
+# Blog: usar las versiones async de las vistas de lectura (lista, detalle e
+# inicio). Pensado para desplegar con ASGI (Uvicorn); con WSGI conviene
+# dejarlo desactivado.
+BLOG_VISTAS_ASYNC = os.environ.get('BLOG_VISTAS_ASYNC', '') == '1'
+
+# Blog: se incluye en los ETag del detalle y del listado; cambiarlo invalida
+# las copias de los clientes (ver blog/condicional.py)
+BLOG_ETAG_VERSION = os.environ.get('BLOG_ETAG_VERSION', '1')
+
+# Blog: horas en las que una visita pasa a valer la mitad en el orden por
+# tendencias. Al cambiarlo hay que ejecutar `calcular_tendencias --completo`
+# (ver blog/tendencias.py).
+BLOG_TENDENCIAS_VIDA_MEDIA = 48
+
+# Tareas: segundos que un worker puede tener reclamada una tarea; pasado ese
+# tiempo se considera caído y la tarea vuelve a la cola
+TAREAS_BLOQUEO = 300
+
+# Tareas: espera del primer reintento en segundos (se duplica en cada
+# intento, hasta TAREAS_REINTENTO_MAXIMO)
+TAREAS_REINTENTO_BASE = 10
+TAREAS_REINTENTO_MAXIMO = 3600
+
+# Tareas: ejecutarlas al confirmar la transacción, sin cola ni worker (útil
+# en desarrollo si no se quiere lanzar procesar_tareas)
+TAREAS_INMEDIATAS = os.environ.get('TAREAS_INMEDIATAS', '') == '1'
+
+# Monitoreo: fracción de peticiones medidas (consultas, tiempos y cabecera
+# Server-Timing), de 0 a 1
+MONITOREO_MUESTREO = float(os.environ.get('MONITOREO_MUESTREO', '1'))
+
+# Monitoreo: las peticiones medidas que superan estos milisegundos se
+# registran en el logger 'monitoreo' con sus consultas más lentas
+MONITOREO_LENTO_MS = 500
+
+# Monitoreo: veces que debe repetirse una consulta en una petición para
+# señalarla como posible N+1
+MONITOREO_REPETICIONES = 5
+
+# Monitoreo: añadir la cabecera Server-Timing a las respuestas medidas de
+# los usuarios staff (a todas con DEBUG)
+MONITOREO_SERVER_TIMING = True
+
+# Monitoreo: métricas de Prometheus en /metrics, agregadas entre los workers
+# a través de archivos en MONITOREO_METRICAS_DIR (uno por proceso)
+MONITOREO_METRICAS = True
+MONITOREO_METRICAS_DIR = os.environ.get(
+    'MONITOREO_METRICAS_DIR', os.path.join(tempfile.gettempdir(), 'proyecto_metricas')
+)
+# Direcciones desde las que se puede leer /metrics
+MONITOREO_METRICAS_IPS = ['127.0.0.1', '::1']
+
+# Monitoreo: perfiles de peticiones (ver monitoreo/perfiles.py). Los usuarios
+# staff los piden con ?perfilar=1; además se perfila al azar 1 de cada
+# MONITOREO_PERFILES_MUESTREO peticiones de cada vista (0 = desactivado)
+MONITOREO_PERFILES_MUESTREO = int(os.environ.get('MONITOREO_PERFILES_MUESTREO', '0'))
+MONITOREO_PERFILES_DIR = BASE_DIR / 'perfiles'
+# Perfiles que se conservan y segundos entre muestras de pila
+MONITOREO_PERFILES_MAX = 200
+MONITOREO_PERFILES_INTERVALO = 0.001
@@ -6,6 +6,7 @@ from django.urls import path, include
 from django.shortcuts import redirect, render
 from django.conf import settings
 from django.conf.urls.static import static
+from monitoreo.views import metricas_prometheus
 
 def home_view(request):
     """Vista simple para la página de inicio"""
@@ -13,11 +14,20 @@ def home_view(request):
         return render(request, 'home.html', {'user': request.user})
     return redirect('login')
 
+async def home_view_async(request):
+    """Versión asíncrona de home_view"""
+    user = await request.auser()
+    if user.is_authenticated:
+        request.user = user
+        return render(request, 'home.html', {'user': user})
+    return redirect('login')
+
 urlpatterns = [
     path('admin/', admin.site.urls),  # Admin oficial de Django
-    path('', home_view, name='home'),
+    path('', home_view_async if settings.BLOG_VISTAS_ASYNC else home_view, name='home'),
     path('', include('autenticacion.urls')),
     path('blog/', include('blog.urls')),
+    path('metrics', metricas_prometheus, name='metricas'),
 ]
 
 # Servir archivos media en desarrollo
@@ -0,0 +1,18 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Al elegir un autor en el filtro del listado, recarga con ?autor=<id>
+    $(function() {
+        $('.filtro-autocompletar').on('change', function() {
+            const url = new URL(window.location.href);
+            url.searchParams.delete('p');
+            if (this.value) {
+                url.searchParams.set(this.dataset.parametro, this.value);
+            } else {
+                url.searchParams.delete(this.dataset.parametro);
+            }
+            window.location.href = url.toString();
+        });
+    });
+}
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Tarea
+
+
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'estado', 'intentos', 'max_intentos', 'ejecutar_despues', 'fecha_creacion')
+    list_filter = ('estado', 'nombre')
+    search_fields = ('nombre',)
+    readonly_fields = (
+        'nombre', 'args', 'kwargs', 'intentos', 'bloqueada_por', 'bloqueada_hasta',
+        'ultimo_error', 'fecha_creacion',
+    )
+    actions = ['reintentar']
+
+    def reintentar(self, request, queryset):
+        """Devuelve a la cola las tareas fallidas seleccionadas, con los intentos a cero"""
+        total = queryset.filter(estado=Tarea.Estado.FALLIDA).update(
+            estado=Tarea.Estado.PENDIENTE, intentos=0, ejecutar_despues=timezone.now(),
+        )
+        self.message_user(request, f'{total} tareas devueltas a la cola.')
+    reintentar.short_description = 'Reintentar las tareas fallidas seleccionadas'
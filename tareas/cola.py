@@ -0,0 +1,178 @@
+"""
+Cola de tareas en la base de datos, sin broker.
+
+Una función decorada con `@tarea` se encola con `funcion.encolar(...)`,
+que inserta una fila en Tarea dentro de la transacción actual: si la
+transacción se deshace, la tarea tampoco existe. Los argumentos deben ser
+serializables a JSON (ids, no instancias).
+
+El comando `procesar_tareas` reclama las tareas disponibles por lotes:
+- En PostgreSQL (y cualquier motor con SKIP LOCKED) con
+  `SELECT ... FOR UPDATE SKIP LOCKED`, así varios workers nunca esperan
+  por las mismas filas.
+- En SQLite, que bloquea la base de datos entera al escribir, con un único
+  UPDATE que marca el lote con un token del worker y después lee las filas
+  con ese token.
+
+Cada reclamo suma un intento. Si la función falla, la tarea vuelve a la
+cola con una espera exponencial, hasta `max_intentos`; después queda como
+fallida (visible en el admin). Una tarea reclamada por un worker que muere
+vuelve a la cola cuando caduca su bloqueo (TAREAS_BLOQUEO). Las tareas
+completadas se borran.
+"""
+import logging
+import random
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Tarea
+
+logger = logging.getLogger(__name__)
+
+# nombre -> función, con las tareas de los módulos ya importados
+registro = {}
+
+
+class FuncionTarea:
+    """Función registrada como tarea. Llamarla la ejecuta en el momento."""
+
+    def __init__(self, funcion, nombre, max_intentos):
+        self.funcion = funcion
+        self.nombre = nombre
+        self.max_intentos = max_intentos
+        self.__doc__ = funcion.__doc__
+        self.__name__ = funcion.__name__
+
+    def __call__(self, *args, **kwargs):
+        return self.funcion(*args, **kwargs)
+
+    def encolar(self, *args, **kwargs):
+        """Añade una ejecución a la cola. Devuelve la Tarea (None si es inmediata)."""
+        return self.encolar_con(args=args, kwargs=kwargs)
+
+    def encolar_con(self, args=(), kwargs=None, retraso=0):
+        """Como encolar, con `retraso` segundos de espera antes de ejecutarse"""
+        if getattr(settings, 'TAREAS_INMEDIATAS', False):
+            transaction.on_commit(lambda: self.funcion(*args, **(kwargs or {})))
+            return None
+        return Tarea.objects.create(
+            nombre=self.nombre,
+            args=list(args),
+            kwargs=kwargs or {},
+            max_intentos=self.max_intentos,
+            ejecutar_despues=timezone.now() + timedelta(seconds=retraso),
+        )
+
+
+def tarea(funcion=None, *, nombre=None, max_intentos=5):
+    """
+    Registra una función como tarea:
+
+        @tarea
+        def procesar_post(post_id): ...
+
+        procesar_post.encolar(post.pk)
+    """
+    def decorar(funcion):
+        envoltorio = FuncionTarea(
+            funcion, nombre or f'{funcion.__module__}.{funcion.__qualname__}', max_intentos
+        )
+        registro[envoltorio.nombre] = envoltorio
+        return envoltorio
+
+    return decorar(funcion) if funcion is not None else decorar
+
+
+def obtener(nombre):
+    """Función de la tarea `nombre`, importando su módulo si hace falta"""
+    if nombre not in registro:
+        import_string(nombre)
+    return registro[nombre]
+
+
+def disponibles():
+    return Tarea.objects.filter(
+        estado=Tarea.Estado.PENDIENTE, ejecutar_despues__lte=timezone.now()
+    ).order_by('ejecutar_despues', 'id')
+
+
+def reclamar(token, lote=10):
+    """Reclama hasta `lote` tareas disponibles para el worker `token` y las devuelve"""
+    ahora = timezone.now()
+    cambios = {
+        'estado': Tarea.Estado.EN_CURSO,
+        'bloqueada_por': token,
+        'bloqueada_hasta': ahora + timedelta(seconds=getattr(settings, 'TAREAS_BLOQUEO', 300)),
+        'intentos': F('intentos') + 1,
+    }
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(
+                disponibles().select_for_update(skip_locked=True).values_list('id', flat=True)[:lote]
+            )
+            Tarea.objects.filter(id__in=ids).update(**cambios)
+        else:
+            # Una sola sentencia: SQLite la ejecuta con la base de datos
+            # bloqueada, así que dos workers no pueden marcar la misma fila
+            Tarea.objects.filter(
+                id__in=disponibles().values('id')[:lote], estado=Tarea.Estado.PENDIENTE
+            ).update(**cambios)
+        return list(Tarea.objects.filter(estado=Tarea.Estado.EN_CURSO, bloqueada_por=token))
+
+
+def recuperar_abandonadas():
+    """Devuelve a la cola (o da por fallidas) las tareas cuyo bloqueo caducó"""
+    caducadas = Tarea.objects.filter(estado=Tarea.Estado.EN_CURSO, bloqueada_hasta__lt=timezone.now())
+    fallidas = caducadas.filter(intentos__gte=F('max_intentos')).update(
+        estado=Tarea.Estado.FALLIDA, bloqueada_por='', bloqueada_hasta=None,
+        ultimo_error='El worker no terminó la tarea antes de que caducara su bloqueo',
+    )
+    recuperadas = caducadas.update(
+        estado=Tarea.Estado.PENDIENTE, bloqueada_por='', bloqueada_hasta=None,
+    )
+    return recuperadas, fallidas
+
+
+def espera_reintento(intentos):
+    """Segundos hasta el siguiente intento: exponencial, con algo de azar"""
+    base = getattr(settings, 'TAREAS_REINTENTO_BASE', 10)
+    maximo = getattr(settings, 'TAREAS_REINTENTO_MAXIMO', 3600)
+    espera = min(maximo, base * 2 ** max(0, intentos - 1))
+    # El azar evita que las tareas que fallaron juntas se reintenten juntas
+    return espera * random.uniform(0.8, 1.2)
+
+
+def ejecutar(tarea):
+    """Ejecuta una tarea reclamada y guarda el resultado. Devuelve True si tuvo éxito."""
+    mia = Tarea.objects.filter(pk=tarea.pk, bloqueada_por=tarea.bloqueada_por)
+    try:
+        obtener(tarea.nombre)(*tarea.args, **tarea.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('La tarea %s falló (intento %s de %s)', tarea, tarea.intentos, tarea.max_intentos)
+        if tarea.intentos >= tarea.max_intentos:
+            mia.update(estado=Tarea.Estado.FALLIDA, bloqueada_por='', bloqueada_hasta=None, ultimo_error=error)
+        else:
+            mia.update(
+                estado=Tarea.Estado.PENDIENTE, bloqueada_por='', bloqueada_hasta=None, ultimo_error=error,
+                ejecutar_despues=timezone.now() + timedelta(seconds=espera_reintento(tarea.intentos)),
+            )
+        return False
+    # Solo si sigue siendo nuestra: si el bloqueo caducó, otro worker la tiene
+    mia.delete()
+    return True
+
+
+def procesar_lote(token=None, lote=10):
+    """Reclama y ejecuta un lote. Devuelve (ejecutadas, fallidas)."""
+    token = token or uuid.uuid4().hex
+    tareas = reclamar(token, lote)
+    fallidas = sum(not ejecutar(tarea) for tarea in tareas)
+    return len(tareas), fallidas
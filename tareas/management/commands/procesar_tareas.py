@@ -0,0 +1,97 @@
+import signal
+import subprocess
+import sys
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from tareas import cola
+
+
+class Command(BaseCommand):
+    help = 'Worker de la cola de tareas: reclama tareas por lotes y las ejecuta'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=10, help='Tareas reclamadas de una vez (por defecto: 10)')
+        parser.add_argument(
+            '--espera',
+            type=float,
+            default=1.0,
+            help='Segundos entre consultas cuando la cola está vacía (por defecto: 1)',
+        )
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=1,
+            help='Número de workers en paralelo, cada uno en su propio proceso (por defecto: 1)',
+        )
+        parser.add_argument(
+            '--vaciar',
+            action='store_true',
+            help='Terminar cuando no queden tareas disponibles en lugar de esperar nuevas',
+        )
+
+    def handle(self, *args, **options):
+        if options['procesos'] > 1:
+            return self.lanzar_procesos(options)
+
+        self.detener = False
+        signal.signal(signal.SIGTERM, self.pedir_parada)
+        token = uuid.uuid4().hex
+        total = fallidas_total = 0
+        if options['verbosity']:
+            self.stdout.write(f'Worker {token[:8]} esperando tareas (CTRL+C para salir)...')
+        try:
+            while not self.detener:
+                try:
+                    cola.recuperar_abandonadas()
+                    ejecutadas, fallidas = cola.procesar_lote(token, options['lote'])
+                except OperationalError as error:
+                    # SQLite: la base de datos estaba bloqueada por otro worker
+                    self.stderr.write(f'  ⚠ {error}; reintentando')
+                    connection.close()
+                    time.sleep(options['espera'])
+                    continue
+                total += ejecutadas
+                fallidas_total += fallidas
+                if ejecutadas and options['verbosity'] > 1:
+                    self.stdout.write(f'  ✓ {ejecutadas} tareas ({fallidas} con errores)')
+                if not ejecutadas:
+                    if options['vaciar']:
+                        break
+                    time.sleep(options['espera'])
+        except KeyboardInterrupt:
+            pass
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Worker {token[:8]}: {total} tareas ejecutadas'
+                + (f' ({fallidas_total} con errores)' if fallidas_total else '')
+            ))
+
+    def pedir_parada(self, *args):
+        # Termina el lote en curso antes de salir
+        self.detener = True
+
+    def lanzar_procesos(self, options):
+        """Lanza `--procesos` workers independientes y espera a que terminen"""
+        # Con el manage.py del proyecto y no con sys.argv[0], que no sirve si
+        # el comando se lanzó con `python -m django`, django-admin, etc.
+        argumentos = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'), 'procesar_tareas',
+            '--lote', str(options['lote']), '--espera', str(options['espera']),
+            '--verbosity', str(options['verbosity']),
+        ]
+        if options['vaciar']:
+            argumentos.append('--vaciar')
+        workers = [subprocess.Popen(argumentos) for _ in range(options['procesos'])]
+        try:
+            for worker in workers:
+                worker.wait()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.wait()
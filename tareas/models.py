@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tarea(models.Model):
+    """Trabajo diferido que ejecuta el comando procesar_tareas (ver tareas/cola.py)"""
+
+    class Estado(models.TextChoices):
+        PENDIENTE = 'pendiente', 'Pendiente'
+        EN_CURSO = 'en_curso', 'En curso'
+        FALLIDA = 'fallida', 'Fallida'
+
+    # Ruta de la función, por ejemplo 'blog.imagenes.procesar_post'
+    nombre = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=10, choices=Estado.choices, default=Estado.PENDIENTE)
+    intentos = models.PositiveIntegerField(default=0)
+    max_intentos = models.PositiveIntegerField(default=5)
+    # No se ejecuta antes de esta fecha (reintentos con espera)
+    ejecutar_despues = models.DateTimeField(default=timezone.now)
+    # Worker que la reclamó y hasta cuándo; pasada esa fecha se da por
+    # abandonada y vuelve a la cola
+    bloqueada_por = models.CharField(max_length=64, blank=True)
+    bloqueada_hasta = models.DateTimeField(null=True, blank=True)
+    ultimo_error = models.TextField(blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Tarea'
+        verbose_name_plural = 'Tareas'
+        ordering = ['ejecutar_despues', 'id']
+        indexes = [
+            # Reclamar las siguientes tareas disponibles
+            models.Index(
+                fields=['ejecutar_despues', 'id'],
+                name='tareas_pendientes_idx',
+                condition=models.Q(estado='pendiente'),
+            ),
+            # Recuperar las que quedaron bloqueadas por un worker caído
+            models.Index(
+                fields=['bloqueada_hasta'],
+                name='tareas_en_curso_idx',
+                condition=models.Q(estado='en_curso'),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.nombre} #{self.pk}'